@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.common'
+    verbose_name = '共用元件'
+
+    def ready(self):
+        from .cache import connect_invalidation_signals
+        from .events import connect_event_signals
+        connect_invalidation_signals()
+        connect_event_signals()
@@ -0,0 +1,162 @@
+"""
+公開目錄回應快取
+
+店家、商品與訂位時段的公開 API 讀取頻繁但很少變動，這裡將序列化後的 JSON
+依「命名空間 + 店家 + 版本 + 請求網址」存入 Django cache：
+
+- 每個命名空間對每家店（以及全域 '*'）各有一個版本號，值為最後變動時間
+- 相關模型 save / delete 的交易提交後才遞增該店與全域的版本號，舊的快取自然失效
+  （提交前失效的話，同時進行的讀取會把尚未提交的舊資料以新版本號重新寫回快取）
+- 回應附帶 ETag 與 Last-Modified，客戶端可用條件請求取得 304
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+GLOBAL_SCOPE = '*'
+
+# 模型 -> (命名空間, 取得店家 id 的函式)；模型變動時使對應的快取失效
+INVALIDATION_MAP = {
+    'stores.Store': ('stores', lambda instance: instance.pk),
+    'stores.StoreImage': ('stores', lambda instance: instance.store_id),
+    'stores.MenuImage': ('stores', lambda instance: instance.store_id),
+    'products.Product': ('products', lambda instance: instance.store_id),
+    'reservations.TimeSlot': ('time_slots', lambda instance: instance.store_id),
+    # 時段回應包含已訂人數與是否有訂位，訂位變動時也需失效
+    'reservations.Reservation': ('time_slots', lambda instance: instance.store_id),
+}
+
+
+def _cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+
+def _version_key(namespace, scope):
+    return f'catalog:version:{namespace}:{scope}'
+
+
+def get_version(namespace, scope):
+    """取得版本號（最後變動時間，毫秒），不存在時以目前時間初始化"""
+    cache = _cache()
+    key = _version_key(namespace, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(namespace, store_id=None):
+    """使某店家（與全域列表）在此命名空間下的快取失效"""
+    cache = _cache()
+    now = int(time.time() * 1000)
+    scopes = [GLOBAL_SCOPE] if store_id is None else [store_id, GLOBAL_SCOPE]
+    for scope in scopes:
+        key = _version_key(namespace, scope)
+        # 同一毫秒內多次變動仍需產生新版本
+        current = cache.get(key) or 0
+        cache.set(key, max(now, current + 1), None)
+
+
+def _response_key(namespace, scope, version, request):
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f'{request.get_host()}{request.path}?{params}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'catalog:response:{namespace}:{scope}:{version}:{digest}'
+
+
+def cached_catalog(namespace, scope=None):
+    """
+    快取 ViewSet 方法的 GET 回應
+
+    scope(view, request, kwargs) 回傳店家 id；回傳 None 表示跨店家的全域列表。
+    只快取 200 回應，其餘狀態直接回傳原本的結果。
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(view, request, *args, **kwargs)
+
+            store_id = scope(view, request, kwargs) if scope else None
+            cache_scope = GLOBAL_SCOPE if store_id is None else store_id
+            version = get_version(namespace, cache_scope)
+            key = _response_key(namespace, cache_scope, version, request)
+
+            entry = _cache().get(key)
+            if entry is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                content = JSONRenderer().render(response.data)
+                entry = {
+                    'content': content,
+                    'etag': hashlib.md5(content).hexdigest(),
+                }
+                _cache().set(key, entry, _timeout())
+
+            etag = quote_etag(entry['etag'])
+            last_modified = version // 1000
+            response = HttpResponse(entry['content'], content_type='application/json')
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+            return get_conditional_response(
+                request._request,
+                etag=etag,
+                last_modified=last_modified,
+                response=response,
+            ) or response
+        return wrapper
+    return decorator
+
+
+def store_id_from_query(param):
+    """scope 函式：從查詢參數取得店家 id，無效時視為全域"""
+    def scope(view, request, kwargs):
+        value = request.query_params.get(param)
+        return int(value) if value and value.isdigit() else None
+    return scope
+
+
+def store_id_from_pk(view, request, kwargs):
+    """scope 函式：網址中的 pk 即為店家 id"""
+    value = str(kwargs.get('pk', ''))
+    return int(value) if value.isdigit() else None
+
+
+def _make_receiver(namespace, get_store_id):
+    def receiver(sender, instance, **kwargs):
+        # 先取得店家 id，刪除後 instance.pk 會被清除
+        store_id = get_store_id(instance)
+        transaction.on_commit(lambda: invalidate(namespace, store_id))
+    return receiver
+
+
+def connect_invalidation_signals():
+    """註冊模型 save / delete 的失效處理（於 AppConfig.ready 呼叫）"""
+    for label, (namespace, get_store_id) in INVALIDATION_MAP.items():
+        model = apps.get_model(label)
+        receiver = _make_receiver(namespace, get_store_id)
+        dispatch_uid = f'catalog-cache:{label}'
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
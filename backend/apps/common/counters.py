@@ -0,0 +1,101 @@
+"""
+緩衝計數器（write-behind）
+
+瀏覽數等熱門計數若每次都寫入資料庫，會對同一列造成大量寫入與鎖競爭。
+這裡先在行程記憶體中累計增量，由背景執行緒定期以
+    UPDATE ... SET 欄位 = 欄位 + n WHERE id IN (...)
+批次寫回（依增量分組，每組一個敘述），行程結束前也會寫回一次。
+
+使用方式：
+    from apps.common.counters import counters
+    counters.increment(SurplusFood, food.pk, 'views_count')
+
+計數為最終一致，資料庫中的值最多落後 COUNTER_FLUSH_INTERVAL 秒；
+COUNTER_FLUSH_INTERVAL <= 0 時每次累加後立即寫回（方便除錯）。
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """行程內的計數緩衝區"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)  # (model, field, pk) -> 增量
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def interval(self):
+        return getattr(settings, 'COUNTER_FLUSH_INTERVAL', 10)
+
+    def increment(self, model, pk, field, amount=1):
+        """累加計數，稍後批次寫回"""
+        with self._lock:
+            self._pending[(model, field, pk)] += amount
+
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_worker()
+
+    def pending(self, model, pk, field):
+        """尚未寫回的增量（可用於顯示即時數字）"""
+        with self._lock:
+            return self._pending.get((model, field, pk), 0)
+
+    def flush(self):
+        """將累計的增量寫回資料庫，回傳執行的 UPDATE 數"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+
+        groups = defaultdict(list)
+        for (model, field, pk), amount in pending.items():
+            if amount:
+                groups[(model, field, amount)].append(pk)
+
+        statements = 0
+        for (model, field, amount), pks in groups.items():
+            try:
+                model.objects.filter(pk__in=pks).update(**{field: F(field) + amount})
+                statements += 1
+            except Exception:
+                logger.exception('寫回計數失敗: %s.%s', model.__name__, field)
+                # 放回緩衝區，下次再試
+                with self._lock:
+                    for pk in pks:
+                        self._pending[(model, field, pk)] += amount
+        return statements
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='counter-flush', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+counters = CounterBuffer()
+atexit.register(counters.flush)
@@ -0,0 +1,318 @@
+"""
+店家即時事件（長輪詢）
+
+商家後台不再定期重新取得訂位與訂單列表，改為對 /api/merchant/events/ 長輪詢：
+請求會等到有新事件或 EVENT_POLL_TIMEOUT 秒後才回應，客戶端收到回應後立即帶著 cursor 再次請求。
+
+    {"events": [{"id": "...", "type": "reservation.created", "data": {"id": 12, "status": "pending"}}],
+     "cursor": "1792299720888"}
+
+事件來源：
+- Reservation / TakeoutOrder / SurplusFoodOrder 新增或狀態變動時（post_save 訊號，見 EVENT_SOURCES）
+- 以集合式 UPDATE 變更狀態的程式（批次更新、逾期處理等）直接呼叫 publish_store_event
+
+事件一律在交易提交後才發布，回滾的變更不會送出。
+
+每個行程保留最近 EVENT_BUFFER_SECONDS 秒收到的事件，兩次輪詢之間發生的事件由此補齊。
+cursor 為行程收到事件當下的時間（毫秒），輪詢時會往前多取 EVENT_POLL_OVERLAP 秒，
+涵蓋不同行程收到同一事件的時間差（以及主機之間的時鐘誤差），同一事件可能重複出現，客戶端應以事件 id 去重。
+cursor 早於保留範圍（例如平板休眠後）或行程尚未開始接收事件時，回應 reset: true，
+客戶端應重新取得列表（或出餐佇列的 ?since=）。
+
+發布/訂閱的後端由 EVENT_BACKEND 設定（dotted path）：
+- LocalBackend（預設）：行程內佇列，適用開發、測試與單一行程部署
+- PostgresBackend：以 LISTEN / NOTIFY 在多個行程間傳遞，每個行程只需一條監聽連線（production 設定使用）
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models.signals import post_init, post_save
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+# 模型 -> 事件名稱前綴；新增時發布 <前綴>.created，狀態變動時發布 <前綴>.updated
+EVENT_SOURCES = {
+    'reservations.Reservation': 'reservation',
+    'orders.TakeoutOrder': 'takeout_order',
+    'surplus_food.SurplusFoodOrder': 'surplus_order',
+}
+
+# 每個訂閱者最多暫存的事件數，消費過慢的連線會丟棄新事件而不是拖累發布端
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# 每個店家最多保留的近期事件數，超過時捨棄最舊的事件
+BUFFER_SIZE = 256
+
+
+def store_channel(store_id):
+    return f'store:{store_id}'
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class Subscription:
+    """單一請求的訂閱，使用完畢需 close()（可用 with 陳述式）"""
+
+    def __init__(self, backend, channel):
+        self.backend = backend
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout=None):
+        """等待下一個事件，逾時回傳 None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalBackend:
+    """行程內的發布/訂閱"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        # channel -> deque[(收到的時間 ms, event)]
+        self._recent = {}
+        # channel -> 因超過 BUFFER_SIZE 而捨棄的最新事件時間
+        self._dropped_at = {}
+        # 開始接收事件的時間，之前的事件不在保留範圍內（行程內發布不會遺漏，從 0 起算）
+        self._receiving_since = 0
+        self._last_prune = now_ms()
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        received_at = now_ms()
+        with self._lock:
+            recent = self._recent.setdefault(channel, deque())
+            if len(recent) >= BUFFER_SIZE:
+                self._dropped_at[channel] = recent.popleft()[0]
+            recent.append((received_at, event))
+            if received_at - self._last_prune > self._retention_ms():
+                self._prune(received_at)
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                logger.warning('事件佇列已滿，丟棄事件: %s %s', channel, event.get('type'))
+
+    def recent(self, channel, after, overlap=0):
+        """
+        回傳 ([(收到的時間 ms, event), ...], 是否完整)，包含 after - overlap 之後收到的事件
+
+        after 早於保留範圍時無法確定期間的事件是否都還在，complete 為 False。
+        """
+        now = now_ms()
+        with self._lock:
+            floor = max(
+                now if self._receiving_since is None else self._receiving_since,
+                self._dropped_at.get(channel, 0),
+                now - self._retention_ms(),
+            )
+            events = [
+                (received_at, event) for received_at, event in self._recent.get(channel, ())
+                if received_at > after - overlap
+            ]
+        return events, after >= floor
+
+    def _retention_ms(self):
+        return getattr(settings, 'EVENT_BUFFER_SECONDS', 120) * 1000
+
+    def _prune(self, now):
+        """捨棄超過保留時間的事件（需持有 _lock）"""
+        self._last_prune = now
+        oldest = now - self._retention_ms()
+        for channel in list(self._recent):
+            recent = self._recent[channel]
+            while recent and recent[0][0] < oldest:
+                recent.popleft()
+            if not recent:
+                del self._recent[channel]
+                self._dropped_at.pop(channel, None)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.channel]
+
+
+class PostgresBackend(LocalBackend):
+    """
+    以 PostgreSQL LISTEN / NOTIFY 跨行程傳遞事件
+
+    發布時執行 pg_notify；每個行程在第一次訂閱時啟動一個背景執行緒，
+    以獨立連線 LISTEN 並轉交給本行程的訂閱者（包含發布事件的行程本身）。
+    開始 LISTEN 之前與監聽連線中斷期間的事件不會收到，這段期間之前的 cursor 一律視為不完整。
+    NOTIFY 的內容上限約 8000 bytes，事件只應包含 id 與狀態等少量欄位。
+    """
+
+    NOTIFY_CHANNEL = 'store_events'
+    RECONNECT_DELAY = 5
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._receiving_since = None
+
+    def publish(self, channel, event):
+        payload = json.dumps({'channel': channel, 'event': event}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.NOTIFY_CHANNEL, payload])
+
+    def subscribe(self, channel):
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name='event-listener', daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception('事件監聽連線中斷，%s 秒後重新連線', self.RECONNECT_DELAY)
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _listen_once(self):
+        # 使用 Django 的連線設定另開一條不受請求交易影響的連線
+        conn = connection.get_new_connection(connection.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.NOTIFY_CHANNEL}')
+            with self._lock:
+                self._receiving_since = now_ms()
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    message = json.loads(notify.payload)
+                    self.deliver(message['channel'], message['event'])
+        finally:
+            with self._lock:
+                self._receiving_since = None
+            conn.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'EVENT_BACKEND', 'apps.common.events.LocalBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+def publish_store_event(store_id, event_type, data):
+    """交易提交後發布店家事件"""
+    event = {'id': uuid.uuid4().hex, 'type': event_type, 'data': data}
+    channel = store_channel(store_id)
+    transaction.on_commit(lambda: get_backend().publish(channel, event))
+
+
+def _remember_status(sender, instance, **kwargs):
+    # 記錄載入時的狀態；延遲載入（only/defer）的欄位不讀取，避免額外查詢
+    instance._event_status = instance.__dict__.get('status')
+
+
+def _make_receiver(prefix):
+    def receiver(sender, instance, created, update_fields=None, **kwargs):
+        if not created:
+            if update_fields is not None and 'status' not in update_fields:
+                return
+            if instance.status == getattr(instance, '_event_status', None):
+                return
+        instance._event_status = instance.status
+        publish_store_event(
+            instance.store_id,
+            f"{prefix}.{'created' if created else 'updated'}",
+            {'id': instance.pk, 'status': instance.status},
+        )
+    return receiver
+
+
+def connect_event_signals():
+    """註冊事件來源模型的 post_init / post_save（於 AppConfig.ready 呼叫）"""
+    for label, prefix in EVENT_SOURCES.items():
+        model = apps.get_model(label)
+        post_init.connect(
+            _remember_status, sender=model, weak=False,
+            dispatch_uid=f'store-events-status:{label}',
+        )
+        post_save.connect(
+            _make_receiver(prefix), sender=model, weak=False,
+            dispatch_uid=f'store-events:{label}',
+        )
+
+
+def poll_events(subscription, after, timeout=None):
+    """
+    長輪詢：回傳 (events, reset)
+
+    after 之後已有事件時立即回傳，否則等待第一個新事件或 timeout 秒
+    （預設 EVENT_POLL_TIMEOUT）。回傳的事件往前多含 EVENT_POLL_OVERLAP 秒。
+    需在查詢保留事件之前訂閱，等待期間收到的事件才不會遺漏。
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'EVENT_POLL_TIMEOUT', 25)
+    overlap = getattr(settings, 'EVENT_POLL_OVERLAP', 2) * 1000
+    backend = subscription.backend
+
+    recent, complete = backend.recent(subscription.channel, after, overlap)
+    if complete and not any(received_at > after for received_at, _ in recent):
+        # 訂閱只用來喚醒，事件內容一律從保留的事件取得
+        subscription.get(timeout=timeout)
+        recent, complete = backend.recent(subscription.channel, after, overlap)
+    if not complete:
+        return [], True
+    return [event for _, event in recent], False
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.sweeper import SWEEPERS, run_sweeper
+
+
+class Command(BaseCommand):
+    help = '將逾期的惜福品、惜福訂單與點數兌換轉為過期，並歸還庫存與點數'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', action='append', choices=sorted(SWEEPERS),
+            help='只執行指定的項目（可重複指定）',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='每批處理筆數（預設 500）',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='忽略上次執行時間，重新掃描所有已到期的資料',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 必須為正整數')
+
+        failed = []
+        for name in options['only'] or SWEEPERS:
+            try:
+                run = run_sweeper(
+                    name,
+                    batch_size=options['batch_size'],
+                    full=options['full'],
+                )
+            except Exception as e:
+                failed.append(name)
+                self.stderr.write(self.style.ERROR(f'{name}: 失敗 ({e})'))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: 已處理 {run.processed} 筆'
+            ))
+
+        if failed:
+            raise CommandError(f'清理失敗: {", ".join(failed)}')
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='例如: R（訂位）、SFO（惜福訂單）', max_length=50, verbose_name='序號名稱')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='目前序號')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '每日序號',
+                'verbose_name_plural': '每日序號',
+                'db_table': 'daily_sequences',
+                'unique_together': {('key', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SweepRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='清理項目')),
+                ('since', models.DateTimeField(blank=True, null=True, verbose_name='起始時間')),
+                ('cutoff', models.DateTimeField(verbose_name='截止時間')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='處理筆數')),
+                ('error', models.TextField(blank=True, default='', verbose_name='錯誤訊息')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='開始時間')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成時間')),
+            ],
+            options={
+                'verbose_name': '逾期清理記錄',
+                'verbose_name_plural': '逾期清理記錄',
+                'db_table': 'sweep_runs',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['name', '-cutoff'], name='sweep_runs_name_75743f_idx')],
+            },
+        ),
+    ]
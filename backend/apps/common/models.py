@@ -0,0 +1,56 @@
+from django.db import models
+
+
+class DailySequence(models.Model):
+    """
+    每日序號計數器
+
+    以 (key, date) 為單位遞增，供訂位編號、訂單編號等人類可讀的編號使用。
+    """
+    key = models.CharField(
+        max_length=50,
+        verbose_name='序號名稱',
+        help_text='例如: R（訂位）、SFO（惜福訂單）'
+    )
+    date = models.DateField(verbose_name='日期')
+    last_value = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='目前序號'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_sequences'
+        verbose_name = '每日序號'
+        verbose_name_plural = '每日序號'
+        unique_together = ['key', 'date']
+
+    def __str__(self):
+        return f"{self.key} {self.date}: {self.last_value}"
+
+
+class SweepRun(models.Model):
+    """
+    逾期清理執行記錄
+
+    每個 sweeper 以上次成功執行的 cutoff 作為下次的起點，只處理新到期的資料。
+    """
+    name = models.CharField(max_length=50, verbose_name='清理項目')
+    since = models.DateTimeField(null=True, blank=True, verbose_name='起始時間')
+    cutoff = models.DateTimeField(verbose_name='截止時間')
+    processed = models.PositiveIntegerField(default=0, verbose_name='處理筆數')
+    error = models.TextField(blank=True, default='', verbose_name='錯誤訊息')
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='開始時間')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成時間')
+
+    class Meta:
+        db_table = 'sweep_runs'
+        verbose_name = '逾期清理記錄'
+        verbose_name_plural = '逾期清理記錄'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['name', '-cutoff']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.cutoff}: {self.processed}"
@@ -0,0 +1,168 @@
+"""
+游標分頁（鍵集分頁）
+
+游標記錄上一頁最後一筆（或上一頁的第一筆）在所有排序欄位上的值，下一頁以
+    (created_at, id) < (上一筆的 created_at, 上一筆的 id)
+展開成的條件查詢：
+    created_at < x OR (created_at = x AND id < y)
+每頁只讀取 page_size + 1 筆，不需要 COUNT(*)，也不使用 OFFSET；
+排序欄位有大量相同值（例如班表的日期、搜尋相關度）時同樣只依鍵值定位。
+
+各 ViewSet 可以用類別屬性調整：
+- page_size / max_page_size: 預設每頁筆數與 ?page_size= 的上限
+- cursor_ordering: 排序欄位，可使用 annotate 的欄位
+  （欄位不可為 NULL，最後一個欄位需唯一，通常為 id；浮點數欄位需為 double precision，
+  real 經 JSON 來回後無法與欄位精確比較）
+- get_cursor_ordering(): 需依請求決定排序時使用，回傳 None 表示使用預設
+"""
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from uuid import UUID
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    # 保留完整精度（DjangoJSONEncoder 會將時間截斷為毫秒）
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _field_value(obj, field):
+    for attr in field.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class CreatedAtCursorPagination(BasePagination):
+    """預設分頁：依建立時間由新到舊"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request, view)
+        self.ordering = [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in self.get_ordering(request, queryset, view)
+        ]
+        position, reverse = self.decode_cursor(request)
+
+        ordering = [
+            f'{"-" if descending != reverse else ""}{field}'
+            for field, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_page_size(self, request, view=None):
+        page_size = getattr(view, 'page_size', self.page_size)
+        max_page_size = getattr(view, 'max_page_size', self.max_page_size)
+        value = request.query_params.get(self.page_size_query_param)
+        if value and value.isdigit() and int(value) > 0:
+            page_size = int(value)
+        return min(page_size, max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if hasattr(view, 'get_cursor_ordering'):
+            ordering = view.get_cursor_ordering() or ordering
+        if ordering:
+            return tuple(ordering)
+        return type(self).ordering
+
+    def _after(self, position, reverse):
+        """排序在 position 之後（reverse 時為之前）的條件"""
+        conditions = []
+        for index, (field, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {name: position[i] for i, (name, _) in enumerate(self.ordering[:index])}
+            conditions.append(Q(**equal, **{f'{field}__{lookup}': position[index]}))
+        return reduce(or_, conditions)
+
+    def _position(self, obj):
+        position = [_encode_value(_field_value(obj, field)) for field, _ in self.ordering]
+        if None in position:
+            raise ImproperlyConfigured(
+                f'游標分頁的排序欄位不可為 NULL: {[field for field, _ in self.ordering]}'
+            )
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = data['p'], bool(data.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
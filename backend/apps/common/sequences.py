@@ -0,0 +1,69 @@
+"""
+序號配置
+
+以每日計數列上的原子 UPDATE 配置序號，不需重試迴圈也不會與唯一索引衝突：
+    UPDATE daily_sequences SET last_value = last_value + n WHERE id = ...
+UPDATE 會鎖定計數列直到 transaction 結束，同時配置的請求會依序取得不重複的區段。
+
+全平台共用的計數列（訂位編號、惜福訂單編號）改由獨立的 sequences 連線配置並立即提交，
+計數列只鎖定一次 UPDATE 的時間，不會讓各店的下單交易互相等待；
+外層交易回滾時序號不會歸還（編號可能不連續）。
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailySequence
+
+
+# 獨立提交序號的資料庫別名（settings.DATABASES 未設定時使用 default）
+SEQUENCE_DATABASE = 'sequences'
+
+
+def allocate(key, count=1, date=None, using=DEFAULT_DB_ALIAS):
+    """
+    配置 count 個連續序號，回傳第一個序號（從 1 開始）
+
+    一次配置多個序號時可供批次建立使用，只需一次 UPDATE。
+    using 為 default 時與呼叫端的交易一起提交，計數列鎖定到交易結束。
+    """
+    date = date or timezone.localdate()
+    sequences = DailySequence.objects.using(using)
+    with transaction.atomic(using=using):
+        sequence, _ = sequences.get_or_create(key=key, date=date)
+        sequences.filter(pk=sequence.pk).update(last_value=F('last_value') + count)
+        last_value = sequences.filter(pk=sequence.pk).values_list(
+            'last_value', flat=True
+        ).get()
+    return last_value - count + 1
+
+
+def sequence_database():
+    return SEQUENCE_DATABASE if SEQUENCE_DATABASE in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+def luhn_check_digit(digits):
+    """計算數字字串的 Luhn 檢查碼，可偵測單一數字輸入錯誤與相鄰數字對調"""
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        value = int(char)
+        if index % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def format_code(prefix, date, value, width=5):
+    """格式: 前綴 + 日期(YYYYMMDD) + 序號(至少 width 碼) + 檢查碼"""
+    digits = f"{date.strftime('%Y%m%d')}{value:0{width}d}"
+    return f"{prefix}{digits}{luhn_check_digit(digits)}"
+
+
+def mint_code(prefix, key=None, width=5):
+    """配置當日下一個序號並產生編號（以獨立連線立即提交），key 預設與 prefix 相同"""
+    date = timezone.localdate()
+    value = allocate(key or prefix, date=date, using=sequence_database())
+    return format_code(prefix, date, value, width=width)
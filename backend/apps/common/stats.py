@@ -0,0 +1,94 @@
+"""
+商家統計
+
+以條件式聚合（COUNT ... FILTER）在一次查詢內算出各狀態的數量與其他合計，
+並支援日期區間與依日/週/月分組，讓儀表板不需要每個狀態或每個區間各查一次。
+"""
+from datetime import datetime
+
+from django.db.models import Count, DateField, Q
+from django.db.models.functions import Trunc
+
+
+BUCKET_CHOICES = ('day', 'week', 'month')
+
+
+class StatsParamError(ValueError):
+    """統計查詢參數錯誤"""
+
+
+def parse_date_range(query_params):
+    """解析 start_date / end_date（YYYY-MM-DD，含），未提供者為 None"""
+    def parse_date(name):
+        value = query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise StatsParamError(f'{name} 格式應為 YYYY-MM-DD')
+
+    start_date = parse_date('start_date')
+    end_date = parse_date('end_date')
+    if start_date and end_date and start_date > end_date:
+        raise StatsParamError('start_date 不得晚於 end_date')
+    return start_date, end_date
+
+
+def parse_stats_params(query_params):
+    """
+    解析統計查詢參數
+
+    - start_date / end_date: YYYY-MM-DD（含）
+    - bucket: day / week / month，未提供則不分組
+    """
+    start_date, end_date = parse_date_range(query_params)
+
+    bucket = query_params.get('bucket') or None
+    if bucket and bucket not in BUCKET_CHOICES:
+        raise StatsParamError(f"bucket 必須為 {', '.join(BUCKET_CHOICES)} 之一")
+
+    return start_date, end_date, bucket
+
+
+def filter_date_range(queryset, date_field, start_date=None, end_date=None):
+    """依日期區間篩選，date_field 可為 DateField 或 DateTimeField（以日期比較）"""
+    field = queryset.model._meta.get_field(date_field)
+    lookup = date_field if type(field) is DateField else f'{date_field}__date'
+    if start_date:
+        queryset = queryset.filter(**{f'{lookup}__gte': start_date})
+    if end_date:
+        queryset = queryset.filter(**{f'{lookup}__lte': end_date})
+    return queryset
+
+
+def _histogram_aggregates(statuses, field, totals):
+    aggregates = {'total': Count('pk')}
+    for value in statuses:
+        aggregates[value] = Count('pk', filter=Q(**{field: value}))
+    aggregates.update(totals or {})
+    return aggregates
+
+
+def status_histogram(queryset, statuses, field='status', totals=None):
+    """
+    一次查詢算出總數、各狀態數量與額外合計
+
+    totals 為額外的聚合運算式，例如 {'total_views': Coalesce(Sum('views_count'), 0)}
+    """
+    return queryset.aggregate(**_histogram_aggregates(statuses, field, totals))
+
+
+def bucketed_histogram(queryset, date_field, bucket, statuses, field='status', totals=None):
+    """依日/週/月分組的狀態統計，一次 GROUP BY 查詢回傳所有區間"""
+    rows = (
+        queryset
+        .annotate(period=Trunc(date_field, bucket, output_field=DateField()))
+        .values('period')
+        .annotate(**_histogram_aggregates(statuses, field, totals))
+        .order_by('period')
+    )
+    return [
+        {**row, 'period': row['period'].isoformat()}
+        for row in rows
+    ]
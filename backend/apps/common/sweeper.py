@@ -0,0 +1,56 @@
+"""
+逾期清理
+
+各 app 提供 sweeper 函式 func(since, until, batch_size) -> 處理筆數，
+只處理在 (since, until] 之間到期的資料；since 取自同名 sweeper 上次成功執行的 cutoff，
+因此每次執行只會掃描新到期的列（搭配各表的部分索引）。
+首次執行或指定 full=True 時 since 為 None，處理所有已到期的資料。
+
+執行：python manage.py sweep_expired（建議以 cron 每數分鐘執行一次）
+"""
+import logging
+
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import SweepRun
+
+
+logger = logging.getLogger(__name__)
+
+SWEEPERS = {
+    'surplus_foods': 'apps.surplus_food.inventory.expire_surplus_foods',
+    'surplus_orders': 'apps.surplus_food.inventory.expire_overdue_orders',
+    'redemptions': 'apps.loyalty.expiry.expire_redemptions',
+}
+
+
+def last_cutoff(name):
+    """上次成功執行的 cutoff，沒有執行記錄時回傳 None"""
+    return (
+        SweepRun.objects.filter(name=name, finished_at__isnull=False)
+        .order_by('-cutoff')
+        .values_list('cutoff', flat=True)
+        .first()
+    )
+
+
+def run_sweeper(name, batch_size=500, full=False, now=None):
+    """執行單一 sweeper 並記錄結果，回傳 SweepRun"""
+    func = import_string(SWEEPERS[name])
+    until = now or timezone.now()
+    since = None if full else last_cutoff(name)
+
+    run = SweepRun.objects.create(name=name, since=since, cutoff=until)
+    try:
+        processed = func(since, until, batch_size)
+    except Exception as e:
+        logger.exception('清理失敗: %s', name)
+        run.error = str(e)
+        run.save(update_fields=['error'])
+        raise
+
+    run.processed = processed
+    run.finished_at = timezone.now()
+    run.save(update_fields=['processed', 'finished_at'])
+    return run
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import MerchantEventsView
+
+urlpatterns = [
+    path('merchant/events/', MerchantEventsView.as_view(), name='merchant-events'),
+]
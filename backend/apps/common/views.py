@@ -0,0 +1,44 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .events import get_backend, now_ms, poll_events, store_channel
+
+
+class MerchantEventsView(APIView):
+    """
+    商家即時事件（長輪詢）
+
+    GET /api/merchant/events/?after=<cursor>
+
+    回傳自己店家的訂位、外帶訂單與惜福訂單在 cursor 之後的新增與狀態變動：
+    {"events": [...], "cursor": "...", "reset": false}
+    - 不帶 after：立即回傳目前的 cursor（先取得列表再開始輪詢）
+    - 沒有新事件時最多等待 EVENT_POLL_TIMEOUT 秒，請求只在這段時間內占用工作執行緒
+    - reset 為 true 時期間的事件可能已遺失，客戶端應重新取得列表
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            store = request.user.merchant_profile.store
+        except AttributeError:
+            return Response(
+                {'error': '找不到店家資料'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        after = request.query_params.get('after')
+        if after is None:
+            return Response({'events': [], 'cursor': str(now_ms()), 'reset': False})
+        try:
+            after = int(after)
+        except ValueError:
+            return Response(
+                {'error': 'after 游標格式錯誤'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with get_backend().subscribe(store_channel(store.pk)) as subscription:
+            events, reset = poll_events(subscription, after)
+        return Response({'events': events, 'cursor': str(now_ms()), 'reset': reset})
@@ -0,0 +1,34 @@
+"""原物料匯出欄位"""
+from apps.common.exports import Column, choice_display, iter_rows, local_datetime, yes_no
+
+from .models import Ingredient
+
+
+INGREDIENT_COLUMNS = [
+    Column('原料名稱', 'name'),
+    Column('店家', 'store__name'),
+    Column('類別', 'category'),
+    Column('數量', 'quantity'),
+    Column('單位', 'unit', format=choice_display(Ingredient.UNIT_CHOICES)),
+    Column('單價', 'cost_per_unit'),
+    Column(
+        '庫存總價值',
+        compute=lambda row: row['quantity'] * row['cost_per_unit'],
+        depends=('quantity', 'cost_per_unit'),
+    ),
+    Column('供應商', 'supplier'),
+    Column('最低庫存量', 'minimum_stock'),
+    Column(
+        '低庫存警示',
+        compute=lambda row: yes_no(row['quantity'] <= row['minimum_stock']),
+        depends=('quantity', 'minimum_stock'),
+    ),
+    Column('備註', 'notes'),
+    Column('建立時間', 'created_at', format=local_datetime),
+    Column('更新時間', 'updated_at', format=local_datetime),
+]
+
+
+def ingredient_rows(queryset):
+    """原物料匯出列（店家名稱以 JOIN 取得，不逐列查詢）"""
+    return iter_rows(queryset.order_by('store_id', 'category', 'name', 'id'), INGREDIENT_COLUMNS)
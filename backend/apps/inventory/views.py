@@ -2,10 +2,11 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
 from django.utils import timezone
 from django.db import models
-import csv
+from apps.common.exports import ExportError, parse_export_params, stream_export
+from apps.common.stats import filter_date_range
+from .exports import INGREDIENT_COLUMNS, ingredient_rows
 from .models import Ingredient
 from .serializers import IngredientSerializer, IngredientExportSerializer
 
@@ -15,6 +16,8 @@ class IngredientViewSet(viewsets.ModelViewSet):
     
     serializer_class = IngredientSerializer
     permission_classes = [IsAuthenticated]
+    page_size = 50
+    max_page_size = 200
     
     def get_queryset(self):
         """只返回當前商家的原物料"""
@@ -49,60 +52,30 @@ class IngredientViewSet(viewsets.ModelViewSet):
     def low_stock(self, request):
         """取得低庫存原物料"""
         queryset = self.get_queryset().filter(quantity__lte=models.F('minimum_stock'))
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def export_today(self, request):
-        """匯出當日原物料清單為 CSV"""
-        queryset = self.get_queryset()
-        
-        # 建立 CSV response
-        response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
-        today = timezone.now().strftime('%Y-%m-%d')
-        response['Content-Disposition'] = f'attachment; filename="inventory_{today}.csv"'
-        
-        # 加入 UTF-8 BOM 以支援 Excel 正確顯示中文
-        response.write('\ufeff')
+        """
+        匯出原物料清單（串流輸出）
         
-        writer = csv.writer(response)
-        
-        # 寫入標題
-        writer.writerow([
-            '原料名稱',
-            '店家',
-            '類別',
-            '數量',
-            '單位',
-            '單價',
-            '庫存總價值',
-            '供應商',
-            '最低庫存量',
-            '低庫存警示',
-            '備註',
-            '建立時間',
-            '更新時間',
-        ])
-        
-        # 寫入資料
-        for item in queryset:
-            writer.writerow([
-                item.name,
-                item.store.name,
-                item.category,
-                str(item.quantity),
-                item.get_unit_display(),
-                str(item.cost_per_unit),
-                str(item.total_value),
-                item.supplier,
-                str(item.minimum_stock),
-                '是' if item.is_low_stock else '否',
-                item.notes,
-                item.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                item.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            ])
+        GET /api/inventory/ingredients/export_today/?export_format=csv&start_date=&end_date=
+        - export_format: csv（預設）或 xlsx
+        - start_date / end_date: 依更新日期篩選（選填）
+        """
+        try:
+            fmt, start_date, end_date = parse_export_params(request.query_params)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return response
+        queryset = filter_date_range(self.get_queryset(), 'updated_at', start_date, end_date)
+        today = timezone.localdate().strftime('%Y-%m-%d')
+        return stream_export(
+            f'inventory_{today}', INGREDIENT_COLUMNS, ingredient_rows(queryset), fmt,
+            title='原物料',
+        )
     
     @action(detail=False, methods=['get'])
     def by_category(self, request):
@@ -113,8 +86,9 @@ class IngredientViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def adjust_quantity(self, request, pk=None):
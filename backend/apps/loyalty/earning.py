@@ -0,0 +1,161 @@
+"""
+訂單累積點數
+
+外帶訂單完成（status 轉為 completed）後依店家啟用中的 PointRule 發放點數：
+- 訂單金額達到 min_spend（未設定視為無門檻）的規則才適用
+- 同時有多條規則適用時取 points_per_currency 最高者（規則不疊加）
+- 點數為 訂單金額（TakeoutOrder.total）× points_per_currency 無條件捨去
+
+發放以批次完成，不論一次處理多少訂單，查詢數都固定：
+規則一次載入、帳戶批次建立、交易與餘額以 ledger.post_transactions 批次寫入，
+最後以單一集合式 UPDATE 依 MembershipLevel.threshold_points 重新計算會員等級。
+
+已有 earn 交易的訂單會被略過，重複呼叫不會重複發放。
+"""
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .ledger import post_transactions
+from .models import CustomerLoyaltyAccount, MembershipLevel, PointRule, PointTransaction
+
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def recalculate_levels(accounts):
+	"""
+	依累計總點數重新計算會員等級（單一 UPDATE），回傳更新的帳戶數
+
+	等級為同店家啟用中、門檻不高於 total_points 的最高門檻等級；
+	沒有符合的等級時清除為空。
+	"""
+	level = MembershipLevel.objects.filter(
+		store=OuterRef('store'),
+		active=True,
+		threshold_points__lte=OuterRef('total_points'),
+	).order_by('-threshold_points', 'rank', 'pk').values('pk')[:1]
+	return accounts.update(current_level=Subquery(level), updated_at=timezone.now())
+
+
+def load_rules(store_ids):
+	"""{store_id: [(points_per_currency, min_spend), ...]}，只含啟用中的規則"""
+	rules = defaultdict(list)
+	for store_id, rate, min_spend in PointRule.objects.filter(
+		store_id__in=store_ids,
+		active=True,
+		points_per_currency__gt=0,
+	).values_list('store_id', 'points_per_currency', 'min_spend'):
+		rules[store_id].append((rate, min_spend))
+	return rules
+
+
+def points_for(amount, rules):
+	"""依適用規則中最高的 points_per_currency 計算點數"""
+	rates = [
+		rate for rate, min_spend in rules
+		if min_spend is None or amount >= min_spend
+	]
+	if not rates or amount <= 0:
+		return 0
+	return int((amount * max(rates)).quantize(Decimal('1'), rounding=ROUND_DOWN))
+
+
+def get_accounts(pairs):
+	"""{(user_id, store_id): account_id}，不存在的帳戶批次建立"""
+	pairs = set(pairs)
+	if not pairs:
+		return {}
+
+	def existing():
+		rows = CustomerLoyaltyAccount.objects.filter(
+			user_id__in={user_id for user_id, _ in pairs},
+			store_id__in={store_id for _, store_id in pairs},
+		).values_list('user_id', 'store_id', 'pk')
+		return {(user_id, store_id): pk for user_id, store_id, pk in rows if (user_id, store_id) in pairs}
+
+	accounts = existing()
+	missing = pairs - accounts.keys()
+	if missing:
+		CustomerLoyaltyAccount.objects.bulk_create(
+			[CustomerLoyaltyAccount(user_id=user_id, store_id=store_id) for user_id, store_id in missing],
+			ignore_conflicts=True,
+		)
+		accounts = existing()
+	return accounts
+
+
+def credit_accounts(entries, batch_size=DEFAULT_BATCH_SIZE):
+	"""
+	批次發放點數並重新計算等級
+
+	entries 為 (account_id, points, description, order_id) 的序列，回傳寫入的交易數。
+	"""
+	entries = [entry for entry in entries if entry[1] > 0]
+	if not entries:
+		return 0
+
+	with transaction.atomic():
+		count = post_transactions(
+			[
+				PointTransaction(
+					account_id=account_id,
+					transaction_type='earn',
+					points=points,
+					description=description,
+					order_id=order_id,
+				)
+				for account_id, points, description, order_id in entries
+			],
+			batch_size=batch_size,
+		)
+		recalculate_levels(
+			CustomerLoyaltyAccount.objects.filter(pk__in={entry[0] for entry in entries})
+		)
+	return count
+
+
+def award_order_points(orders, batch_size=DEFAULT_BATCH_SIZE):
+	"""
+	為外帶訂單發放點數，回傳寫入的交易數
+
+	訪客訂單（user 為空）、未完成、無適用規則與已發放過的訂單會被略過。
+	"""
+	orders = [order for order in orders if order.user_id and order.status == 'completed']
+	if not orders:
+		return 0
+
+	order_ids = [order.pk for order in orders]
+	awarded = set(
+		PointTransaction.objects.filter(
+			order_id__in=order_ids, transaction_type='earn',
+		).values_list('order_id', flat=True)
+	)
+	orders = [order for order in orders if order.pk not in awarded]
+
+	rules = load_rules({order.store_id for order in orders})
+
+	earning = []
+	for order in orders:
+		points = points_for(order.total, rules.get(order.store_id, ()))
+		if points:
+			earning.append((order, points))
+	if not earning:
+		return 0
+
+	accounts = get_accounts((order.user_id, order.store_id) for order, _ in earning)
+	return credit_accounts(
+		[
+			(
+				accounts[(order.user_id, order.store_id)],
+				points,
+				f'外帶訂單 {order.pickup_number}',
+				order.pk,
+			)
+			for order, points in earning
+		],
+		batch_size=batch_size,
+	)
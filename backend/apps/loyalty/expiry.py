@@ -0,0 +1,75 @@
+"""
+兌換逾期處理
+
+由 sweep_expired 指令呼叫：超過 expires_at 仍未兌換的記錄轉為 expired，
+退回點數（記錄 adjust 交易）並加回商品存量，每批在同一個交易中以集合式 UPDATE 完成。
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from .ledger import post_transactions
+from .models import PointTransaction, Redemption, RedemptionProduct
+
+
+# 仍可兌換（尚未使用）的狀態
+OPEN_STATUSES = ('pending', 'confirmed')
+
+
+def _increment_grouped(queryset, field, increments):
+	"""{pk: 增量}，相同增量的列合併為一個 UPDATE"""
+	groups = defaultdict(list)
+	for pk, amount in increments.items():
+		groups[amount].append(pk)
+	for amount, pks in groups.items():
+		queryset.filter(pk__in=pks).update(**{field: F(field) + amount})
+
+
+def expire_redemptions(since, until, batch_size=500):
+	"""
+	將 (since, until] 之間到期的兌換轉為逾期，回傳處理筆數
+
+	since 為 None 時處理所有已到期的記錄。
+	"""
+	queryset = Redemption.objects.filter(
+		status__in=OPEN_STATUSES,
+		expires_at__lte=until,
+	)
+	if since is not None:
+		queryset = queryset.filter(expires_at__gt=since)
+
+	total = 0
+	while True:
+		with transaction.atomic():
+			batch = list(
+				queryset.select_for_update(of=('self',))
+				.order_by('pk')
+				.values_list('pk', 'account_id', 'product_id', 'points_used', 'product__title')[:batch_size]
+			)
+			if not batch:
+				return total
+
+			Redemption.objects.filter(pk__in=[row[0] for row in batch]).update(status='expired')
+
+			products = defaultdict(int)
+			for _, _, product_id, _, _ in batch:
+				products[product_id] += 1
+
+			# 退回點數
+			post_transactions([
+				PointTransaction(
+					account_id=account_id,
+					transaction_type='adjust',
+					points=points_used,
+					description=f'兌換逾期退回: {title}',
+					redemption_id=pk,
+				)
+				for pk, account_id, _, points_used, title in batch
+			])
+
+			# 加回存量（不限量的商品不需處理）
+			_increment_grouped(
+				RedemptionProduct.objects.filter(inventory__isnull=False), 'inventory', products
+			)
+		total += len(batch)
@@ -0,0 +1,285 @@
+"""
+點數帳本
+
+所有點數變動都透過這裡：在同一個交易中新增 PointTransaction，並以 F() 運算式更新餘額。
+單筆變動使用 post_transaction；批次加點（訂單發放、兌換逾期退回）使用 post_transactions，
+查詢數不隨筆數增加。
+扣點使用條件式 UPDATE（WHERE available_points >= n），同時兌換的請求會在帳戶列上依序執行
+並重新判斷條件，不需要全域鎖也不會重複扣點。商品存量同樣以條件式 UPDATE 扣除。
+
+帳本是餘額的依據：
+- available_points = 所有交易點數的總和
+- total_points = 獲得（earn）交易點數的總和
+reconcile_loyalty 指令定期比對兩者。
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import CustomerLoyaltyAccount, PointTransaction, Redemption, RedemptionProduct
+
+
+# 兌換碼有效天數
+REDEMPTION_VALID_DAYS = 30
+
+
+class InsufficientPoints(Exception):
+	"""可用點數不足"""
+
+	def __init__(self):
+		super().__init__('點數不足，無法兌換此商品')
+
+
+class OutOfInventory(Exception):
+	"""兌換商品存量不足"""
+
+	def __init__(self):
+		super().__init__('商品庫存不足')
+
+
+def post_transaction(account_id, points, transaction_type, description='', order=None, redemption=None):
+	"""
+	記錄一筆點數交易並更新帳戶餘額，回傳 PointTransaction
+
+	points 為負數時，可用點數不足會拋出 InsufficientPoints（不寫入任何資料）。
+	"""
+	updates = {
+		'available_points': F('available_points') + points,
+		'updated_at': timezone.now(),
+	}
+	if transaction_type == 'earn':
+		updates['total_points'] = F('total_points') + points
+
+	with transaction.atomic():
+		accounts = CustomerLoyaltyAccount.objects.filter(pk=account_id)
+		if points < 0:
+			accounts = accounts.filter(available_points__gte=-points)
+		if not accounts.update(**updates):
+			raise InsufficientPoints()
+
+		return PointTransaction.objects.create(
+			account_id=account_id,
+			transaction_type=transaction_type,
+			points=points,
+			description=description,
+			order=order,
+			redemption=redemption,
+		)
+
+
+def post_transactions(entries, batch_size=None):
+	"""
+	批次記錄點數交易並更新帳戶餘額，回傳寫入的交易數
+
+	entries 為尚未儲存的 PointTransaction，只接受加點的交易（扣點需逐筆以 post_transaction 檢查餘額）。
+	同一帳戶的點數先加總，增量相同的帳戶合併為一個 UPDATE。
+	"""
+	entries = list(entries)
+	if not entries:
+		return 0
+	if any(entry.points < 0 for entry in entries):
+		raise ValueError('批次交易不可扣點')
+
+	available = defaultdict(int)
+	earned = defaultdict(int)
+	for entry in entries:
+		available[entry.account_id] += entry.points
+		if entry.transaction_type == 'earn':
+			earned[entry.account_id] += entry.points
+
+	groups = defaultdict(list)
+	for account_id, points in available.items():
+		groups[(points, earned[account_id])].append(account_id)
+
+	now = timezone.now()
+	with transaction.atomic():
+		PointTransaction.objects.bulk_create(entries, batch_size=batch_size)
+		for (points, earned_points), account_ids in groups.items():
+			updates = {
+				'available_points': F('available_points') + points,
+				'updated_at': now,
+			}
+			if earned_points:
+				updates['total_points'] = F('total_points') + earned_points
+			CustomerLoyaltyAccount.objects.filter(pk__in=account_ids).update(**updates)
+	return len(entries)
+
+
+def take_inventory(product_id):
+	"""扣除一份兌換商品存量（不限量的商品不需扣除）"""
+	updated = RedemptionProduct.objects.filter(
+		Q(inventory__isnull=True) | Q(inventory__gt=0),
+		pk=product_id,
+	).update(
+		inventory=F('inventory') - 1,
+		updated_at=timezone.now(),
+	)
+	if not updated:
+		raise OutOfInventory()
+
+
+def restore_inventory(product_id, count=1):
+	"""加回兌換商品存量"""
+	RedemptionProduct.objects.filter(pk=product_id, inventory__isnull=False).update(
+		inventory=F('inventory') + count,
+		updated_at=timezone.now(),
+	)
+
+
+def redeem(account, product):
+	"""
+	以點數兌換商品，回傳 Redemption
+
+	點數不足拋出 InsufficientPoints，存量不足拋出 OutOfInventory，兩者皆整筆回滾。
+	"""
+	with transaction.atomic():
+		redemption = Redemption.objects.create(
+			account=account,
+			product=product,
+			points_used=product.required_points,
+			expires_at=timezone.now() + timedelta(days=REDEMPTION_VALID_DAYS),
+		)
+		post_transaction(
+			account.pk,
+			-product.required_points,
+			'redeem',
+			description=f'兌換商品: {product.title}',
+			redemption=redemption,
+		)
+		take_inventory(product.pk)
+	return redemption
+
+
+def cancel_redemption(redemption):
+	"""
+	取消待確認的兌換並退回點數與存量
+
+	以條件式 UPDATE 轉換狀態，只有成功轉換的那一次會退回；回傳是否由這次呼叫完成取消。
+	"""
+	with transaction.atomic():
+		cancelled = Redemption.objects.filter(
+			pk=redemption.pk,
+			status='pending',
+		).update(status='cancelled', updated_at=timezone.now())
+		if not cancelled:
+			return False
+
+		post_transaction(
+			redemption.account_id,
+			redemption.points_used,
+			'adjust',
+			description=f'取消兌換: {redemption.product.title}',
+			redemption=redemption,
+		)
+		restore_inventory(redemption.product_id)
+
+	redemption.status = 'cancelled'
+	return True
+
+
+# 商家推進兌換時允許的來源狀態
+REDEMPTION_TRANSITIONS = {
+	'confirmed': ('pending',),
+	'redeemed': ('pending', 'confirmed'),
+}
+
+
+def advance_redemption(redemption, new_status):
+	"""
+	將兌換轉為已確認或已兌換，回傳是否由這次呼叫完成轉換
+
+	以條件式 UPDATE 只轉換仍在允許來源狀態的兌換，不會覆寫同時發生的取消。
+	"""
+	if new_status not in REDEMPTION_TRANSITIONS:
+		raise ValueError(f'無效的兌換狀態: {new_status}')
+
+	fields = {'status': new_status, 'updated_at': timezone.now()}
+	if new_status == 'redeemed':
+		fields['redeemed_at'] = fields['updated_at']
+
+	updated = Redemption.objects.filter(
+		pk=redemption.pk,
+		status__in=REDEMPTION_TRANSITIONS[new_status],
+	).update(**fields)
+	if not updated:
+		return False
+
+	for field, value in fields.items():
+		setattr(redemption, field, value)
+	return True
+
+
+def _ledger_sum(**filters):
+	return Coalesce(
+		Subquery(
+			PointTransaction.objects.filter(account=OuterRef('pk'), **filters)
+			.order_by()
+			.values('account')
+			.annotate(total=Sum('points'))
+			.values('total')
+		),
+		Value(0),
+	)
+
+
+def with_ledger_totals(queryset):
+	"""標註帳本計算出的 ledger_available / ledger_total 與交易筆數"""
+	return queryset.annotate(
+		ledger_available=_ledger_sum(),
+		ledger_total=_ledger_sum(transaction_type='earn'),
+		ledger_count=Count('transactions'),
+	)
+
+
+def find_mismatches(queryset=None):
+	"""餘額與帳本不一致的帳戶"""
+	if queryset is None:
+		queryset = CustomerLoyaltyAccount.objects.all()
+	return with_ledger_totals(queryset).filter(
+		~Q(available_points=F('ledger_available')) | ~Q(total_points=F('ledger_total'))
+	)
+
+
+def backfill_opening_balances(account_ids):
+	"""
+	為沒有任何交易記錄的帳戶補上期初交易（帳本導入前的既有餘額）
+
+	回傳新增的交易數。
+	"""
+	accounts = CustomerLoyaltyAccount.objects.filter(
+		pk__in=account_ids,
+	).annotate(ledger_count=Count('transactions')).filter(ledger_count=0)
+
+	opening = []
+	for account_id, total_points, available_points in accounts.values_list(
+		'pk', 'total_points', 'available_points'
+	):
+		if total_points:
+			opening.append(PointTransaction(
+				account_id=account_id,
+				transaction_type='earn',
+				points=total_points,
+				description='期初累積點數',
+			))
+		if available_points != total_points:
+			opening.append(PointTransaction(
+				account_id=account_id,
+				transaction_type='adjust',
+				points=available_points - total_points,
+				description='期初餘額調整',
+			))
+	PointTransaction.objects.bulk_create(opening)
+	return len(opening)
+
+
+def apply_ledger_balances(account_ids):
+	"""以帳本總和覆寫帳戶餘額（單一集合式 UPDATE），回傳更新的帳戶數"""
+	return CustomerLoyaltyAccount.objects.filter(pk__in=account_ids).update(
+		available_points=_ledger_sum(),
+		total_points=_ledger_sum(transaction_type='earn'),
+		updated_at=timezone.now(),
+	)
@@ -0,0 +1,53 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.loyalty.earning import DEFAULT_BATCH_SIZE, award_order_points
+from apps.orders.models import TakeoutOrder
+
+
+class Command(BaseCommand):
+	help = '為尚未發放點數的已完成外帶訂單補發點數（例如新增點數規則或促銷活動後）'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--store', type=int, help='只處理指定店家')
+		parser.add_argument('--since', help='只處理此日期（YYYY-MM-DD）之後建立的訂單')
+		parser.add_argument(
+			'--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+			help=f'每批處理的訂單數（預設 {DEFAULT_BATCH_SIZE}）',
+		)
+
+	def handle(self, *args, **options):
+		orders = TakeoutOrder.objects.filter(user__isnull=False, status='completed').exclude(
+			point_transactions__transaction_type='earn',
+		)
+		if options['store']:
+			orders = orders.filter(store_id=options['store'])
+		if options['since']:
+			try:
+				since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+			except ValueError:
+				raise CommandError('--since 格式應為 YYYY-MM-DD')
+			orders = orders.filter(
+				created_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+			)
+
+		batch_size = options['batch_size']
+		last_pk = 0
+		processed = awarded = 0
+		while True:
+			batch = list(
+				orders.filter(pk__gt=last_pk)
+				.order_by('pk')
+				.only('pk', 'store_id', 'user_id', 'status', 'pickup_number', 'total')[:batch_size]
+			)
+			if not batch:
+				break
+			last_pk = batch[-1].pk
+			processed += len(batch)
+			awarded += award_order_points(batch, batch_size=batch_size)
+
+		self.stdout.write(self.style.SUCCESS(
+			f'已檢查 {processed} 筆訂單，發放 {awarded} 筆點數交易'
+		))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from apps.loyalty.earning import recalculate_levels
+from apps.loyalty.ledger import apply_ledger_balances, backfill_opening_balances, find_mismatches
+from apps.loyalty.models import CustomerLoyaltyAccount
+
+
+REPORT_FIELDS = (
+	'pk', 'store_id', 'user__username',
+	'available_points', 'ledger_available',
+	'total_points', 'ledger_total', 'ledger_count',
+)
+
+
+class Command(BaseCommand):
+	help = '比對會員帳戶餘額與點數交易帳本，列出（並可修正）不一致的帳戶'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--store', type=int, help='只檢查指定店家')
+		parser.add_argument(
+			'--backfill', action='store_true',
+			help='為沒有任何交易記錄的帳戶補上期初交易（帳本導入前的既有餘額）',
+		)
+		parser.add_argument(
+			'--fix', action='store_true',
+			help='以帳本總和覆寫不一致帳戶的餘額',
+		)
+
+	def handle(self, *args, **options):
+		accounts = CustomerLoyaltyAccount.objects.all()
+		if options['store']:
+			accounts = accounts.filter(store_id=options['store'])
+
+		mismatches = list(find_mismatches(accounts).values(*REPORT_FIELDS))
+
+		if options['backfill'] and mismatches:
+			created = backfill_opening_balances([row['pk'] for row in mismatches if not row['ledger_count']])
+			self.stdout.write(f'已補上 {created} 筆期初交易')
+			mismatches = list(find_mismatches(accounts).values(*REPORT_FIELDS))
+
+		for row in mismatches:
+			details = []
+			if row['available_points'] != row['ledger_available']:
+				details.append(f"可用 {row['available_points']}，帳本 {row['ledger_available']}")
+			if row['total_points'] != row['ledger_total']:
+				details.append(f"累計 {row['total_points']}，帳本 {row['ledger_total']}")
+			self.stdout.write(
+				f"帳戶 {row['pk']}（店家 {row['store_id']} / {row['user__username']}）: {'；'.join(details)}"
+			)
+
+		if not mismatches:
+			self.stdout.write(self.style.SUCCESS('所有帳戶餘額與帳本一致'))
+			return
+
+		if options['fix']:
+			account_ids = [row['pk'] for row in mismatches]
+			updated = apply_ledger_balances(account_ids)
+			recalculate_levels(CustomerLoyaltyAccount.objects.filter(pk__in=account_ids))
+			self.stdout.write(self.style.SUCCESS(f'已依帳本修正 {updated} 個帳戶'))
+		else:
+			self.stdout.write(self.style.WARNING(
+				f'共 {len(mismatches)} 個帳戶不一致（使用 --fix 依帳本修正）'
+			))
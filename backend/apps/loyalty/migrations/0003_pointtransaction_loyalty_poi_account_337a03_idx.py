@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty', '0002_alter_membershiplevel_id_alter_pointrule_id_and_more'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pointtransaction',
+            index=models.Index(fields=['account', '-created_at', '-id'], name='loyalty_poi_account_337a03_idx'),
+        ),
+    ]
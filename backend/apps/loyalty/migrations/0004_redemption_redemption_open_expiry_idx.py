@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty', '0003_pointtransaction_loyalty_poi_account_337a03_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='redemption',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['expires_at'], name='redemption_open_expiry_idx'),
+        ),
+    ]
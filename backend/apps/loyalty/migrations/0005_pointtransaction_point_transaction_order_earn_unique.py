@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty', '0004_redemption_redemption_open_expiry_idx'),
+        ('orders', '0002_takeoutorder_user'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='pointtransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('order__isnull', False), ('transaction_type', 'earn')), fields=('order',), name='point_transaction_order_earn_unique'),
+        ),
+    ]
@@ -112,16 +112,11 @@ class CustomerLoyaltyAccount(models.Model):
 		return f"{self.user.username} @ {self.store.name} ({self.available_points} pts)"
 
 	def update_level(self):
-		"""根據累計總點數更新會員等級"""
-		levels = MembershipLevel.objects.filter(
-			store=self.store,
-			active=True,
-			threshold_points__lte=self.total_points
-		).order_by('-threshold_points')
-		
-		if levels.exists():
-			self.current_level = levels.first()
-			self.save()
+		"""根據累計總點數更新會員等級（批次更新請使用 earning.recalculate_levels）"""
+		from .earning import recalculate_levels
+
+		recalculate_levels(CustomerLoyaltyAccount.objects.filter(pk=self.pk))
+		self.refresh_from_db(fields=['current_level', 'updated_at'])
 
 
 class PointTransaction(models.Model):
@@ -157,6 +152,18 @@ class PointTransaction(models.Model):
 		verbose_name = '點數交易記錄'
 		verbose_name_plural = '點數交易記錄'
 		ordering = ['-created_at']
+		indexes = [
+			# 交易記錄列表的游標分頁
+			models.Index(fields=['account', '-created_at', '-id']),
+		]
+		constraints = [
+			# 每筆訂單只發放一次點數
+			models.UniqueConstraint(
+				fields=['order'],
+				condition=models.Q(transaction_type='earn', order__isnull=False),
+				name='point_transaction_order_earn_unique',
+			),
+		]
 
 	def __str__(self):
 		sign = '+' if self.points >= 0 else ''
@@ -196,6 +203,14 @@ class Redemption(models.Model):
 		verbose_name = '兌換記錄'
 		verbose_name_plural = '兌換記錄'
 		ordering = ['-created_at']
+		indexes = [
+			# 逾期清理只掃描尚未使用的兌換
+			models.Index(
+				fields=['expires_at'],
+				condition=models.Q(status__in=['pending', 'confirmed']),
+				name='redemption_open_expiry_idx',
+			),
+		]
 
 	def __str__(self):
 		return f"{self.account.user.username} - {self.product.title} ({self.redemption_code})"
@@ -77,7 +77,11 @@ class RedemptionSerializer(serializers.ModelSerializer):
 			'points_used', 'status', 'status_display', 'redemption_code', 'expires_at',
 			'redeemed_at', 'notes', 'created_at', 'updated_at'
 		]
-		read_only_fields = ['id', 'redemption_code', 'created_at', 'updated_at']
+		# 點數、帳戶與狀態只能經由 ledger 的兌換、取消與狀態轉換變更，只開放修改備註
+		read_only_fields = [
+			'id', 'account', 'product', 'points_used', 'status', 'redemption_code',
+			'expires_at', 'redeemed_at', 'created_at', 'updated_at'
+		]
 
 
 class RedemptionCreateSerializer(serializers.ModelSerializer):
@@ -87,6 +91,8 @@ class RedemptionCreateSerializer(serializers.ModelSerializer):
 		fields = ['product']
 
 	def create(self, validated_data):
+		from .ledger import InsufficientPoints, OutOfInventory, redeem
+
 		user = self.context['request'].user
 		product = validated_data['product']
 		
@@ -96,41 +102,8 @@ class RedemptionCreateSerializer(serializers.ModelSerializer):
 			store=product.store
 		)
 		
-		# 檢查點數是否足夠
-		if account.available_points < product.required_points:
-			raise serializers.ValidationError('點數不足，無法兌換此商品')
-		
-		# 檢查庫存
-		if product.inventory is not None and product.inventory <= 0:
-			raise serializers.ValidationError('商品庫存不足')
-		
-		# 創建兌換記錄
-		from datetime import timedelta
-		from django.utils import timezone
-		
-		redemption = Redemption.objects.create(
-			account=account,
-			product=product,
-			points_used=product.required_points,
-			expires_at=timezone.now() + timedelta(days=30)  # 30天有效期
-		)
-		
-		# 扣除點數
-		account.available_points -= product.required_points
-		account.save()
-		
-		# 創建點數交易記錄
-		PointTransaction.objects.create(
-			account=account,
-			transaction_type='redeem',
-			points=-product.required_points,
-			description=f'兌換商品: {product.title}',
-			redemption=redemption
-		)
-		
-		# 扣除庫存
-		if product.inventory is not None:
-			product.inventory -= 1
-			product.save()
-		
-		return redemption
+		# 扣點與扣庫存皆為條件式 UPDATE，與兌換記錄在同一個交易中完成
+		try:
+			return redeem(account, product)
+		except (InsufficientPoints, OutOfInventory) as e:
+			raise serializers.ValidationError(str(e))
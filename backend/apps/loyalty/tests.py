@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.stores.models import Store
+from apps.users.models import Merchant, User
+
+from .models import CustomerLoyaltyAccount, Redemption, RedemptionProduct
+
+
+class RedemptionListQueryCountTests(TestCase):
+	"""
+	兌換紀錄列表的查詢數不應隨筆數增加
+
+	序列化器讀取的關聯（product、account.user）需由 get_queryset 一次載入。
+	"""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.merchant_user = User.objects.create_user(
+			email='merchant@example.com', password='x', username='merchant',
+			firebase_uid='merchant', user_type='merchant',
+		)
+		merchant = Merchant.objects.create(user=cls.merchant_user, company_account='00000001')
+		cls.store = Store.objects.create(
+			merchant=merchant, name='店家', address='地址', phone='0212345678',
+		)
+		cls.customer = cls.create_customer(0)
+		cls.account = CustomerLoyaltyAccount.objects.create(user=cls.customer, store=cls.store)
+
+	@staticmethod
+	def create_customer(index):
+		return User.objects.create_user(
+			email=f'customer{index}@example.com', password='x', username=f'customer{index}',
+			firebase_uid=f'customer{index}', user_type='customer',
+		)
+
+	def create_redemptions(self, count, account=None):
+		start = Redemption.objects.count()
+		for index in range(start, start + count):
+			product = RedemptionProduct.objects.create(
+				store=self.store, title=f'商品{index}', required_points=10,
+			)
+			Redemption.objects.create(
+				account=account or CustomerLoyaltyAccount.objects.create(
+					user=self.create_customer(index + 1), store=self.store,
+				),
+				product=product,
+				points_used=product.required_points,
+			)
+
+	def assertConstantListQueries(self, client, url, create_rows):
+		create_rows(1)
+		with CaptureQueriesContext(connection) as queries:
+			response = client.get(url)
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(response.data['results']), 1)
+
+		create_rows(4)
+		with self.assertNumQueries(len(queries)):
+			response = client.get(url)
+		self.assertEqual(len(response.data['results']), 5)
+
+	def test_customer_list(self):
+		client = APIClient()
+		client.force_authenticate(self.customer)
+		self.assertConstantListQueries(
+			client, '/api/customer/my-redemptions/',
+			lambda count: self.create_redemptions(count, account=self.account),
+		)
+
+	def test_merchant_list(self):
+		client = APIClient()
+		client.force_authenticate(self.merchant_user)
+		self.assertConstantListQueries(
+			client, '/api/merchant/redemption-management/', self.create_redemptions,
+		)
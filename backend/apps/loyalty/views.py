@@ -1,10 +1,12 @@
-from rest_framework import viewsets, permissions, serializers, status
+from rest_framework import mixins, viewsets, permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import (
 	PointRule, MembershipLevel, RedemptionProduct,
 	CustomerLoyaltyAccount, PointTransaction, Redemption
 )
+from .earning import recalculate_levels
+from .ledger import advance_redemption, cancel_redemption
 from .serializers import (
 	PointRuleSerializer,
 	MembershipLevelSerializer,
@@ -51,6 +53,8 @@ class MerchantMembershipLevelViewSet(viewsets.ModelViewSet, MerchantOnlyMixin):
 	queryset = MembershipLevel.objects.all()
 	serializer_class = MembershipLevelSerializer
 	permission_classes = [permissions.IsAuthenticated]
+	cursor_ordering = ('rank', '-threshold_points', 'id')
+	page_size = 50
 
 	def get_queryset(self):
 		store = self.get_store()
@@ -63,6 +67,20 @@ class MerchantMembershipLevelViewSet(viewsets.ModelViewSet, MerchantOnlyMixin):
 		if not store:
 			raise serializers.ValidationError('User is not a merchant or store not configured')
 		serializer.save(store=store)
+		self._recalculate_levels(store)
+
+	def perform_update(self, serializer):
+		level = serializer.save()
+		self._recalculate_levels(level.store)
+
+	def perform_destroy(self, instance):
+		store = instance.store
+		instance.delete()
+		self._recalculate_levels(store)
+
+	def _recalculate_levels(self, store):
+		# 門檻或啟用狀態變動後，以單一 UPDATE 重新計算該店所有會員的等級
+		recalculate_levels(CustomerLoyaltyAccount.objects.filter(store=store))
 
 
 class MerchantRedemptionProductViewSet(viewsets.ModelViewSet, MerchantOnlyMixin):
@@ -96,29 +114,41 @@ class CustomerLoyaltyAccountViewSet(viewsets.ReadOnlyModelViewSet):
 	permission_classes = [permissions.IsAuthenticated]
 
 	def get_queryset(self):
-		return CustomerLoyaltyAccount.objects.filter(user=self.request.user)
+		return CustomerLoyaltyAccount.objects.filter(
+			user=self.request.user
+		).select_related('store', 'current_level')
 
 	@action(detail=True, methods=['get'])
 	def transactions(self, request, pk=None):
 		"""獲取特定會員帳戶的點數交易記錄"""
 		account = self.get_object()
 		transactions = PointTransaction.objects.filter(account=account)
-		serializer = PointTransactionSerializer(transactions, many=True)
-		return Response(serializer.data)
+		page = self.paginate_queryset(transactions)
+		serializer = PointTransactionSerializer(page, many=True)
+		return self.get_paginated_response(serializer.data)
 
 
 class PointTransactionViewSet(viewsets.ReadOnlyModelViewSet):
 	"""點數交易記錄視圖：顧客查看自己的點數交易歷史"""
 	serializer_class = PointTransactionSerializer
 	permission_classes = [permissions.IsAuthenticated]
+	page_size = 50
+	max_page_size = 200
 
 	def get_queryset(self):
 		user_accounts = CustomerLoyaltyAccount.objects.filter(user=self.request.user)
 		return PointTransaction.objects.filter(account__in=user_accounts)
 
 
-class CustomerRedemptionViewSet(viewsets.ModelViewSet):
-	"""顧客兌換視圖：顧客進行商品兌換和查看兌換記錄"""
+class CustomerRedemptionViewSet(mixins.CreateModelMixin,
+								mixins.ListModelMixin,
+								mixins.RetrieveModelMixin,
+								viewsets.GenericViewSet):
+	"""
+	顧客兌換視圖：顧客進行商品兌換和查看兌換記錄
+
+	不提供修改與刪除，狀態只能經由 cancel 變更（點數退回由 ledger 處理）。
+	"""
 	permission_classes = [permissions.IsAuthenticated]
 
 	def get_serializer_class(self):
@@ -128,7 +158,9 @@ class CustomerRedemptionViewSet(viewsets.ModelViewSet):
 
 	def get_queryset(self):
 		user_accounts = CustomerLoyaltyAccount.objects.filter(user=self.request.user)
-		return Redemption.objects.filter(account__in=user_accounts)
+		return Redemption.objects.filter(
+			account__in=user_accounts
+		).select_related('product', 'account__user')
 
 	@action(detail=True, methods=['post'])
 	def cancel(self, request, pk=None):
@@ -141,35 +173,27 @@ class CustomerRedemptionViewSet(viewsets.ModelViewSet):
 				status=status.HTTP_400_BAD_REQUEST
 			)
 		
-		# 退回點數
-		account = redemption.account
-		account.available_points += redemption.points_used
-		account.save()
-		
-		# 創建退回點數的交易記錄
-		PointTransaction.objects.create(
-			account=account,
-			transaction_type='adjust',
-			points=redemption.points_used,
-			description=f'取消兌換: {redemption.product.title}',
-			redemption=redemption
-		)
-		
-		# 退回庫存
-		if redemption.product.inventory is not None:
-			redemption.product.inventory += 1
-			redemption.product.save()
-		
-		# 更新兌換狀態
-		redemption.status = 'cancelled'
-		redemption.save()
+		# 以條件式 UPDATE 轉換狀態，重複取消不會重複退回點數與庫存
+		if not cancel_redemption(redemption):
+			return Response(
+				{'error': '只能取消待確認狀態的兌換'},
+				status=status.HTTP_400_BAD_REQUEST
+			)
 		
 		serializer = self.get_serializer(redemption)
 		return Response(serializer.data)
 
 
-class MerchantRedemptionManagementViewSet(viewsets.ModelViewSet, MerchantOnlyMixin):
-	"""商家兌換管理視圖：商家查看和管理顧客的兌換記錄"""
+class MerchantRedemptionManagementViewSet(mixins.ListModelMixin,
+										  mixins.RetrieveModelMixin,
+										  mixins.UpdateModelMixin,
+										  viewsets.GenericViewSet,
+										  MerchantOnlyMixin):
+	"""
+	商家兌換管理視圖：商家查看和管理顧客的兌換記錄
+
+	修改只開放備註，狀態經由 confirm / complete 以條件式 UPDATE 轉換。
+	"""
 	serializer_class = RedemptionSerializer
 	permission_classes = [permissions.IsAuthenticated]
 
@@ -177,40 +201,33 @@ class MerchantRedemptionManagementViewSet(viewsets.ModelViewSet, MerchantOnlyMix
 		store = self.get_store()
 		if not store:
 			return Redemption.objects.none()
-		return Redemption.objects.filter(product__store=store)
+		return Redemption.objects.filter(
+			product__store=store
+		).select_related('product', 'account__user')
 
 	@action(detail=True, methods=['post'])
 	def confirm(self, request, pk=None):
 		"""確認兌換"""
 		redemption = self.get_object()
-		if redemption.status != 'pending':
+		if not advance_redemption(redemption, 'confirmed'):
 			return Response(
 				{'error': '此兌換已被處理'},
 				status=status.HTTP_400_BAD_REQUEST
 			)
 		
-		redemption.status = 'confirmed'
-		redemption.save()
-		
 		serializer = self.get_serializer(redemption)
 		return Response(serializer.data)
 
 	@action(detail=True, methods=['post'])
 	def complete(self, request, pk=None):
 		"""完成兌換（顧客已取貨）"""
-		from django.utils import timezone
-		
 		redemption = self.get_object()
-		if redemption.status not in ['pending', 'confirmed']:
+		if not advance_redemption(redemption, 'redeemed'):
 			return Response(
 				{'error': '無法完成此兌換'},
 				status=status.HTTP_400_BAD_REQUEST
 			)
 		
-		redemption.status = 'redeemed'
-		redemption.redeemed_at = timezone.now()
-		redemption.save()
-		
 		serializer = self.get_serializer(redemption)
 		return Response(serializer.data)
 
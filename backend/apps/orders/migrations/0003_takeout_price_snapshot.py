@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:44
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_price_snapshot(apps, schema_editor):
+    """既有品項以目前商品價格補上單價，再加總為訂單金額"""
+    Product = apps.get_model('products', 'Product')
+    TakeoutOrder = apps.get_model('orders', 'TakeoutOrder')
+    TakeoutOrderItem = apps.get_model('orders', 'TakeoutOrderItem')
+
+    TakeoutOrderItem.objects.update(
+        unit_price=Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('price')[:1])
+    )
+    item_totals = (
+        TakeoutOrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(total=Sum(F('quantity') * F('unit_price')))
+        .values('total')
+    )
+    TakeoutOrder.objects.update(
+        total=Coalesce(Subquery(item_totals), Value(Decimal('0')), output_field=models.DecimalField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_takeoutorder_user'),
+        ('products', '0004_takeoutorder_takeoutorderitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='takeoutorder',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='takeoutorderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_price_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:46
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def backfill_pickup_date(apps, schema_editor):
+    """既有訂單以取餐時間補上取餐日（序號維持空值，保留原本的取餐號碼）"""
+    TakeoutOrder = apps.get_model('orders', 'TakeoutOrder')
+    TakeoutOrder.objects.filter(pickup_date__isnull=True).update(pickup_date=TruncDate('pickup_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_takeout_price_snapshot'),
+        ('stores', '0011_store_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='takeoutorder',
+            name='pickup_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='takeoutorder',
+            name='pickup_sequence',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='takeoutorder',
+            name='pickup_number',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.RunPython(backfill_pickup_date, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='takeoutorder',
+            constraint=models.UniqueConstraint(fields=('store', 'pickup_date', 'pickup_sequence'), name='takeout_order_pickup_seq_unique'),
+        ),
+    ]
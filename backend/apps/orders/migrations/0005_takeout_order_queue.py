@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def backfill_status(apps, schema_editor):
+    """
+    既有訂單在導入狀態前沒有任何追蹤：取餐時間已過者視為已完成，
+    避免舊訂單全部出現在出餐佇列中；updated_at 以建立時間為準。
+    """
+    TakeoutOrder = apps.get_model('orders', 'TakeoutOrder')
+    TakeoutOrder.objects.filter(pickup_at__lt=timezone.now()).update(status='completed')
+    TakeoutOrder.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_takeout_pickup_sequence'),
+        ('stores', '0011_store_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='takeoutorder',
+            name='status',
+            field=models.CharField(choices=[('pending', '待處理'), ('preparing', '製作中'), ('ready', '可取餐'), ('completed', '已完成'), ('cancelled', '已取消')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='takeoutorder',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='takeoutorder',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'preparing', 'ready'))), fields=['store', 'pickup_at'], name='takeout_order_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='takeoutorder',
+            index=models.Index(fields=['store', 'updated_at'], name='takeout_order_changes_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_takeout_order_queue'),
+        ('stores', '0011_store_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='takeoutorder',
+            index=models.Index(fields=['store', '-created_at', '-id'], name='takeout_order_created_idx'),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.db import models
 from apps.stores.models import Store
 from apps.products.models import Product
+from apps.common.sequences import allocate
+
+# 仍在出餐佇列中的訂單狀態
+OPEN_STATUSES = ('pending', 'preparing', 'ready')
 
 class TakeoutOrder(models.Model):
     PAYMENT_CHOICES = (
@@ -8,18 +13,72 @@ class TakeoutOrder(models.Model):
         ('credit_card', '信用卡'),
         ('line_pay', 'LINE Pay'),
     )
+    STATUS_CHOICES = (
+        ('pending', '待處理'),
+        ('preparing', '製作中'),
+        ('ready', '可取餐'),
+        ('completed', '已完成'),
+        ('cancelled', '已取消'),
+    )
     store = models.ForeignKey(
         Store,
         on_delete=models.CASCADE,
         related_name='order_takeout_orders',
     )
+    # 登入的顧客下單時記錄，用於累積會員點數；訪客訂單為空
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='takeout_orders',
+    )
     customer_name = models.CharField(max_length=50)
     customer_phone = models.CharField(max_length=20)
     pickup_at = models.DateTimeField()
     payment_method = models.CharField(max_length=20, choices=PAYMENT_CHOICES)
     notes = models.TextField(blank=True)
-    pickup_number = models.CharField(max_length=10, unique=True)
+    # 取餐號碼：每家店每個取餐日從 001 起依序編號（舊訂單為隨機碼）
+    pickup_number = models.CharField(max_length=10)
+    pickup_date = models.DateField(null=True, blank=True)
+    pickup_sequence = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # 下單時依品項單價計算的總金額
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # 商家出餐佇列以此欄位增量輪詢，狀態變動時必須一併更新
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['store', 'pickup_date', 'pickup_sequence'],
+                name='takeout_order_pickup_seq_unique',
+            ),
+        ]
+        indexes = [
+            # 出餐佇列：店家進行中的訂單依取餐時間排序
+            models.Index(
+                fields=['store', 'pickup_at'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='takeout_order_queue_idx',
+            ),
+            # 增量輪詢：店家在游標之後變動的訂單
+            models.Index(fields=['store', 'updated_at'], name='takeout_order_changes_idx'),
+            # 訂單列表的游標分頁（依建立時間）
+            models.Index(fields=['store', '-created_at', '-id'], name='takeout_order_created_idx'),
+        ]
+
+    @staticmethod
+    def allocate_pickup_number(store_id, pickup_date):
+        """
+        配置該店在取餐日的下一個取餐序號，回傳 (序號, 取餐號碼)
+
+        序號來自 DailySequence 計數列（key 為 pickup:{store_id}）的原子 UPDATE，
+        計數列會鎖定到下單交易結束，同一家店同時下單也不會重複或需要重試。
+        """
+        sequence = allocate(f'pickup:{store_id}', date=pickup_date)
+        return sequence, f'{sequence:03d}'
 
 class TakeoutOrderItem(models.Model):
     order = models.ForeignKey(
@@ -33,3 +92,5 @@ class TakeoutOrderItem(models.Model):
         related_name='order_takeout_items',
     )
     quantity = models.PositiveIntegerField()
+    # 下單時的商品單價快照，之後商品改價不影響既有訂單
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -0,0 +1,125 @@
+"""
+商家出餐佇列
+
+廚房平板每隔幾秒輪詢一次，因此每次輪詢都應是單一的小型索引查詢：
+- 不帶游標：店家進行中（OPEN_STATUSES）的訂單依取餐時間排序
+  （對應部分索引 takeout_order_queue_idx）
+- 帶 ?since=<cursor>：只回傳游標之後新增或變動的訂單，包含已完成與取消的訂單，
+  讓平板將其移出畫面（對應索引 takeout_order_changes_idx）
+
+游標為查詢當下的資料庫時間（毫秒），下次輪詢原樣帶回即可。updated_at 在交易提交前就已決定，
+為了不漏掉查詢當下尚未提交的變動，輪詢時會往前多取 ORDER_QUEUE_CURSOR_OVERLAP 秒（預設 5），
+同一筆訂單可能重複出現，客戶端應以 id 更新畫面上的資料。
+
+限制：
+- 游標使用資料庫時鐘，平板不可用自己的時間產生或調整游標
+- 狀態變動以資料庫時間寫入 updated_at；新訂單由應用程式主機的 auto_now 寫入，
+  主機與資料庫的時鐘誤差加上下單交易的時間需小於重疊秒數，否則該筆變動可能漏掉
+- 平板離線較久（例如隔夜）後應不帶游標重新取得進行中的訂單，
+  舊游標仍可使用，但會一次取回期間所有變動的訂單
+
+狀態只能往出餐流程的後段推進（可跳過中間狀態），進行中的訂單可隨時取消；
+轉換以條件式 UPDATE 完成，同時操作的平板不會把狀態改回去。
+登入顧客的訂單在轉換為 completed 時才累積點數，取消的訂單不會發放點數。
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.common.events import publish_store_event
+
+from .models import OPEN_STATUSES, TakeoutOrder, TakeoutOrderItem
+
+
+# 出餐流程（依序推進）
+STATUS_FLOW = ('pending', 'preparing', 'ready', 'completed')
+
+
+class InvalidCursor(ValueError):
+    """游標格式錯誤"""
+
+
+def make_cursor(moment):
+    return str(int(moment.timestamp() * 1000))
+
+
+def parse_cursor(value):
+    try:
+        return datetime.fromtimestamp(int(value) / 1000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        # 超出 datetime 可表示範圍的數字也視為格式錯誤
+        raise InvalidCursor('since 游標格式錯誤')
+
+
+def cursor_overlap():
+    return timedelta(seconds=getattr(settings, 'ORDER_QUEUE_CURSOR_OVERLAP', 5))
+
+
+def db_now():
+    """資料庫目前的時間（各主機共用同一個時鐘）"""
+    if connection.vendor != 'postgresql':
+        return timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT STATEMENT_TIMESTAMP()')
+        return cursor.fetchone()[0]
+
+
+def order_queue(orders, since=None):
+    """
+    回傳 (訂單 queryset, 下次輪詢的游標)
+
+    orders 為已限定店家的 TakeoutOrder queryset。
+    """
+    cursor = make_cursor(db_now())
+    if since is None:
+        orders = orders.filter(status__in=OPEN_STATUSES)
+    else:
+        orders = orders.filter(updated_at__gt=since - cursor_overlap())
+
+    items = TakeoutOrderItem.objects.select_related('product').only(
+        'order_id', 'product_id', 'quantity', 'unit_price', 'product__name'
+    )
+    orders = orders.prefetch_related(Prefetch('items', queryset=items)).order_by(
+        'pickup_at', 'pickup_sequence', 'pk'
+    )
+    return orders, cursor
+
+
+def allowed_sources(new_status):
+    """可轉換為 new_status 的目前狀態"""
+    if new_status == 'cancelled':
+        return OPEN_STATUSES
+    if new_status not in STATUS_FLOW:
+        return ()
+    return STATUS_FLOW[:STATUS_FLOW.index(new_status)]
+
+
+def change_status(order, new_status):
+    """
+    轉換訂單狀態，回傳是否由這次呼叫完成轉換
+
+    目前狀態不允許轉換（例如已完成或已被其他平板推進）時回傳 False。
+    """
+    from apps.loyalty.earning import award_order_points
+
+    now = db_now()
+    with transaction.atomic():
+        updated = TakeoutOrder.objects.filter(
+            pk=order.pk,
+            status__in=allowed_sources(new_status),
+        ).update(status=new_status, updated_at=now)
+        if not updated:
+            return False
+
+        order.status = new_status
+        order.updated_at = now
+        if new_status == 'completed':
+            # 只有這次呼叫完成轉換時才發放，同一筆訂單不會重複累積
+            award_order_points([order])
+
+    # 條件式 UPDATE 不會觸發 post_save
+    publish_store_event(order.store_id, 'takeout_order.updated', {'id': order.pk, 'status': new_status})
+    return True
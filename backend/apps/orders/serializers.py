@@ -1,36 +1,93 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from apps.products.models import Product
 from .models import TakeoutOrder, TakeoutOrderItem
 
 class TakeoutOrderItemSerializer(serializers.ModelSerializer):
+    # 以 id 接收商品，由訂單序列化器一次查詢所有品項的商品
+    product = serializers.IntegerField(source='product_id')
+
     class Meta:
         model = TakeoutOrderItem
-        fields = ['product', 'quantity']
-
-    def validate_product(self, value):
-        store = self.context['store']
-        if value.store_id != store.id:
-            raise serializers.ValidationError('商品不屬於該店家')
-        return value
+        fields = ['product', 'quantity', 'unit_price']
+        read_only_fields = ['unit_price']
+        extra_kwargs = {'quantity': {'min_value': 1}}
 
 class TakeoutOrderSerializer(serializers.ModelSerializer):
-    items = TakeoutOrderItemSerializer(many=True)
+    items = TakeoutOrderItemSerializer(many=True, allow_empty=False)
 
     class Meta:
         model = TakeoutOrder
         fields = ['id', 'store', 'customer_name', 'customer_phone',
-                  'pickup_at', 'payment_method', 'notes', 'pickup_number', 'items']
-        read_only_fields = ['pickup_number']
+                  'pickup_at', 'payment_method', 'notes', 'pickup_number', 'pickup_date',
+                  'total', 'items']
+        read_only_fields = ['pickup_number', 'pickup_date', 'total']
+
+    def validate_items(self, items):
+        """一次查詢所有品項的商品，確認屬於該店家且可訂購，並記下當下單價"""
+        store = self.context['store']
+        products = Product.objects.filter(
+            pk__in={item['product_id'] for item in items},
+            store=store,
+        ).only('pk', 'price', 'is_available').in_bulk()
+
+        for item in items:
+            product = products.get(item['product_id'])
+            if product is None:
+                raise serializers.ValidationError('商品不屬於該店家')
+            if not product.is_available:
+                raise serializers.ValidationError(f'商品 {product.pk} 目前無法訂購')
+            item['unit_price'] = product.price
+        return items
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
-        order = TakeoutOrder.objects.create(
-            pickup_number=self.generate_pickup_number(validated_data['store']),
-            **validated_data
+        total = sum(
+            (item['unit_price'] * item['quantity'] for item in items_data),
+            Decimal('0'),
         )
-        for item_data in items_data:
-            TakeoutOrderItem.objects.create(order=order, **item_data)
+        # 取餐號碼依取餐日（當地時間）編號
+        pickup_date = timezone.localdate(validated_data['pickup_at'])
+        with transaction.atomic():
+            pickup_sequence, pickup_number = TakeoutOrder.allocate_pickup_number(
+                validated_data['store'].id, pickup_date
+            )
+            order = TakeoutOrder.objects.create(
+                pickup_number=pickup_number,
+                pickup_date=pickup_date,
+                pickup_sequence=pickup_sequence,
+                total=total,
+                **validated_data
+            )
+            TakeoutOrderItem.objects.bulk_create(
+                [TakeoutOrderItem(order=order, **item_data) for item_data in items_data]
+            )
         return order
 
-    def generate_pickup_number(self, store):
-        from uuid import uuid4
-        return f"{store.id}-{uuid4().hex[:4].upper()}"
+
+class MerchantTakeoutOrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = TakeoutOrderItem
+        fields = ['product', 'product_name', 'quantity', 'unit_price']
+
+
+class MerchantTakeoutOrderSerializer(serializers.ModelSerializer):
+    """商家出餐佇列使用"""
+    items = MerchantTakeoutOrderItemSerializer(many=True, read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = TakeoutOrder
+        fields = ['id', 'pickup_number', 'pickup_date', 'pickup_sequence', 'pickup_at',
+                  'status', 'status_display', 'customer_name', 'customer_phone',
+                  'payment_method', 'notes', 'total', 'items', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class TakeoutOrderStatusSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=TakeoutOrder.STATUS_CHOICES)
@@ -1,6 +1,11 @@
-from django.urls import path
-from .views import TakeoutOrderCreateView
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from .views import MerchantTakeoutOrderViewSet, TakeoutOrderCreateView
+
+router = DefaultRouter()
+router.register(r'merchant/takeout', MerchantTakeoutOrderViewSet, basename='merchant-takeout-order')
 
 urlpatterns = [
     path('takeout/', TakeoutOrderCreateView.as_view(), name='takeout-order'),
+    path('', include(router.urls)),
 ]
@@ -1,6 +1,14 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from .serializers import TakeoutOrderSerializer
+from .models import TakeoutOrder
+from .queue import InvalidCursor, change_status, order_queue, parse_cursor
+from .serializers import (
+    MerchantTakeoutOrderSerializer,
+    TakeoutOrderSerializer,
+    TakeoutOrderStatusSerializer,
+)
 from apps.stores.models import Store
 
 
@@ -13,3 +21,52 @@ class TakeoutOrderCreateView(generics.CreateAPIView):
         store = get_object_or_404(Store, pk=self.request.data.get('store'))
         context['store'] = store
         return context
+
+    def perform_create(self, serializer):
+        # 點數在訂單完成時才發放（見 queue.change_status）
+        user = self.request.user if self.request.user.is_authenticated else None
+        serializer.save(user=user)
+
+
+class MerchantTakeoutOrderViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    商家端出餐佇列
+
+    GET  /api/orders/merchant/takeout/                 進行中的訂單（依取餐時間排序）
+    GET  /api/orders/merchant/takeout/?since=<cursor>  游標之後新增或變動的訂單
+    POST /api/orders/merchant/takeout/{id}/update-status/  Body: {"status": "ready"}
+    """
+    serializer_class = MerchantTakeoutOrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # 以關聯條件限定店家，輪詢時不需另外查詢商家與店家
+        return TakeoutOrder.objects.filter(store__merchant__user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        try:
+            since = parse_cursor(since) if since else None
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        orders, cursor = order_queue(self.get_queryset(), since=since)
+        return Response({
+            'cursor': cursor,
+            'orders': self.get_serializer(orders, many=True).data,
+        })
+
+    @action(detail=True, methods=['post'], url_path='update-status')
+    def update_status(self, request, pk=None):
+        order = self.get_object()
+        serializer = TakeoutOrderStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+
+        if order.status != new_status and not change_status(order, new_status):
+            order.refresh_from_db(fields=['status', 'updated_at'])
+            return Response(
+                {'error': f'訂單目前為「{order.get_status_display()}」，無法變更為此狀態'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(order).data)
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:51
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+from django.utils import timezone
+
+
+BATCH_SIZE = 500
+
+
+def merge_takeout_orders(apps, schema_editor):
+    """
+    將 products 的外帶訂單與品項搬到 orders（統一的訂單資料表）
+
+    舊資料沒有單價，以目前商品價格補上；取餐時間已過者視為已完成。
+    """
+    LegacyOrder = apps.get_model('products', 'TakeoutOrder')
+    LegacyItem = apps.get_model('products', 'TakeoutOrderItem')
+    TakeoutOrder = apps.get_model('orders', 'TakeoutOrder')
+    TakeoutOrderItem = apps.get_model('orders', 'TakeoutOrderItem')
+
+    now = timezone.now()
+    last_pk = 0
+    while True:
+        legacy_orders = list(LegacyOrder.objects.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not legacy_orders:
+            return
+        last_pk = legacy_orders[-1].pk
+
+        legacy_items = defaultdict(list)
+        for item in LegacyItem.objects.filter(
+            order_id__in=[order.pk for order in legacy_orders]
+        ).select_related('product'):
+            legacy_items[item.order_id].append(item)
+
+        orders = [
+            TakeoutOrder(
+                store_id=legacy.store_id,
+                customer_name=legacy.customer_name,
+                customer_phone=legacy.customer_phone,
+                pickup_at=legacy.pickup_at,
+                payment_method=legacy.payment_method,
+                notes=legacy.notes,
+                pickup_number=legacy.pickup_number,
+                pickup_date=timezone.localdate(legacy.pickup_at),
+                status='completed' if legacy.pickup_at < now else 'pending',
+                total=sum(
+                    (item.quantity * item.product.price for item in legacy_items[legacy.pk]),
+                    Decimal('0'),
+                ),
+            )
+            for legacy in legacy_orders
+        ]
+        TakeoutOrder.objects.bulk_create(orders)
+
+        # created_at / updated_at 在 bulk_create 時會被設為現在，建立後改回原本的建立時間
+        for order, legacy in zip(orders, legacy_orders):
+            order.created_at = legacy.created_at
+            order.updated_at = legacy.created_at
+        TakeoutOrder.objects.bulk_update(orders, ['created_at', 'updated_at'])
+
+        TakeoutOrderItem.objects.bulk_create([
+            TakeoutOrderItem(
+                order_id=order.pk,
+                product_id=item.product_id,
+                quantity=item.quantity,
+                unit_price=item.product.price,
+            )
+            for order, legacy in zip(orders, legacy_orders)
+            for item in legacy_items[legacy.pk]
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_takeoutorder_takeoutorderitem'),
+        ('orders', '0006_takeout_order_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_takeout_orders, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='takeoutorderitem',
+            name='order',
+        ),
+        migrations.RemoveField(
+            model_name='takeoutorderitem',
+            name='product',
+        ),
+        migrations.DeleteModel(
+            name='TakeoutOrder',
+        ),
+        migrations.DeleteModel(
+            name='TakeoutOrderItem',
+        ),
+    ]
@@ -4,20 +4,7 @@ from rest_framework import viewsets, permissions, status, serializers
 from rest_framework.response import Response
 from .models import Product
 from .serializers import ProductSerializer, PublicProductSerializer
-from rest_framework import generics, permissions
-from django.shortcuts import get_object_or_404
-from apps.orders.serializers import TakeoutOrderSerializer
-from apps.stores.models import Store
-
-class TakeoutOrderCreateView(generics.CreateAPIView):
-    serializer_class = TakeoutOrderSerializer
-    permission_classes = [permissions.AllowAny]
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        store = get_object_or_404(Store, pk=self.request.data.get('store'))
-        context['store'] = store
-        return context
+from apps.common.cache import cached_catalog, store_id_from_query
 
 # 移除這行，因為 Merchant 模型不需要直接在這裡使用
 # from apps.users.models import Merchant # <--- 移除或註解掉
@@ -44,6 +31,8 @@ class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
+    page_size = 100
+    max_page_size = 200
 
     def get_permissions(self):
         """
@@ -72,6 +61,9 @@ class PublicProductViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.filter(is_available=True)
     serializer_class = PublicProductSerializer
     permission_classes = [permissions.AllowAny]
+    # 菜單需一次顯示完整商品，預設每頁筆數較大
+    page_size = 100
+    max_page_size = 200
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -82,14 +74,11 @@ class PublicProductViewSet(viewsets.ReadOnlyModelViewSet):
         if service_type in ('takeaway', 'dine_in'):
             qs = qs.filter(service_type__in=[service_type, 'both'])
         return qs
-    
 
-class TakeoutOrderCreateView(generics.CreateAPIView):
-    serializer_class = TakeoutOrderSerializer
-    permission_classes = [permissions.AllowAny]
+    @cached_catalog('products', scope=store_id_from_query('store'))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        store_id = self.request.data.get('store')
-        context['store'] = get_object_or_404(Store, pk=store_id)
-        return context
+    @cached_catalog('products')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'store', 'kind', 'export_format', 'status', 'row_count', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind', 'export_format']
+    search_fields = ['store__name']
+    readonly_fields = ['row_count', 'attempts', 'error', 'created_at', 'started_at', 'finished_at']
+    ordering = ['-created_at']
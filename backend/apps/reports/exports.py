@@ -0,0 +1,105 @@
+"""
+背景匯出的資料來源
+
+每種匯出類型定義欄位、查詢與日期篩選欄位，由 worker 以 apps.common.exports 逐列寫出。
+"""
+from collections import namedtuple
+
+from apps.common.exports import Column, choice_display, iter_rows, local_datetime
+from apps.common.stats import filter_date_range
+from apps.inventory.exports import INGREDIENT_COLUMNS
+from apps.inventory.models import Ingredient
+from apps.loyalty.models import PointTransaction
+from apps.reservations.models import Reservation
+from apps.surplus_food.models import SurplusFoodOrder
+
+
+ExportDefinition = namedtuple('ExportDefinition', 'title columns queryset date_field ordering')
+
+
+RESERVATION_COLUMNS = [
+    Column('訂位編號', 'reservation_number'),
+    Column('訂位日期', 'reservation_date'),
+    Column('時段', 'time_slot'),
+    Column('訂位人', 'customer_name'),
+    Column('電話', 'customer_phone'),
+    Column('大人', 'party_size'),
+    Column('小孩', 'children_count'),
+    Column('狀態', 'status', format=choice_display(Reservation.STATUS_CHOICES)),
+    Column('特殊需求', 'special_requests'),
+    Column('建立時間', 'created_at', format=local_datetime),
+    Column('取消時間', 'cancelled_at', format=local_datetime),
+    Column('取消原因', 'cancel_reason'),
+]
+
+POINT_TRANSACTION_COLUMNS = [
+    Column('時間', 'created_at', format=local_datetime),
+    Column('會員', 'account__user__username'),
+    Column('Email', 'account__user__email'),
+    Column(
+        '類型', 'transaction_type',
+        format=choice_display(PointTransaction.TRANSACTION_TYPE_CHOICES),
+    ),
+    Column('點數', 'points'),
+    Column('說明', 'description'),
+    Column('兌換碼', 'redemption__redemption_code'),
+    Column('訂單', 'order_id'),
+]
+
+SURPLUS_ORDER_COLUMNS = [
+    Column('訂單編號', 'order_number'),
+    Column('訂單時間', 'created_at', format=local_datetime),
+    Column('顧客', 'customer_name'),
+    Column('電話', 'customer_phone'),
+    Column('惜福品', 'surplus_food__title'),
+    Column('數量', 'quantity'),
+    Column('單價', 'unit_price'),
+    Column('總價', 'total_price'),
+    Column('付款方式', 'payment_method', format=choice_display(SurplusFoodOrder.PAYMENT_CHOICES)),
+    Column('狀態', 'status', format=choice_display(SurplusFoodOrder.STATUS_CHOICES)),
+    Column('預計取餐時間', 'pickup_time', format=local_datetime),
+    Column('完成時間', 'completed_at', format=local_datetime),
+]
+
+EXPORTS = {
+    'reservations': ExportDefinition(
+        title='訂位記錄',
+        columns=RESERVATION_COLUMNS,
+        queryset=lambda store: Reservation.objects.filter(store=store),
+        date_field='reservation_date',
+        ordering=('reservation_date', 'id'),
+    ),
+    'point_transactions': ExportDefinition(
+        title='點數交易記錄',
+        columns=POINT_TRANSACTION_COLUMNS,
+        queryset=lambda store: PointTransaction.objects.filter(account__store=store),
+        date_field='created_at',
+        ordering=('created_at', 'id'),
+    ),
+    'surplus_orders': ExportDefinition(
+        title='惜福訂單記錄',
+        columns=SURPLUS_ORDER_COLUMNS,
+        queryset=lambda store: SurplusFoodOrder.objects.filter(store=store),
+        date_field='created_at',
+        ordering=('created_at', 'id'),
+    ),
+    'inventory': ExportDefinition(
+        title='原物料庫存',
+        columns=INGREDIENT_COLUMNS,
+        queryset=lambda store: Ingredient.objects.filter(store=store),
+        date_field='updated_at',
+        ordering=('category', 'name', 'id'),
+    ),
+}
+
+
+def export_rows(job):
+    """回傳 (定義, 逐列產生器)"""
+    definition = EXPORTS[job.kind]
+    queryset = filter_date_range(
+        definition.queryset(job.store),
+        definition.date_field,
+        job.start_date,
+        job.end_date,
+    ).order_by(*definition.ordering)
+    return definition, iter_rows(queryset, definition.columns)
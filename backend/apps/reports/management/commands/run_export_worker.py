@@ -0,0 +1,103 @@
+import logging
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from apps.reports.queue import LEASE_SECONDS, claim_next_job, requeue_expired_jobs, run_job
+
+
+logger = logging.getLogger(__name__)
+
+# 取工作發生錯誤（例如資料庫暫時無法連線）時的最長等待秒數
+MAX_BACKOFF = 60
+
+
+class Command(BaseCommand):
+    help = '執行背景匯出工作（資料庫佇列，可同時啟動多個 worker）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='同時執行的 worker 執行緒數（預設 2）',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5,
+            help='佇列為空時的等待秒數（預設 5）',
+        )
+        parser.add_argument(
+            '--lease-seconds', type=int, default=LEASE_SECONDS,
+            help=f'工作租約秒數，worker 中斷超過此時間的工作會放回佇列（預設 {LEASE_SECONDS}）',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='處理完目前的工作後結束（適合以 cron 執行）',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers 必須為正整數')
+        if options['lease_seconds'] < 3:
+            raise CommandError('--lease-seconds 不可小於 3')
+
+        self._requeue()
+
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(stop, options['poll_interval'], options['lease_seconds'], options['once']),
+                name=f'export-worker-{index}',
+                daemon=True,
+            )
+            for index in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write('等待執行中的工作完成後結束...')
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _requeue(self):
+        requeued = requeue_expired_jobs()
+        if requeued:
+            self.stdout.write(f'已將 {requeued} 個中斷的工作放回佇列')
+
+    def _work(self, stop, poll_interval, lease_seconds, once):
+        failures = 0
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job(lease_seconds)
+                failures = 0
+                if job is None:
+                    if once:
+                        return
+                    # 佇列空閒時順便回收中斷 worker 的工作
+                    self._requeue()
+                    stop.wait(poll_interval)
+                    continue
+
+                if run_job(job, lease_seconds):
+                    self.stdout.write(self.style.SUCCESS(
+                        f'匯出工作 {job.pk} 完成（{job.row_count} 筆）'
+                    ))
+                else:
+                    self.stderr.write(self.style.ERROR(
+                        f'匯出工作 {job.pk} 失敗: {job.error}'
+                    ))
+            except Exception:
+                # 不讓例外結束執行緒，等待後重試（連續失敗時加倍等待）
+                failures += 1
+                backoff = min(poll_interval * 2 ** (failures - 1), MAX_BACKOFF)
+                logger.exception('匯出 worker 發生錯誤，%s 秒後重試', backoff)
+                stop.wait(backoff)
+            finally:
+                close_old_connections()
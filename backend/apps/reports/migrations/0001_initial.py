@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('stores', '0011_store_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('reservations', '訂位記錄'), ('point_transactions', '點數交易記錄'), ('surplus_orders', '惜福訂單記錄'), ('inventory', '原物料庫存')], max_length=30, verbose_name='匯出類型')),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', max_length=10, verbose_name='檔案格式')),
+                ('start_date', models.DateField(blank=True, null=True, verbose_name='開始日期')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='結束日期')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '執行中'), ('completed', '已完成'), ('failed', '失敗')], default='pending', max_length=20, verbose_name='狀態')),
+                ('file', models.FileField(blank=True, upload_to='exports/%Y/%m/', verbose_name='匯出檔案')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='資料筆數')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='執行次數')),
+                ('error', models.TextField(blank=True, default='', verbose_name='錯誤訊息')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始時間')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成時間')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='申請者')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='stores.store', verbose_name='所屬店家')),
+            ],
+            options={
+                'verbose_name': '匯出工作',
+                'verbose_name_plural': '匯出工作',
+                'db_table': 'export_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['store', '-created_at', '-id'], name='export_jobs_store_i_df4955_idx'), models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='export_job_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+from django.db import models
+from apps.stores.models import Store
+from apps.users.models import User
+
+
+class ExportJob(models.Model):
+    """
+    背景匯出工作
+
+    API 建立工作後由 run_export_worker 指令取出執行，結果檔案存放於 MEDIA_ROOT/exports/。
+    """
+    KIND_CHOICES = [
+        ('reservations', '訂位記錄'),
+        ('point_transactions', '點數交易記錄'),
+        ('surplus_orders', '惜福訂單記錄'),
+        ('inventory', '原物料庫存'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '執行中'),
+        ('completed', '已完成'),
+        ('failed', '失敗'),
+    ]
+
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        verbose_name='所屬店家'
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+        verbose_name='申請者'
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, verbose_name='匯出類型')
+    export_format = models.CharField(
+        max_length=10,
+        choices=FORMAT_CHOICES,
+        default='csv',
+        verbose_name='檔案格式'
+    )
+    start_date = models.DateField(null=True, blank=True, verbose_name='開始日期')
+    end_date = models.DateField(null=True, blank=True, verbose_name='結束日期')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='狀態'
+    )
+    file = models.FileField(upload_to='exports/%Y/%m/', blank=True, verbose_name='匯出檔案')
+    row_count = models.PositiveIntegerField(default=0, verbose_name='資料筆數')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='執行次數')
+    error = models.TextField(blank=True, default='', verbose_name='錯誤訊息')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='建立時間')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='開始時間')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成時間')
+    # 執行中的 worker 定期延長，過期代表 worker 已中斷
+    lease_until = models.DateTimeField(null=True, blank=True, verbose_name='租約到期時間')
+
+    class Meta:
+        db_table = 'export_jobs'
+        verbose_name = '匯出工作'
+        verbose_name_plural = '匯出工作'
+        ordering = ['-created_at']
+        indexes = [
+            # 商家工作列表的游標分頁
+            models.Index(fields=['store', '-created_at', '-id']),
+            # worker 依建立順序取出等待中的工作
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='pending'),
+                name='export_job_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.store.name} - {self.get_kind_display()} ({self.get_status_display()})"
+
+    @property
+    def filename(self):
+        """下載時使用的檔名"""
+        created = self.created_at.strftime('%Y%m%d%H%M%S')
+        return f"{self.kind}_{created}.{self.export_format}"
@@ -0,0 +1,146 @@
+"""
+匯出工作佇列（資料庫實作）
+
+worker 以 SELECT ... FOR UPDATE SKIP LOCKED 取出最早的等待中工作，
+多個 worker（執行緒或行程）同時取工作不會互相阻塞，也不會重複執行同一個工作。
+匯出檔案先寫入暫存檔，完成後才存入 MEDIA_ROOT，失敗時不會留下不完整的檔案。
+
+取出的工作帶有租約（lease_until），執行期間由背景執行緒每 1/3 租約時間延長一次；
+租約過期代表 worker 已中斷，requeue_expired_jobs 才會將工作放回佇列，
+執行時間再長的工作只要 worker 還在就不會被重複執行。
+"""
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.common.exports import write_export
+
+from .exports import export_rows
+from .models import ExportJob
+
+
+logger = logging.getLogger(__name__)
+
+# 預設租約秒數
+LEASE_SECONDS = 60
+
+
+def claim_next_job(lease_seconds=LEASE_SECONDS):
+    """取出並標記一個等待中的工作，沒有工作時回傳 None"""
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = 'running'
+        job.started_at = now
+        job.lease_until = now + timedelta(seconds=lease_seconds)
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'lease_until', 'attempts'])
+    return job
+
+
+@contextmanager
+def hold_lease(job, lease_seconds=LEASE_SECONDS):
+    """執行期間定期延長工作的租約"""
+    stop = threading.Event()
+
+    def renew():
+        try:
+            while not stop.wait(lease_seconds / 3):
+                renewed = ExportJob.objects.filter(pk=job.pk, status='running').update(
+                    lease_until=timezone.now() + timedelta(seconds=lease_seconds)
+                )
+                if not renewed:
+                    logger.warning('匯出工作 %s 已不在執行中，停止延長租約', job.pk)
+                    return
+        except Exception:
+            logger.exception('匯出工作 %s 延長租約失敗', job.pk)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=renew, name=f'export-lease-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class _CountingRows:
+    """計算寫出筆數的產生器包裝"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def _write_file(job):
+    """寫出匯出檔案（存入 job.file，尚未儲存工作）"""
+    definition, rows = export_rows(job)
+    counted = _CountingRows(rows)
+    with tempfile.TemporaryFile() as buffer:
+        write_export(buffer, job.export_format, definition.columns, counted, title=definition.title)
+        buffer.seek(0)
+        job.file.save(job.filename, File(buffer), save=False)
+    job.row_count = counted.count
+
+
+def run_job(job, lease_seconds=LEASE_SECONDS):
+    """執行匯出並更新工作狀態，回傳是否成功"""
+    try:
+        with hold_lease(job, lease_seconds):
+            _write_file(job)
+    except Exception as e:
+        logger.exception('匯出工作 %s 失敗', job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.lease_until = None
+        job.save(update_fields=['status', 'error', 'finished_at', 'lease_until'])
+        return False
+
+    job.status = 'completed'
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.lease_until = None
+    job.save(update_fields=['status', 'file', 'row_count', 'error', 'finished_at', 'lease_until'])
+    return True
+
+
+def requeue_expired_jobs(max_attempts=3):
+    """
+    將租約過期（worker 中斷）的工作放回佇列，超過重試次數者標記為失敗
+
+    沒有租約的執行中工作（由加入租約前的 worker 取出）一併視為過期。
+    回傳放回佇列的工作數。
+    """
+    now = timezone.now()
+    expired = ExportJob.objects.filter(status='running').filter(
+        Q(lease_until__lt=now) | Q(lease_until__isnull=True)
+    )
+    expired.filter(attempts__gte=max_attempts).update(
+        status='failed',
+        error='執行逾時',
+        finished_at=now,
+        lease_until=None,
+    )
+    return expired.filter(attempts__lt=max_attempts).update(status='pending', lease_until=None)
@@ -0,0 +1,44 @@
+from rest_framework import serializers
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """匯出工作序列化器"""
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'kind', 'kind_display', 'export_format', 'start_date', 'end_date',
+            'status', 'status_display', 'row_count', 'error', 'download_url',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'id', 'status', 'row_count', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed' or not obj.file:
+            return None
+        request = self.context.get('request')
+        path = f'/api/reports/export-jobs/{obj.pk}/download/'
+        return request.build_absolute_uri(path) if request else path
+
+    def validate_export_format(self, value):
+        if value == 'xlsx':
+            from apps.common.exports import ExportError, require_openpyxl
+            try:
+                require_openpyxl()
+            except ExportError as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError({'end_date': '結束日期不得早於開始日期'})
+        return attrs
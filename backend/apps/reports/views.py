@@ -0,0 +1,65 @@
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.http import FileResponse
+from .models import ExportJob
+from .serializers import ExportJobSerializer
+
+
+class ExportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    背景匯出工作 ViewSet（商家端）
+    
+    POST 建立工作後立即回傳，由 run_export_worker 在背景執行；
+    以 GET 查詢狀態，完成後透過 download 下載檔案。
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def _get_store(self):
+        user = self.request.user
+        if not hasattr(user, 'merchant_profile'):
+            return None
+        return getattr(user.merchant_profile, 'store', None)
+    
+    def get_queryset(self):
+        """只返回當前商家的匯出工作"""
+        store = self._get_store()
+        if store is None:
+            return ExportJob.objects.none()
+        return ExportJob.objects.filter(store=store)
+    
+    def perform_create(self, serializer):
+        store = self._get_store()
+        if store is None:
+            raise PermissionDenied('您必須先建立店家才能匯出資料')
+        serializer.save(store=store, requested_by=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """下載匯出檔案"""
+        job = self.get_object()
+        if job.status != 'completed' or not job.file:
+            return Response(
+                {'error': '匯出尚未完成', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        try:
+            file = job.file.open('rb')
+        except FileNotFoundError:
+            return Response(
+                {'error': '匯出檔案已不存在，請重新匯出'},
+                status=status.HTTP_410_GONE
+            )
+        return FileResponse(file, as_attachment=True, filename=job.filename)
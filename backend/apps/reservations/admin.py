@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Reservation, ReservationChangeLog, TimeSlot
+from .models import Reservation, ReservationChangeLog, TimeSlot, SlotOccupancy
 
 
 @admin.register(Reservation)
@@ -149,3 +149,20 @@ class TimeSlotAdmin(admin.ModelAdmin):
             'fields': ('is_active',)
         }),
     )
+
+
+@admin.register(SlotOccupancy)
+class SlotOccupancyAdmin(admin.ModelAdmin):
+    list_display = [
+        'store',
+        'date',
+        'time_slot',
+        'booked',
+        'updated_at',
+    ]
+    list_filter = [
+        'date',
+        'store',
+    ]
+    search_fields = ['store__name']
+    readonly_fields = ['updated_at']
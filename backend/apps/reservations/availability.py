@@ -0,0 +1,85 @@
+"""
+訂位時段容量計算
+
+以單一 GROUP BY 查詢取得指定日期（或日期區間）內每個時段的已訂人數，
+再交由 serializer 查表，避免對每個時段各自執行聚合查詢。
+"""
+from datetime import timedelta
+
+from django.db.models import F, Sum
+
+from .models import WEEKDAY_NAMES, Reservation, TimeSlot
+
+
+# 可用日曆一次最多查詢的天數
+MAX_CALENDAR_DAYS = 31
+
+
+def weekday_name(date):
+    """將日期轉換為 TimeSlot.day_of_week 使用的星期字串"""
+    return WEEKDAY_NAMES[date.weekday()]
+
+
+def get_booked_headcount(start_date, end_date=None, store_id=None):
+    """
+    計算日期區間內各時段的已訂人數（成人 + 孩童）
+
+    回傳 dict: {(slot_id, reservation_date): 人數}
+    """
+    end_date = end_date or start_date
+    reservations = Reservation.objects.filter(
+        reservation_date__range=(start_date, end_date),
+        status__in=Reservation.ACTIVE_STATUSES,
+    )
+    if store_id is not None:
+        reservations = reservations.filter(store_id=store_id)
+
+    rows = (
+        reservations
+        .values('slot_id', 'reservation_date')
+        .annotate(headcount=Sum(F('party_size') + F('children_count')))
+        .order_by()
+    )
+    return {
+        (row['slot_id'], row['reservation_date']): row['headcount'] or 0
+        for row in rows
+        if row['slot_id'] is not None
+    }
+
+
+def lookup_bookings(bookings, slot, date):
+    """從 get_booked_headcount 的結果取得單一時段在指定日期的已訂人數"""
+    return bookings.get((slot.pk, date), 0)
+
+
+def build_calendar(store_id, start_date, days, serializer_class):
+    """
+    建立多日可用時段日曆
+
+    僅需兩次查詢：一次取得店家所有啟用中的時段，一次取得整段期間的已訂人數。
+    """
+    end_date = start_date + timedelta(days=days - 1)
+    slots = list(
+        TimeSlot.objects.filter(store_id=store_id, is_active=True).order_by('start_time')
+    )
+    bookings = get_booked_headcount(start_date, end_date, store_id=store_id)
+
+    slots_by_day = {}
+    for slot in slots:
+        slots_by_day.setdefault(slot.day_of_week, []).append(slot)
+
+    calendar = []
+    for offset in range(days):
+        date = start_date + timedelta(days=offset)
+        day_name = weekday_name(date)
+        serializer = serializer_class(
+            slots_by_day.get(day_name, []),
+            many=True,
+            context={'date': date, 'bookings': bookings},
+        )
+        calendar.append({
+            'date': date.isoformat(),
+            'day_of_week': day_name,
+            'slots': serializer.data,
+        })
+    return calendar
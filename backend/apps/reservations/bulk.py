@@ -0,0 +1,133 @@
+"""
+訂位批次狀態變更
+
+商家打烊時一次將多筆訂位標記為完成、未到場或取消：
+- 同一個交易中鎖定所有訂位，逐筆檢查轉換是否可行並回傳各筆結果
+- 離開佔用狀態的訂位依時段合計後釋放容量；重新佔用者逐筆檢查容量
+- 狀態以單一 UPDATE 寫入，變更記錄以 bulk_create 寫入
+- 批次 UPDATE 不會觸發 post_save，交易提交後手動使時段快取失效並發布店家事件
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.cache import invalidate
+from apps.common.events import publish_store_event
+
+from .models import Reservation, ReservationChangeLog
+from .occupancy import (
+    CapacityExceeded,
+    TimeSlotNotFound,
+    apply_change,
+    occupancy_key,
+    release_many,
+)
+
+
+def _failure(pk, error):
+    return {'id': pk, 'success': False, 'error': error}
+
+
+def bulk_update_status(store, ids, new_status, cancel_reason='', changed_by='merchant'):
+    """
+    將店家的多筆訂位改為 new_status，回傳與 ids 順序相同的結果列表
+
+    無法轉換的訂位（不存在、無法取消、容量不足）不影響其他訂位。
+    """
+    results = dict.fromkeys(ids)
+    now = timezone.now()
+
+    with transaction.atomic():
+        reservations = {
+            reservation.pk: reservation
+            for reservation in Reservation.objects.select_for_update()
+            .filter(store=store, pk__in=list(results))
+            .order_by('pk')
+        }
+
+        releases = defaultdict(int)
+        activations = []
+        changed = []
+        for pk in results:
+            reservation = reservations.get(pk)
+            if reservation is None:
+                results[pk] = _failure(pk, '找不到訂位')
+                continue
+
+            old_status = reservation.status
+            if old_status == new_status:
+                results[pk] = {'id': pk, 'success': True, 'status': new_status, 'changed': False}
+                continue
+            if new_status == 'cancelled' and not reservation.can_cancel:
+                results[pk] = _failure(pk, '此訂位狀態無法取消')
+                continue
+
+            before = occupancy_key(reservation)
+            reservation.status = new_status
+            after = occupancy_key(reservation)
+            if before and not after:
+                date, slot_id, seats = before
+                if slot_id is not None:
+                    releases[(date, slot_id)] += seats
+            elif after and not before:
+                activations.append((reservation, old_status, after))
+                continue
+            changed.append((reservation, old_status))
+
+        # 先釋放容量，再處理重新佔用容量的訂位
+        release_many(releases)
+        for reservation, old_status, after in activations:
+            try:
+                apply_change(None, after)
+            except (TimeSlotNotFound, CapacityExceeded) as e:
+                reservation.status = old_status
+                results[reservation.pk] = _failure(reservation.pk, str(e))
+                continue
+            changed.append((reservation, old_status))
+
+        if changed:
+            fields = {'status': new_status, 'updated_at': now}
+            if new_status == 'confirmed':
+                fields['confirmed_at'] = now
+            elif new_status == 'cancelled':
+                fields.update(
+                    cancelled_at=now,
+                    cancelled_by=changed_by,
+                    cancel_reason=cancel_reason,
+                )
+            Reservation.objects.filter(
+                pk__in=[reservation.pk for reservation, _ in changed]
+            ).update(**fields)
+
+            new_values = {'status': new_status}
+            if new_status == 'cancelled':
+                new_values['cancel_reason'] = cancel_reason
+            ReservationChangeLog.objects.bulk_create([
+                ReservationChangeLog(
+                    reservation=reservation,
+                    changed_by=changed_by,
+                    change_type='cancelled' if new_status == 'cancelled' else 'updated',
+                    old_values={'status': old_status},
+                    new_values=new_values,
+                    note=f'批次狀態變更: {old_status} -> {new_status}',
+                )
+                for reservation, old_status in changed
+            ])
+
+            for reservation, old_status in changed:
+                results[reservation.pk] = {
+                    'id': reservation.pk,
+                    'success': True,
+                    'old_status': old_status,
+                    'status': new_status,
+                    'changed': True,
+                }
+
+            transaction.on_commit(lambda: invalidate('time_slots', store.pk))
+            for reservation, _ in changed:
+                publish_store_event(
+                    store.pk, 'reservation.updated', {'id': reservation.pk, 'status': new_status}
+                )
+
+    return list(results.values())
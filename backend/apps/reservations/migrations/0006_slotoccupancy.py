@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_delete_storereservationsettings'),
+        ('stores', '0010_store_enable_loyalty_store_enable_reservation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('booked', models.PositiveIntegerField(default=0, help_text='成人與孩童人數合計', verbose_name='已訂人數')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occupancies', to='stores.store', verbose_name='店家')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancies', to='reservations.timeslot', verbose_name='時段')),
+            ],
+            options={
+                'verbose_name': '時段佔用人數',
+                'verbose_name_plural': '時段佔用人數列表',
+                'unique_together': {('store', 'date', 'time_slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated manually to backfill slot occupancy counters
+from datetime import date
+
+from django.db import migrations
+from django.db.models import F, Sum
+
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def backfill_slot_occupancy(apps, schema_editor):
+    """以今天（含）之後待確認/已確認的訂位初始化時段佔用人數"""
+    Reservation = apps.get_model('reservations', 'Reservation')
+    TimeSlot = apps.get_model('reservations', 'TimeSlot')
+    SlotOccupancy = apps.get_model('reservations', 'SlotOccupancy')
+
+    rows = (
+        Reservation.objects.filter(
+            reservation_date__gte=date.today(),
+            status__in=['pending', 'confirmed'],
+        )
+        .values('store_id', 'reservation_date', 'time_slot')
+        .annotate(headcount=Sum(F('party_size') + F('children_count')))
+        .order_by()
+    )
+
+    slots = {}
+    for slot in TimeSlot.objects.all():
+        label = slot.start_time.strftime('%H:%M')
+        if slot.end_time:
+            label += f"-{slot.end_time.strftime('%H:%M')}"
+        slots[(slot.store_id, slot.day_of_week, label)] = slot
+
+    occupancies = []
+    for row in rows:
+        day_of_week = WEEKDAY_NAMES[row['reservation_date'].weekday()]
+        slot = slots.get((row['store_id'], day_of_week, row['time_slot']))
+        if slot is None:
+            continue
+        occupancies.append(SlotOccupancy(
+            store_id=row['store_id'],
+            date=row['reservation_date'],
+            time_slot=slot,
+            booked=row['headcount'] or 0,
+        ))
+
+    SlotOccupancy.objects.bulk_create(occupancies, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slot_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_backfill_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='slot',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='reservations.timeslot', verbose_name='時段設定'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['slot', 'reservation_date'], name='reservation_slot_id_70a343_idx'),
+        ),
+    ]
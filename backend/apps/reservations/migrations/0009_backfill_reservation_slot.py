@@ -0,0 +1,49 @@
+# Generated manually to link existing reservations to their time slots
+from django.db import migrations
+
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+BATCH_SIZE = 1000
+
+
+def backfill_reservation_slot(apps, schema_editor):
+    """依店家、訂位日期的星期與時段字串，為既有訂位補上時段關聯"""
+    Reservation = apps.get_model('reservations', 'Reservation')
+    TimeSlot = apps.get_model('reservations', 'TimeSlot')
+
+    slots = {}
+    for slot in TimeSlot.objects.all():
+        label = slot.start_time.strftime('%H:%M')
+        if slot.end_time:
+            label += f"-{slot.end_time.strftime('%H:%M')}"
+        slots[(slot.store_id, slot.day_of_week, label)] = slot.pk
+
+    pending = []
+    reservations = Reservation.objects.filter(slot__isnull=True).only(
+        'id', 'store_id', 'reservation_date', 'time_slot'
+    )
+    for reservation in reservations.iterator(chunk_size=BATCH_SIZE):
+        day_of_week = WEEKDAY_NAMES[reservation.reservation_date.weekday()]
+        slot_id = slots.get((reservation.store_id, day_of_week, reservation.time_slot.strip()))
+        if slot_id is None:
+            continue
+        reservation.slot_id = slot_id
+        pending.append(reservation)
+        if len(pending) >= BATCH_SIZE:
+            Reservation.objects.bulk_update(pending, ['slot'])
+            pending = []
+
+    if pending:
+        Reservation.objects.bulk_update(pending, ['slot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0008_reservation_slot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reservation_slot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0009_backfill_reservation_slot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['store', '-created_at', '-id'], name='reservation_store_i_1c7d9b_idx'),
+        ),
+    ]
@@ -2,8 +2,22 @@ from django.db import models
 from django.utils import timezone
 from apps.users.models import User
 from apps.stores.models import Store
-import secrets
-import string
+from apps.common.sequences import mint_code
+from datetime import datetime
+
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def parse_slot_label(label):
+    """解析 "HH:MM-HH:MM" 或 "HH:MM" 格式的時段字串，回傳 (start_time, end_time)"""
+    if '-' in label:
+        start_str, end_str = label.split('-')
+        return (
+            datetime.strptime(start_str.strip(), '%H:%M').time(),
+            datetime.strptime(end_str.strip(), '%H:%M').time(),
+        )
+    return datetime.strptime(label.strip(), '%H:%M').time(), None
 
 
 class Reservation(models.Model):
@@ -17,6 +31,8 @@ class Reservation(models.Model):
         ('cancelled', '已取消'),
         ('no_show', '未到場'),
     )
+    # 佔用時段容量的狀態
+    ACTIVE_STATUSES = ('pending', 'confirmed')
 
     # 訂位基本資訊
     reservation_number = models.CharField(
@@ -72,6 +88,17 @@ class Reservation(models.Model):
         verbose_name='訂位時段',
         help_text='例如: 18:00-20:00'
     )
+    # 對應的時段設定；time_slot 字串保留作為相容與顯示用途
+    # 索引由 Meta 中的 (slot, reservation_date) 複合索引涵蓋
+    slot = models.ForeignKey(
+        'TimeSlot',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='reservations',
+        verbose_name='時段設定'
+    )
     party_size = models.PositiveIntegerField(
         verbose_name='訂位人數（成人）'
     )
@@ -139,6 +166,9 @@ class Reservation(models.Model):
             models.Index(fields=['customer_phone']),
             models.Index(fields=['reservation_date', 'status']),
             models.Index(fields=['store', 'reservation_date']),
+            models.Index(fields=['slot', 'reservation_date']),
+            # 商家訂位列表的游標分頁
+            models.Index(fields=['store', '-created_at', '-id']),
         ]
         verbose_name = '訂位'
         verbose_name_plural = '訂位列表'
@@ -151,6 +181,14 @@ class Reservation(models.Model):
         if not self.reservation_number:
             self.reservation_number = self.generate_reservation_number()
         
+        # 相容舊的時段字串：只有字串時補上時段關聯，只有關聯時補上字串
+        if self.slot_id is None and self.time_slot and self.store_id and self.reservation_date:
+            self.slot = TimeSlot.objects.for_label(
+                self.store_id, self.reservation_date, self.time_slot
+            ).first()
+        elif self.slot_id and not self.time_slot:
+            self.time_slot = self.slot.label
+        
         # 訪客訂位時生成手機雜湊
         if not self.user and self.customer_phone and not self.phone_hash:
             import hashlib
@@ -162,22 +200,13 @@ class Reservation(models.Model):
     
     @staticmethod
     def generate_reservation_number():
-        """生成唯一訂位編號 格式: R + 日期(YYYYMMDD) + 隨機4碼"""
-        date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(secrets.choice(string.digits) for _ in range(4))
-        reservation_number = f"R{date_str}{random_str}"
-        
-        # 確保唯一性
-        while Reservation.objects.filter(reservation_number=reservation_number).exists():
-            random_str = ''.join(secrets.choice(string.digits) for _ in range(4))
-            reservation_number = f"R{date_str}{random_str}"
-        
-        return reservation_number
+        """生成唯一訂位編號 格式: R + 日期(YYYYMMDD) + 當日序號 + 檢查碼"""
+        return mint_code('R')
     
     @property
     def is_guest_reservation(self):
         """判斷是否為訪客訂位"""
-        return self.user is None
+        return self.user_id is None
     
     @property
     def can_edit(self):
@@ -239,6 +268,46 @@ class ReservationChangeLog(models.Model):
 
 
 
+class TimeSlotQuerySet(models.QuerySet):
+    def with_has_reservations(self):
+        """
+        以 EXISTS 子查詢標註每個時段是否有今天（含）之後、同一星期幾的待確認/已確認訂位
+        
+        標註欄位：future_reservations_exist
+        """
+        # Django 的 __week_day 以星期日為 1、星期六為 7
+        week_day_number = models.Case(
+            *[
+                models.When(day_of_week=name, then=models.Value((index + 1) % 7 + 1))
+                for index, name in enumerate(WEEKDAY_NAMES)
+            ],
+            output_field=models.IntegerField(),
+        )
+        future_reservations = Reservation.objects.filter(
+            slot=models.OuterRef('pk'),
+            reservation_date__gte=timezone.now().date(),
+            reservation_date__week_day=models.OuterRef('week_day_number'),
+            status__in=Reservation.ACTIVE_STATUSES,
+        )
+        return self.annotate(week_day_number=week_day_number).annotate(
+            future_reservations_exist=models.Exists(future_reservations)
+        )
+    
+    def for_label(self, store_id, reservation_date, label):
+        """依店家、訂位日期的星期與時段字串篩選時段，字串格式錯誤時回傳空查詢集"""
+        try:
+            start_time, end_time = parse_slot_label(label)
+        except (ValueError, AttributeError):
+            return self.none()
+        
+        return self.filter(
+            store_id=store_id,
+            day_of_week=WEEKDAY_NAMES[reservation_date.weekday()],
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+
 class TimeSlot(models.Model):
     """
     訂位時段
@@ -286,6 +355,8 @@ class TimeSlot(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TimeSlotQuerySet.as_manager()
+    
     class Meta:
         verbose_name = '訂位時段'
         verbose_name_plural = '訂位時段列表'
@@ -293,7 +364,56 @@ class TimeSlot(models.Model):
         unique_together = ['store', 'day_of_week', 'start_time']
     
     def __str__(self):
-        time_display = f"{self.start_time.strftime('%H:%M')}"
+        return f"{self.store.name} - {self.get_day_of_week_display()} {self.label}"
+    
+    def has_future_reservations(self):
+        """是否有今天（含）之後待確認/已確認的訂位，優先使用 with_has_reservations() 的標註"""
+        if hasattr(self, 'future_reservations_exist'):
+            return self.future_reservations_exist
+        return TimeSlot.objects.filter(pk=self.pk).with_has_reservations().values_list(
+            'future_reservations_exist', flat=True
+        ).first() or False
+    
+    @property
+    def label(self):
+        """時段字串，與 Reservation.time_slot 格式相同，例如: 18:00-20:00 或 18:00"""
+        label = self.start_time.strftime('%H:%M')
         if self.end_time:
-            time_display += f"-{self.end_time.strftime('%H:%M')}"
-        return f"{self.store.name} - {self.get_day_of_week_display()} {time_display}"
+            label += f"-{self.end_time.strftime('%H:%M')}"
+        return label
+
+
+class SlotOccupancy(models.Model):
+    """
+    時段佔用人數 - 以 (店家, 日期, 時段) 累計待確認與已確認訂位的人數
+
+    由訂位建立、取消與狀態變更流程以條件式 UPDATE 增減，
+    取代每次訂位都重新聚合所有訂位的做法。
+    """
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='slot_occupancies',
+        verbose_name='店家'
+    )
+    date = models.DateField(verbose_name='日期')
+    time_slot = models.ForeignKey(
+        TimeSlot,
+        on_delete=models.CASCADE,
+        related_name='occupancies',
+        verbose_name='時段'
+    )
+    booked = models.PositiveIntegerField(
+        default=0,
+        verbose_name='已訂人數',
+        help_text='成人與孩童人數合計'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = '時段佔用人數'
+        verbose_name_plural = '時段佔用人數列表'
+        unique_together = ['store', 'date', 'time_slot']
+    
+    def __str__(self):
+        return f"{self.time_slot} @ {self.date}: {self.booked}"
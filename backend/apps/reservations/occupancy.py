@@ -0,0 +1,132 @@
+"""
+時段佔用人數計數器
+
+訂位的容量檢查以 SlotOccupancy 上的單一條件式 UPDATE 完成：
+    UPDATE ... SET booked = booked + n WHERE booked <= max_capacity - n
+UPDATE 會鎖定該列，同時進行的訂位會依序重新判斷條件，因此不會超賣。
+"""
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+
+from .models import Reservation, SlotOccupancy, TimeSlot
+
+
+class CapacityExceeded(Exception):
+    """時段容量不足"""
+
+    def __init__(self, remaining):
+        self.remaining = remaining
+        super().__init__(f'此時段容量不足（剩餘 {remaining} 人）')
+
+
+class TimeSlotNotFound(Exception):
+    """找不到對應的訂位時段"""
+
+
+def find_time_slot(store_id, reservation_date, label):
+    """依店家、日期（星期）與時段字串找到對應且啟用中的 TimeSlot"""
+    time_slot = TimeSlot.objects.for_label(
+        store_id, reservation_date, label
+    ).filter(is_active=True).first()
+    if not time_slot:
+        raise TimeSlotNotFound('找不到對應的訂位時段')
+    return time_slot
+
+
+def get_active_time_slot(slot_id):
+    """依 id 取得啟用中的 TimeSlot"""
+    time_slot = TimeSlot.objects.filter(pk=slot_id, is_active=True).first()
+    if not time_slot:
+        raise TimeSlotNotFound('找不到對應的訂位時段')
+    return time_slot
+
+
+def occupancy_key(reservation):
+    """
+    訂位目前佔用的容量：(日期, 時段 id, 人數)
+
+    非佔用狀態（已完成、已取消、未到場）回傳 None。
+    """
+    if reservation.status not in Reservation.ACTIVE_STATUSES:
+        return None
+    return (
+        reservation.reservation_date,
+        reservation.slot_id,
+        reservation.party_size + reservation.children_count,
+    )
+
+
+def _get_or_seed(time_slot, date):
+    """取得佔用計數列，不存在時以既有的訂位人數初始化"""
+    occupancy = SlotOccupancy.objects.filter(
+        store_id=time_slot.store_id, date=date, time_slot=time_slot
+    ).first()
+    if occupancy:
+        return occupancy
+
+    seeded = Reservation.objects.filter(
+        slot=time_slot,
+        reservation_date=date,
+        status__in=Reservation.ACTIVE_STATUSES,
+    ).aggregate(total=Sum(F('party_size') + F('children_count')))['total'] or 0
+
+    occupancy, _ = SlotOccupancy.objects.get_or_create(
+        store_id=time_slot.store_id,
+        date=date,
+        time_slot=time_slot,
+        defaults={'booked': seeded},
+    )
+    return occupancy
+
+
+def reserve_seats(time_slot, date, seats):
+    """佔用時段容量，容量不足時拋出 CapacityExceeded"""
+    with transaction.atomic():
+        occupancy = _get_or_seed(time_slot, date)
+        updated = SlotOccupancy.objects.filter(
+            pk=occupancy.pk,
+            booked__lte=time_slot.max_capacity - seats,
+        ).update(booked=F('booked') + seats)
+
+        if not updated:
+            occupancy.refresh_from_db(fields=['booked'])
+            raise CapacityExceeded(max(time_slot.max_capacity - occupancy.booked, 0))
+
+
+def release_seats(date, slot_id, seats):
+    """釋放時段容量（不會低於 0）"""
+    if slot_id is None:
+        return
+    SlotOccupancy.objects.filter(
+        time_slot_id=slot_id,
+        date=date,
+    ).update(booked=Greatest(F('booked') - seats, Value(0)))
+
+
+def release_many(releases):
+    """
+    批次釋放容量：{(日期, 時段 id): 人數}
+
+    同一時段的多筆訂位合計後只執行一個 UPDATE（例如打烊時批次標記完成）。
+    """
+    for (date, slot_id), seats in releases.items():
+        release_seats(date, slot_id, seats)
+
+
+def apply_change(before, after):
+    """
+    依訂位變更前後的佔用狀態調整計數器
+
+    before / after 為 occupancy_key() 的回傳值。先釋放舊的佔用再佔用新的，
+    需在呼叫端的 transaction 中執行，容量不足時整筆變更會一起回滾。
+    """
+    if before == after:
+        return
+
+    with transaction.atomic():
+        if before:
+            release_seats(*before)
+        if after:
+            date, slot_id, seats = after
+            reserve_seats(get_active_time_slot(slot_id), date, seats)
@@ -1,5 +1,13 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Reservation, ReservationChangeLog, TimeSlot
+from .occupancy import (
+    CapacityExceeded,
+    TimeSlotNotFound,
+    apply_change,
+    find_time_slot,
+    occupancy_key,
+)
 from apps.stores.models import Store
 from apps.users.models import User
 
@@ -29,6 +37,7 @@ class ReservationSerializer(serializers.ModelSerializer):
             'customer_gender',
             'reservation_date',
             'time_slot',
+            'slot',
             'party_size',
             'children_count',
             'special_requests',
@@ -46,6 +55,7 @@ class ReservationSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id',
             'reservation_number',
+            'slot',
             'cancelled_at',
             'created_at',
             'updated_at',
@@ -214,10 +224,33 @@ class ReservationUpdateSerializer(serializers.ModelSerializer):
             else:  # 其他類型轉為字串
                 new_values[key] = str(value)
         
-        # 更新
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            # 鎖定訂位列後再計算原本佔用的容量
+            before = occupancy_key(Reservation.objects.select_for_update().get(pk=instance.pk))
+            
+            # 變更時段時重新對應時段設定
+            time_slot = validated_data.get('time_slot')
+            if time_slot and time_slot != instance.time_slot:
+                try:
+                    validated_data['slot'] = find_time_slot(
+                        instance.store_id, instance.reservation_date, time_slot
+                    )
+                except TimeSlotNotFound as e:
+                    raise serializers.ValidationError({'time_slot': str(e)})
+            
+            # 更新
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            
+            # 人數或時段變更時重新佔用容量
+            try:
+                apply_change(before, occupancy_key(instance))
+            except TimeSlotNotFound as e:
+                raise serializers.ValidationError({'time_slot': str(e)})
+            except CapacityExceeded as e:
+                raise serializers.ValidationError({'party_size': str(e)})
+            
+            instance.save()
         
         # 記錄變更日誌
         request = self.context.get('request')
@@ -249,6 +282,22 @@ class ReservationCancelSerializer(serializers.Serializer):
     )
 
 
+class ReservationBulkStatusSerializer(serializers.Serializer):
+    """商家批次更新訂位狀態序列化器"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=200
+    )
+    status = serializers.ChoiceField(choices=Reservation.STATUS_CHOICES)
+    cancel_reason = serializers.CharField(
+        required=False,
+        max_length=500,
+        allow_blank=True,
+        default=''
+    )
+
+
 class GuestReservationVerifySerializer(serializers.Serializer):
     """訪客訂位驗證序列化器"""
     phone_number = serializers.CharField(
@@ -306,37 +355,8 @@ class TimeSlotSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'store', 'has_reservations', 'created_at', 'updated_at']
     
     def get_has_reservations(self, obj):
-        """檢查該時段（相同星期幾）是否有未來的訂位"""
-        from django.utils import timezone
-        
-        # 構造時間字串
-        if obj.end_time:
-            time_str = f"{obj.start_time.strftime('%H:%M')}-{obj.end_time.strftime('%H:%M')}"
-        else:
-            time_str = obj.start_time.strftime('%H:%M')
-        
-        # 星期幾對應表
-        day_of_week_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        target_weekday = day_of_week_map[obj.day_of_week]
-        
-        # 獲取未來的訂位
-        today = timezone.now().date()
-        future_reservations = Reservation.objects.filter(
-            time_slot=time_str,
-            store=obj.store,
-            reservation_date__gte=today,
-            status__in=['pending', 'confirmed']
-        )
-        
-        # 只檢查符合該星期幾的訂位
-        for reservation in future_reservations:
-            if reservation.reservation_date.weekday() == target_weekday:
-                return True
-        
-        return False
+        """檢查該時段是否有未來的訂位"""
+        return obj.has_future_reservations()
     
     def validate(self, data):
         """驗證時段時間和容量設定"""
@@ -394,29 +414,15 @@ class TimeSlotWithAvailabilitySerializer(serializers.ModelSerializer):
         if not date:
             return 0
         
-        from django.db.models import Sum
-        # obj 是 TimeSlot 實例，需要構造時間字串來匹配 Reservation 的 time_slot CharField
-        if obj.end_time:
-            time_str = f"{obj.start_time.strftime('%H:%M')}-{obj.end_time.strftime('%H:%M')}"
-        else:
-            time_str = obj.start_time.strftime('%H:%M')
-        
-        reservations = Reservation.objects.filter(
-            time_slot=time_str,
-            store=obj.store,
-            reservation_date=date,
-            status__in=['pending', 'confirmed']
-        )
-        
-        result = reservations.aggregate(
-            total_adults=Sum('party_size'),
-            total_children=Sum('children_count')
-        )
+        from .availability import get_booked_headcount, lookup_bookings
         
-        total_adults = result['total_adults'] or 0
-        total_children = result['total_children'] or 0
+        # 由 view 預先以單一查詢計算好的已訂人數；若未提供則計算一次後快取於 context
+        bookings = self.context.get('bookings')
+        if bookings is None:
+            bookings = get_booked_headcount(date)
+            self.context['bookings'] = bookings
         
-        return total_adults + total_children
+        return lookup_bookings(bookings, obj, date)
     
     def get_available(self, obj):
         """檢查時段是否還有空位"""
@@ -452,6 +458,7 @@ class MerchantReservationSerializer(serializers.ModelSerializer):
             'customer_gender',
             'reservation_date',
             'time_slot',
+            'slot',
             'party_size',
             'children_count',
             'special_requests',
@@ -464,7 +471,7 @@ class MerchantReservationSerializer(serializers.ModelSerializer):
             'confirmed_at',
             'is_guest_reservation',
         ]
-        read_only_fields = ['id', 'reservation_number', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'reservation_number', 'slot', 'created_at', 'updated_at']
 
 
 class MerchantReservationUpdateSerializer(serializers.ModelSerializer):
@@ -478,26 +485,37 @@ class MerchantReservationUpdateSerializer(serializers.ModelSerializer):
         """更新訂位狀態"""
         from django.utils import timezone
         
-        old_status = instance.status
-        new_status = validated_data.get('status', instance.status)
-        
-        # 如果狀態變更為已確認，記錄確認時間
-        if new_status == 'confirmed' and old_status != 'confirmed':
-            validated_data['confirmed_at'] = timezone.now()
-        
-        # 更新
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        # 記錄變更日誌
-        ReservationChangeLog.objects.create(
-            reservation=instance,
-            changed_by='merchant',
-            change_type='updated',
-            old_values={'status': old_status},
-            new_values={'status': new_status},
-            note=f'狀態變更: {old_status} -> {new_status}'
-        )
+        with transaction.atomic():
+            # 鎖定訂位列，以資料庫中的狀態為準
+            locked = Reservation.objects.select_for_update().get(pk=instance.pk)
+            old_status = locked.status
+            before = occupancy_key(locked)
+            new_status = validated_data.get('status', old_status)
+            
+            # 如果狀態變更為已確認，記錄確認時間
+            if new_status == 'confirmed' and old_status != 'confirmed':
+                validated_data['confirmed_at'] = timezone.now()
+            
+            # 更新
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            
+            # 進入或離開待確認/已確認狀態時調整時段容量
+            try:
+                apply_change(before, occupancy_key(instance))
+            except (TimeSlotNotFound, CapacityExceeded) as e:
+                raise serializers.ValidationError({'status': str(e)})
+            
+            instance.save()
+            
+            # 記錄變更日誌
+            ReservationChangeLog.objects.create(
+                reservation=instance,
+                changed_by='merchant',
+                change_type='updated',
+                old_values={'status': old_status},
+                new_values={'status': new_status},
+                note=f'狀態變更: {old_status} -> {new_status}'
+            )
         
         return instance
@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.stores.models import Store
+from apps.users.models import Merchant, User
+
+from .models import Reservation
+
+
+class ReservationListQueryCountTests(TestCase):
+    """
+    訂位列表的查詢數不應隨筆數增加
+
+    序列化器讀取的關聯（store、user）需由 get_queryset 一次載入。
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.merchant_user = User.objects.create_user(
+            email='merchant@example.com', password='x', username='merchant',
+            firebase_uid='merchant', user_type='merchant',
+        )
+        merchant = Merchant.objects.create(user=cls.merchant_user, company_account='00000001')
+        cls.store = Store.objects.create(
+            merchant=merchant, name='店家', address='地址', phone='0212345678',
+        )
+        cls.customer = cls.create_customer(0)
+
+    @staticmethod
+    def create_customer(index):
+        return User.objects.create_user(
+            email=f'customer{index}@example.com', password='x', username=f'customer{index}',
+            firebase_uid=f'customer{index}', user_type='customer',
+        )
+
+    def create_reservations(self, count, user=None):
+        start = Reservation.objects.count()
+        for index in range(start, start + count):
+            Reservation.objects.create(
+                # 指定編號，不經過序號配置
+                reservation_number=f'TEST{index:05d}',
+                store=self.store,
+                user=user or self.create_customer(index + 1),
+                customer_name='顧客',
+                customer_phone='0912345678',
+                reservation_date=date(2026, 1, 1),
+                time_slot='18:00-19:00',
+                party_size=2,
+            )
+
+    def assertConstantListQueries(self, client, url, create_rows):
+        create_rows(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+        create_rows(4)
+        with self.assertNumQueries(len(queries)):
+            response = client.get(url)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_customer_list(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.assertConstantListQueries(
+            client, '/api/reservations/',
+            lambda count: self.create_reservations(count, user=self.customer),
+        )
+
+    def test_merchant_list(self):
+        client = APIClient()
+        client.force_authenticate(self.merchant_user)
+        self.assertConstantListQueries(
+            client, '/api/merchant/reservations/', self.create_reservations,
+        )
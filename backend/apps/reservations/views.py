@@ -1,7 +1,8 @@
-from rest_framework import viewsets, status, permissions
+from rest_framework import mixins, viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 import hashlib
 
@@ -11,19 +12,41 @@ from .serializers import (
     ReservationCreateSerializer,
     ReservationUpdateSerializer,
     ReservationCancelSerializer,
+    ReservationBulkStatusSerializer,
     GuestReservationVerifySerializer,
     ReservationChangeLogSerializer,
     TimeSlotSerializer,
     MerchantReservationSerializer,
     MerchantReservationUpdateSerializer,
 )
+from .bulk import bulk_update_status
+from .occupancy import (
+    CapacityExceeded,
+    TimeSlotNotFound,
+    apply_change,
+    find_time_slot,
+    occupancy_key,
+    reserve_seats,
+)
+from apps.common.cache import cached_catalog, store_id_from_query
+from apps.common.stats import (
+    StatsParamError,
+    bucketed_histogram,
+    filter_date_range,
+    parse_stats_params,
+    status_histogram,
+)
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(mixins.CreateModelMixin,
+                         mixins.RetrieveModelMixin,
+                         mixins.UpdateModelMixin,
+                         mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
     """
     訂位 ViewSet - 顧客端
     
-    提供訂位的 CRUD 操作
+    提供訂位的建立、查詢與修改（不提供刪除，顧客以 cancel 取消並釋放時段容量）
     - 會員和訪客都可以建立訂位
     - 會員可以查看自己的所有訂位
     - 訪客透過手機號碼驗證查看訂位
@@ -48,10 +71,10 @@ class ReservationViewSet(viewsets.ModelViewSet):
         
         if user.is_authenticated:
             # 會員查看自己的訂位
-            return Reservation.objects.filter(user=user)
+            return Reservation.objects.filter(user=user).select_related('store')
         
         # 訪客也可以訪問訂位（會在各個 action 中驗證手機號碼）
-        return Reservation.objects.all()
+        return Reservation.objects.select_related('store')
     
     def create(self, request, *args, **kwargs):
         """建立訂位"""
@@ -73,45 +96,10 @@ class ReservationViewSet(viewsets.ModelViewSet):
         
         # 從字串解析時間並找到對應的 TimeSlot 模型
         try:
-            from datetime import datetime
-            
-            # 處理時段格式：可能是 "18:00-20:00" 或 "18:00"
-            if '-' in time_slot_str:
-                start_time_str, end_time_str = time_slot_str.split('-')
-                start_time = datetime.strptime(start_time_str.strip(), '%H:%M').time()
-                end_time = datetime.strptime(end_time_str.strip(), '%H:%M').time()
-                
-                day_of_week = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'][reservation_date.weekday()]
-                
-                time_slot_obj = TimeSlot.objects.filter(
-                    store=store,
-                    day_of_week=day_of_week,
-                    start_time=start_time,
-                    end_time=end_time,
-                    is_active=True
-                ).first()
-            else:
-                # 只有開始時間
-                start_time = datetime.strptime(time_slot_str.strip(), '%H:%M').time()
-                
-                day_of_week = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'][reservation_date.weekday()]
-                
-                time_slot_obj = TimeSlot.objects.filter(
-                    store=store,
-                    day_of_week=day_of_week,
-                    start_time=start_time,
-                    end_time__isnull=True,
-                    is_active=True
-                ).first()
-            
-            if not time_slot_obj:
-                return Response(
-                    {'error': '找不到對應的訂位時段'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except (ValueError, AttributeError) as e:
+            time_slot_obj = find_time_slot(store.id, reservation_date, time_slot_str)
+        except TimeSlotNotFound as e:
             return Response(
-                {'error': f'時段格式錯誤: {str(e)}'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -122,32 +110,17 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # 檢查時段容量
-        from django.db.models import Sum
-        reservations = Reservation.objects.filter(
-            time_slot=time_slot_str,
-            store=store,
-            reservation_date=reservation_date,
-            status__in=['pending', 'confirmed']
-        )
-        
-        result = reservations.aggregate(
-            total_adults=Sum('party_size'),
-            total_children=Sum('children_count')
-        )
-        
-        current_adults = result['total_adults'] or 0
-        current_children = result['total_children'] or 0
-        current_bookings = current_adults + current_children
-        
-        if current_bookings + total_party_size > time_slot_obj.max_capacity:
+        # 以條件式 UPDATE 佔用時段容量，與建立訂位在同一個 transaction 中完成
+        try:
+            with transaction.atomic():
+                reserve_seats(time_slot_obj, reservation_date, total_party_size)
+                reservation = serializer.save(slot=time_slot_obj)
+        except CapacityExceeded as e:
             return Response(
-                {'error': f'此時段容量不足（剩餘 {time_slot_obj.max_capacity - current_bookings} 人）'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        reservation = serializer.save()
-        
         # 返回完整訂位資訊
         response_serializer = ReservationSerializer(reservation)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
@@ -198,7 +171,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             phone_hash=phone_hash,
             user__isnull=True,  # 僅訪客訂位
             reservation_date__gte=thirty_days_ago
-        ).order_by('-created_at')
+        ).select_related('store').order_by('-created_at')
         
         if not reservations.exists():
             return Response(
@@ -248,22 +221,37 @@ class ReservationViewSet(viewsets.ModelViewSet):
         serializer = ReservationCancelSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # 更新狀態
-        instance.status = 'cancelled'
-        instance.cancelled_at = timezone.now()
-        instance.cancelled_by = 'customer'
-        instance.cancel_reason = serializer.validated_data.get('cancel_reason', '')  # 使用 get 並設定預設值
-        instance.save()
-        
-        # 記錄變更
-        ReservationChangeLog.objects.create(
-            reservation=instance,
-            changed_by='customer',
-            change_type='cancelled',
-            old_values={'status': 'confirmed'},
-            new_values={'status': 'cancelled', 'cancel_reason': instance.cancel_reason},
-            note='顧客取消訂位'
-        )
+        with transaction.atomic():
+            # 鎖定訂位列，避免重複取消而重複釋放容量
+            instance = Reservation.objects.select_for_update().get(pk=instance.pk)
+            if not instance.can_cancel:
+                return Response(
+                    {'error': '此訂位狀態無法取消'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            old_status = instance.status
+            before = occupancy_key(instance)
+            
+            # 更新狀態
+            instance.status = 'cancelled'
+            instance.cancelled_at = timezone.now()
+            instance.cancelled_by = 'customer'
+            instance.cancel_reason = serializer.validated_data.get('cancel_reason', '')  # 使用 get 並設定預設值
+            instance.save()
+            
+            # 釋放時段容量
+            apply_change(before, None)
+            
+            # 記錄變更
+            ReservationChangeLog.objects.create(
+                reservation=instance,
+                changed_by='customer',
+                change_type='cancelled',
+                old_values={'status': old_status},
+                new_values={'status': 'cancelled', 'cancel_reason': instance.cancel_reason},
+                note='顧客取消訂位'
+            )
         
         return Response(ReservationSerializer(instance).data)
     
@@ -299,6 +287,8 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
     serializer_class = MerchantReservationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    page_size = 50
+    max_page_size = 200
     
     def get_queryset(self):
         """僅返回商家自己店家的訂位"""
@@ -311,7 +301,7 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
         # 取得商家的店家
         try:
             store = user.merchant_profile.store
-            return Reservation.objects.filter(store=store)
+            return Reservation.objects.filter(store=store).select_related('store', 'user')
         except:
             return Reservation.objects.none()
     
@@ -335,6 +325,44 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
         
         return Response(MerchantReservationSerializer(instance).data)
     
+    @action(detail=False, methods=['post'], url_path='bulk-update-status')
+    def bulk_status(self, request):
+        """
+        批次更新訂位狀態（單一交易）
+        
+        POST /api/merchant/reservations/bulk-update-status/
+        Body: {"ids": [1, 2, 3], "status": "completed", "cancel_reason": ""}
+        
+        回傳各筆結果，無法轉換的訂位不影響其他訂位。
+        """
+        try:
+            store = request.user.merchant_profile.store
+        except AttributeError:
+            return Response(
+                {'error': '找不到店家資料'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = ReservationBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        results = bulk_update_status(
+            store,
+            data['ids'],
+            data['status'],
+            cancel_reason=data['cancel_reason'],
+        )
+        updated = sum(1 for result in results if result['success'] and result['changed'])
+        failed = sum(1 for result in results if not result['success'])
+        
+        return Response({
+            'status': data['status'],
+            'updated': updated,
+            'failed': failed,
+            'results': results,
+        })
+    
     @action(detail=True, methods=['post'], url_path='cancel')
     def cancel_reservation(self, request, pk=None):
         """
@@ -354,21 +382,36 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
         serializer = ReservationCancelSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        instance.status = 'cancelled'
-        instance.cancelled_at = timezone.now()
-        instance.cancelled_by = 'merchant'
-        instance.cancel_reason = serializer.validated_data.get('cancel_reason', '')  # 使用 get 並設定預設值
-        instance.save()
-        
-        # 記錄變更
-        ReservationChangeLog.objects.create(
-            reservation=instance,
-            changed_by='merchant',
-            change_type='cancelled',
-            old_values={'status': instance.status},
-            new_values={'status': 'cancelled', 'cancel_reason': instance.cancel_reason},
-            note='商家取消訂位'
-        )
+        with transaction.atomic():
+            # 鎖定訂位列，避免重複取消而重複釋放容量
+            instance = Reservation.objects.select_for_update().get(pk=instance.pk)
+            if not instance.can_cancel:
+                return Response(
+                    {'error': '此訂位狀態無法取消'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            old_status = instance.status
+            before = occupancy_key(instance)
+            
+            instance.status = 'cancelled'
+            instance.cancelled_at = timezone.now()
+            instance.cancelled_by = 'merchant'
+            instance.cancel_reason = serializer.validated_data.get('cancel_reason', '')  # 使用 get 並設定預設值
+            instance.save()
+            
+            # 釋放時段容量
+            apply_change(before, None)
+            
+            # 記錄變更
+            ReservationChangeLog.objects.create(
+                reservation=instance,
+                changed_by='merchant',
+                change_type='cancelled',
+                old_values={'status': old_status},
+                new_values={'status': 'cancelled', 'cancel_reason': instance.cancel_reason},
+                note='商家取消訂位'
+            )
         
         return Response(MerchantReservationSerializer(instance).data)
     
@@ -399,8 +442,10 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
             note='商家刪除訂位記錄'
         )
         
-        # 執行刪除
-        instance.delete()
+        # 執行刪除並釋放時段容量
+        with transaction.atomic():
+            apply_change(occupancy_key(instance), None)
+            instance.delete()
         
         return Response(
             {'message': f'訂位 {reservation_number} 已刪除'},
@@ -409,18 +454,29 @@ class MerchantReservationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], url_path='stats')
     def statistics(self, request):
-        """訂位統計資訊"""
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total': queryset.count(),
-            'pending': queryset.filter(status='pending').count(),
-            'confirmed': queryset.filter(status='confirmed').count(),
-            'completed': queryset.filter(status='completed').count(),
-            'cancelled': queryset.filter(status='cancelled').count(),
-            'no_show': queryset.filter(status='no_show').count(),
-        }
-        
+        """
+        訂位統計資訊
+
+        GET /api/merchant/reservations/stats/?start_date=&end_date=&bucket=day
+        - start_date / end_date: 依訂位日期篩選（選填）
+        - bucket: day / week / month，提供時額外回傳各區間的統計
+        """
+        try:
+            start_date, end_date, bucket = parse_stats_params(request.query_params)
+        except StatsParamError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = filter_date_range(
+            self.get_queryset(), 'reservation_date', start_date, end_date
+        )
+        statuses = [value for value, _ in Reservation.STATUS_CHOICES]
+
+        stats = status_histogram(queryset, statuses)
+        if bucket:
+            stats['buckets'] = bucketed_histogram(
+                queryset, 'reservation_date', bucket, statuses
+            )
+
         return Response(stats)
 
 
@@ -429,6 +485,9 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('day_of_week', 'start_time', 'id')
+    page_size = 100
+    max_page_size = 200
     
     def get_queryset(self):
         """僅返回商家自己店家的時段"""
@@ -439,7 +498,8 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
         
         try:
             store = user.merchant_profile.store
-            return TimeSlot.objects.filter(store=store)
+            # 一次查詢標註所有時段是否有未來訂位
+            return TimeSlot.objects.filter(store=store).with_has_reservations()
         except:
             return TimeSlot.objects.none()
     
@@ -460,38 +520,8 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
         """更新時段前檢查是否有訂位"""
         instance = self.get_object()
         
-        # 構造時間字串來檢查訂位
-        if instance.end_time:
-            time_str = f"{instance.start_time.strftime('%H:%M')}-{instance.end_time.strftime('%H:%M')}"
-        else:
-            time_str = instance.start_time.strftime('%H:%M')
-        
-        # 檢查該時段（相同星期幾）是否有訂位
-        from django.utils import timezone
-        from datetime import datetime, timedelta
-        
-        # 獲取該星期幾的所有未來日期的訂位
-        day_of_week_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        target_weekday = day_of_week_map[instance.day_of_week]
-        
-        # 檢查未來的訂位日期是否符合該星期幾
-        today = timezone.now().date()
-        future_reservations = Reservation.objects.filter(
-            time_slot=time_str,
-            store=instance.store,
-            reservation_date__gte=today,
-            status__in=['pending', 'confirmed']
-        )
-        
-        # 過濾出符合該星期幾的訂位
-        has_reservations = False
-        for reservation in future_reservations:
-            if reservation.reservation_date.weekday() == target_weekday:
-                has_reservations = True
-                break
+        # 檢查該時段是否有未來的訂位
+        has_reservations = instance.has_future_reservations()
         
         if has_reservations:
             return Response(
@@ -505,37 +535,8 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
         """刪除時段前檢查是否有訂位"""
         instance = self.get_object()
         
-        # 構造時間字串來檢查訂位
-        if instance.end_time:
-            time_str = f"{instance.start_time.strftime('%H:%M')}-{instance.end_time.strftime('%H:%M')}"
-        else:
-            time_str = instance.start_time.strftime('%H:%M')
-        
-        # 檢查該時段（相同星期幾）是否有訂位
-        from django.utils import timezone
-        
-        # 獲取該星期幾的所有未來日期的訂位
-        day_of_week_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        target_weekday = day_of_week_map[instance.day_of_week]
-        
-        # 檢查未來的訂位日期是否符合該星期幾
-        today = timezone.now().date()
-        future_reservations = Reservation.objects.filter(
-            time_slot=time_str,
-            store=instance.store,
-            reservation_date__gte=today,
-            status__in=['pending', 'confirmed']
-        )
-        
-        # 過濾出符合該星期幾的訂位
-        has_reservations = False
-        for reservation in future_reservations:
-            if reservation.reservation_date.weekday() == target_weekday:
-                has_reservations = True
-                break
+        # 檢查該時段是否有未來的訂位
+        has_reservations = instance.has_future_reservations()
         
         if has_reservations:
             return Response(
@@ -551,6 +552,9 @@ class PublicTimeSlotViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = TimeSlot.objects.filter(is_active=True)
     serializer_class = TimeSlotSerializer
     permission_classes = [permissions.AllowAny]
+    cursor_ordering = ('day_of_week', 'start_time', 'id')
+    page_size = 100
+    max_page_size = 200
     
     def get_queryset(self):
         """根據 store_id 篩選時段"""
@@ -564,7 +568,15 @@ class PublicTimeSlotViewSet(viewsets.ReadOnlyModelViewSet):
                 # 如果 store_id 無效，返回空查詢集
                 return TimeSlot.objects.none()
         
-        return queryset.order_by('day_of_week', 'start_time')
+        return queryset.with_has_reservations().order_by('day_of_week', 'start_time')
+    
+    @cached_catalog('time_slots', scope=store_id_from_query('store_id'))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_catalog('time_slots')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     def get_serializer_class(self):
         """根據 query param 決定使用哪個 serializer"""
@@ -574,13 +586,70 @@ class PublicTimeSlotViewSet(viewsets.ReadOnlyModelViewSet):
         return TimeSlotSerializer
     
     def get_serializer_context(self):
-        """傳遞日期給 serializer"""
+        """傳遞日期與該日各時段已訂人數給 serializer"""
         context = super().get_serializer_context()
         date_str = self.request.query_params.get('date')
         if date_str:
             from datetime import datetime
+            from .availability import get_booked_headcount
             try:
                 context['date'] = datetime.strptime(date_str, '%Y-%m-%d').date()
             except ValueError:
                 pass
+            else:
+                # 一次 GROUP BY 查詢取得所有時段的已訂人數
+                context['bookings'] = get_booked_headcount(
+                    context['date'],
+                    store_id=self._get_store_id(),
+                )
         return context
+    
+    def _get_store_id(self):
+        store_id = self.request.query_params.get('store_id', None)
+        if store_id and store_id != 'undefined':
+            try:
+                return int(store_id)
+            except (ValueError, TypeError):
+                return None
+        return None
+    
+    @action(detail=False, methods=['get'], url_path='availability')
+    @cached_catalog('time_slots', scope=store_id_from_query('store_id'))
+    def availability(self, request):
+        """
+        多日可用時段日曆
+        
+        GET /api/time-slots/availability/?store_id=1&start_date=2025-01-01&days=14
+        """
+        from datetime import datetime
+        from .availability import build_calendar, MAX_CALENDAR_DAYS
+        from .serializers import TimeSlotWithAvailabilitySerializer
+        
+        store_id = self._get_store_id()
+        if store_id is None:
+            return Response(
+                {'error': '請提供有效的 store_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        start_date_str = request.query_params.get('start_date')
+        try:
+            if start_date_str:
+                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            else:
+                start_date = timezone.now().date()
+            days = int(request.query_params.get('days', 14))
+        except ValueError:
+            return Response(
+                {'error': '日期格式應為 YYYY-MM-DD，天數須為整數'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if days < 1 or days > MAX_CALENDAR_DAYS:
+            return Response(
+                {'error': f'天數必須介於 1 到 {MAX_CALENDAR_DAYS} 之間'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        calendar = build_calendar(store_id, start_date, days, TimeSlotWithAvailabilitySerializer)
+        return Response(calendar)
@@ -0,0 +1,51 @@
+"""排班匯出欄位"""
+from collections import defaultdict
+
+from apps.common.exports import Column, choice_display, iter_rows
+
+from .models import Shift
+
+
+def _shift_name(row):
+    start_time = f"{row['start_hour']:02d}:{row['start_minute']:02d}"
+    end_time = f"{row['end_hour']:02d}:{row['end_minute']:02d}"
+    shift_type = dict(Shift.SHIFT_TYPE_CHOICES).get(row['shift_type'], row['shift_type'])
+    return f"{shift_type} ({start_time} - {end_time})"
+
+
+SHIFT_COLUMNS = [
+    Column('日期', 'date'),
+    Column(
+        '時段',
+        compute=_shift_name,
+        depends=('shift_type', 'start_hour', 'start_minute', 'end_hour', 'end_minute'),
+    ),
+    Column('職務', 'role'),
+    Column('需求人數', 'staff_needed'),
+    Column('已排人員', compute=lambda row: ', '.join(row['staff_names']) or '-'),
+    Column('狀態', 'status', format=choice_display(Shift.STATUS_CHOICES)),
+]
+
+
+def _attach_staff_names(rows):
+    """每批排班以一次查詢取得指派員工姓名"""
+    through = Shift.assigned_staff.through
+    names = defaultdict(list)
+    for shift_id, name in (
+        through.objects.filter(shift_id__in=[row['id'] for row in rows])
+        .order_by('staff__name')
+        .values_list('shift_id', 'staff__name')
+    ):
+        names[shift_id].append(name)
+    for row in rows:
+        row['staff_names'] = names.get(row['id'], [])
+
+
+def shift_rows(queryset):
+    """排班匯出列"""
+    return iter_rows(
+        queryset.order_by('date', 'start_hour', 'start_minute', 'id'),
+        SHIFT_COLUMNS,
+        extra_fields=('id',),
+        extend_chunk=_attach_staff_names,
+    )
@@ -65,9 +65,21 @@ class ShiftSerializer(serializers.ModelSerializer):
         }
 
 
+class StaffSyncSerializer(StaffSerializer):
+    """批次同步用員工序列化器（保留前端送出的 id 以比對既有資料）"""
+    
+    id = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ShiftSyncSerializer(ShiftSerializer):
+    """批次同步用排班序列化器（保留前端送出的 id 以比對既有資料）"""
+    
+    id = serializers.IntegerField(required=False, allow_null=True)
+
+
 class ScheduleDataSerializer(serializers.Serializer):
     """排班資料批次序列化器（用於一次性儲存所有資料）"""
     
-    shifts = ShiftSerializer(many=True, required=False, allow_empty=True)
-    staff = StaffSerializer(many=True, required=False, allow_empty=True)
+    shifts = ShiftSyncSerializer(many=True, required=False, allow_empty=True)
+    staff = StaffSyncSerializer(many=True, required=False, allow_empty=True)
 
@@ -0,0 +1,131 @@
+"""
+排班資料批次同步
+
+前端一次送出店家完整的員工與排班列表，這裡與資料庫比對後：
+- 帶有既有 id 的列只在欄位有變動時以 bulk_update 更新（id 保持不變）
+- 沒有 id 或 id 不屬於此店家的列（前端暫時 id）以 bulk_create 新增
+- 資料庫中有、但這次沒有送出的列刪除
+- 指派關係與中介表比對，只刪除移除的配對並以單一 bulk_create 新增配對
+
+全部在同一個交易中完成，任何一步失敗都會整筆回滾。
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Shift, Staff
+
+
+logger = logging.getLogger(__name__)
+
+STAFF_FIELDS = ('name', 'role', 'status')
+SHIFT_FIELDS = (
+    'date', 'shift_type', 'role', 'staff_needed',
+    'start_hour', 'start_minute', 'end_hour', 'end_minute', 'status',
+)
+
+
+def _sync_rows(model, store, items, fields, now):
+    """
+    同步單一模型的列，回傳 (前端 id -> 資料庫 id, 新增數, 更新數, 刪除數)
+
+    items 為已驗證的資料列表，可包含前端的 id。
+    """
+    existing = {
+        obj.pk: obj
+        for obj in model.objects.select_for_update().filter(store=store)
+    }
+    id_map = {}
+    to_update = []
+    to_create = []
+
+    for item in items:
+        client_id = item.get('id')
+        values = {field: item[field] for field in fields if field in item}
+        obj = existing.pop(client_id, None) if client_id is not None else None
+
+        if obj is None:
+            to_create.append((client_id, model(store=store, **values)))
+            continue
+
+        id_map[client_id] = obj.pk
+        changed = [field for field, value in values.items() if getattr(obj, field) != value]
+        if changed:
+            for field in changed:
+                setattr(obj, field, values[field])
+            obj.updated_at = now
+            to_update.append(obj)
+
+    if to_update:
+        model.objects.bulk_update(to_update, [*fields, 'updated_at'])
+    created = model.objects.bulk_create([obj for _, obj in to_create])
+    for (client_id, _), obj in zip(to_create, created):
+        if client_id is not None:
+            id_map[client_id] = obj.pk
+
+    deleted = len(existing)
+    if existing:
+        model.objects.filter(pk__in=list(existing)).delete()
+
+    return id_map, len(created), len(to_update), deleted
+
+
+def _sync_assignments(store, shifts_data, shift_ids, staff_ids):
+    """比對排班與員工的指派關係，回傳 (新增數, 刪除數)"""
+    through = Shift.assigned_staff.through
+
+    wanted = set()
+    for item in shifts_data:
+        shift_pk = shift_ids.get(item.get('id'))
+        if shift_pk is None:
+            continue
+        for client_staff_id in item.get('assigned_staff_ids') or []:
+            # 未出現在本次員工列表中的 id 視為無效（已刪除或不屬於此店家）
+            staff_pk = staff_ids.get(client_staff_id)
+            if staff_pk is not None:
+                wanted.add((shift_pk, staff_pk))
+
+    stale = []
+    for pk, shift_id, staff_id in through.objects.filter(
+        shift__store=store
+    ).values_list('pk', 'shift_id', 'staff_id'):
+        if (shift_id, staff_id) in wanted:
+            wanted.discard((shift_id, staff_id))
+        else:
+            stale.append(pk)
+
+    if stale:
+        through.objects.filter(pk__in=stale).delete()
+    through.objects.bulk_create([
+        through(shift_id=shift_id, staff_id=staff_id)
+        for shift_id, staff_id in sorted(wanted)
+    ])
+    return len(wanted), len(stale)
+
+
+def sync_schedule(store, staff_data, shifts_data):
+    """同步店家的員工、排班與指派關係，回傳各項異動數量"""
+    now = timezone.now()
+
+    # 沒有前端 id 的排班在新增後無法對應指派關係，先補上暫時的 key
+    for index, item in enumerate(shifts_data):
+        if item.get('id') is None:
+            item['id'] = ('new', index)
+
+    with transaction.atomic():
+        staff_ids, staff_created, staff_updated, staff_deleted = _sync_rows(
+            Staff, store, staff_data, STAFF_FIELDS, now
+        )
+        shift_ids, shift_created, shift_updated, shift_deleted = _sync_rows(
+            Shift, store, shifts_data, SHIFT_FIELDS, now
+        )
+        assigned, unassigned = _sync_assignments(store, shifts_data, shift_ids, staff_ids)
+
+    summary = {
+        'staff': {'created': staff_created, 'updated': staff_updated, 'deleted': staff_deleted},
+        'shifts': {'created': shift_created, 'updated': shift_updated, 'deleted': shift_deleted},
+        'assignments': {'created': assigned, 'deleted': unassigned},
+    }
+    logger.info('店家 %s 排班同步完成: %s', store.pk, summary)
+    return summary
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:28
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+
+def populate_search_vector(apps, schema_editor):
+    """
+    為既有店家建立搜尋向量
+
+    運算式為此時 apps.stores.search.build_search_vector 的內容，直接寫在這裡，
+    之後修改應用程式的搜尋權重不會改變這個 migration 的行為。
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Store = apps.get_model('stores', 'Store')
+    Store.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector(Cast('tags', models.TextField()), weight='B', config='simple')
+        + SearchVector('description', weight='C', config='simple')
+        + SearchVector('address', weight='D', config='simple')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0010_store_enable_loyalty_store_enable_reservation_and_more'),
+        ('users', '0007_user_gender_alter_user_address'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='store',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search vector built from name, tags, description and address.', null=True, verbose_name='搜尋向量'),
+        ),
+        migrations.AlterField(
+            model_name='store',
+            name='cuisine_type',
+            field=models.CharField(choices=[('japanese', '日式'), ('korean', '韓式'), ('american', '美式'), ('taiwanese', '台式'), ('western', '西式'), ('beverages', '飲料'), ('desserts', '甜點'), ('other', '其他')], default='other', help_text='The cuisine type of the restaurant.', max_length=20, verbose_name='餐廳類別'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['is_published', 'cuisine_type'], name='stores_stor_is_publ_e1a787_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='stores_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='stores_tags_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('name', models.TextField())), name='gin_trgm_ops'), name='stores_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('description', models.TextField())), name='gin_trgm_ops'), name='stores_description_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('address', models.TextField())), name='gin_trgm_ops'), name='stores_address_trgm'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.users.models import Merchant
+from .search import SEARCH_FIELDS, build_search_vector, trigram_expression
 
 
 class Store(models.Model):
@@ -205,16 +208,38 @@ class Store(models.Model):
         verbose_name='標籤',
         help_text="Tags for categorizing and searching the store (e.g., ['Italian', 'Pizza', 'Romantic'])."
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='搜尋向量',
+        help_text="Full-text search vector built from name, tags, description and address."
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = '店家資訊'
         verbose_name_plural = '店家資訊'
+        indexes = [
+            models.Index(fields=['is_published', 'cuisine_type']),
+            GinIndex(fields=['search_vector'], name='stores_search_vector_gin'),
+            GinIndex(fields=['tags'], name='stores_tags_gin'),
+            # 三元組索引：icontains 產生 UPPER(欄位::text) LIKE UPPER('%關鍵字%')，索引需使用相同運算式
+            GinIndex(trigram_expression('name'), name='stores_name_trgm'),
+            GinIndex(trigram_expression('description'), name='stores_description_trgm'),
+            GinIndex(trigram_expression('address'), name='stores_address_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.merchant.user.username})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # 搜尋欄位有變動時，於資料庫端重建此店家的搜尋向量
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(SEARCH_FIELDS):
+            Store.objects.filter(pk=self.pk).update(search_vector=build_search_vector())
+
 
 class StoreImage(models.Model):
     """
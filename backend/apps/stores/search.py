@@ -0,0 +1,75 @@
+"""
+店家搜尋
+
+以 PostgreSQL 全文檢索（search_vector + GIN 索引）搭配 pg_trgm 三元組索引：
+- 全文檢索負責排序相關度（店名 > 標籤 > 描述 > 地址）
+- 三元組索引讓中文等無空白斷詞的關鍵字，以子字串（ILIKE）比對時也能走索引
+"""
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.contrib.postgres.indexes import OpClass
+from django.db.models import Count, F, FloatField, Q, TextField
+from django.db.models.functions import Cast, Upper
+
+
+# 中文不做詞幹處理，使用 simple 設定
+SEARCH_CONFIG = 'simple'
+
+# 影響 search_vector 內容的欄位，儲存時僅在這些欄位變動時重建
+SEARCH_FIELDS = ('name', 'tags', 'description', 'address')
+
+
+def trigram_expression(field_name):
+    """與 icontains 查詢相同的運算式，供三元組 GIN 索引使用"""
+    return OpClass(Upper(Cast(field_name, TextField())), name='gin_trgm_ops')
+
+
+def build_search_vector():
+    """店家搜尋向量：店名 A、標籤 B、描述 C、地址 D"""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Cast('tags', TextField()), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('address', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def search_stores(queryset, term):
+    """
+    依關鍵字搜尋並標註相關度
+
+    符合全文檢索或店名/描述/地址包含關鍵字者皆列入結果，
+    以 rank（全文檢索相關度）與 similarity（店名相似度）排序。
+    兩者原為 real，轉為 double precision，游標分頁帶回的值才能與欄位精確比較。
+    """
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+        similarity=Cast(TrigramSimilarity('name', term), FloatField()),
+    ).filter(
+        Q(search_vector=query)
+        | Q(name__icontains=term)
+        | Q(description__icontains=term)
+        | Q(address__icontains=term)
+    )
+
+
+def filter_tags(queryset, tags):
+    """篩選同時包含所有指定標籤的店家（jsonb @> 走 GIN 索引）"""
+    if not tags:
+        return queryset
+    return queryset.filter(tags__contains=list(tags))
+
+
+def cuisine_facets(queryset, choices):
+    """各餐廳類別的店家數量（一次 GROUP BY），未出現的類別補 0"""
+    counts = dict(
+        queryset.order_by()
+        .values_list('cuisine_type')
+        .annotate(count=Count('id'))
+    )
+    return {value: counts.get(value, 0) for value, _ in choices}
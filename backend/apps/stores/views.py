@@ -3,6 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Store, StoreImage, MenuImage
 from .serializers import StoreSerializer, StoreImageSerializer, MenuImageSerializer
+from .search import cuisine_facets, filter_tags, search_stores
+from apps.common.cache import cached_catalog, store_id_from_pk
 
 
 class IsStoreOwner(permissions.BasePermission):
@@ -23,10 +25,12 @@ class StoreViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # 如果是 retrieve（查看單個店家），允許查看已上架的店家
         if self.action == 'retrieve':
-            return Store.objects.filter(is_published=True)
+            return Store.objects.filter(is_published=True).prefetch_related('images', 'menu_images')
         # 只返回當前登入商家的店家資訊
         if hasattr(self.request.user, 'merchant_profile'):
-            return Store.objects.filter(merchant=self.request.user.merchant_profile)
+            return Store.objects.filter(
+                merchant=self.request.user.merchant_profile
+            ).prefetch_related('images', 'menu_images')
         return Store.objects.none()
 
     def get_permissions(self):
@@ -165,7 +169,12 @@ class StoreViewSet(viewsets.ModelViewSet):
             "store": serializer.data
         }, status=status.HTTP_200_OK)
 
+    @cached_catalog('stores', scope=store_id_from_pk)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
+    @cached_catalog('stores')
     def published(self, request):
         """
         獲取所有已上架的店家（公開 API，供顧客瀏覽）
@@ -174,14 +183,12 @@ class StoreViewSet(viewsets.ModelViewSet):
         - has_reservation: 是否提供訂位功能
         - has_loyalty: 是否提供會員功能
         - has_surplus_food: 是否提供惜福品功能
-        - search: 搜尋關鍵字（店名、描述）
+        - tags: 標籤（逗號分隔，需全部符合）
+        - search: 搜尋關鍵字（店名、標籤、描述、地址），結果依相關度排序
+
+        回應額外包含 facets：套用其他篩選條件後，各餐廳類別的店家數量
         """
-        stores = Store.objects.filter(is_published=True)
-        
-        # 餐廳類別篩選
-        cuisine_type = request.query_params.get('cuisine_type')
-        if cuisine_type and cuisine_type != 'all':
-            stores = stores.filter(cuisine_type=cuisine_type)
+        stores = Store.objects.filter(is_published=True).prefetch_related('images', 'menu_images')
         
         # 功能篩選
         has_reservation = request.query_params.get('has_reservation')
@@ -196,18 +203,38 @@ class StoreViewSet(viewsets.ModelViewSet):
         if has_surplus_food == 'true':
             stores = stores.filter(enable_surplus_food=True)
         
+        # 標籤篩選
+        tags = request.query_params.get('tags')
+        if tags:
+            stores = filter_tags(stores, [tag.strip() for tag in tags.split(',') if tag.strip()])
+        
         # 搜尋關鍵字
-        search = request.query_params.get('search')
+        search = self._get_search_term()
         if search:
-            from django.db.models import Q
-            stores = stores.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(address__icontains=search)
-            )
+            stores = search_stores(stores, search)
         
-        serializer = self.get_serializer(stores, many=True)
-        return Response(serializer.data)
+        # 類別數量在套用類別篩選前計算，讓前端可顯示每個類別的結果數
+        facets = cuisine_facets(stores, Store.CUISINE_TYPE_CHOICES)
+        
+        # 餐廳類別篩選
+        cuisine_type = request.query_params.get('cuisine_type')
+        if cuisine_type and cuisine_type != 'all':
+            stores = stores.filter(cuisine_type=cuisine_type)
+        
+        page = self.paginate_queryset(stores)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['facets'] = facets
+        return response
+
+    def _get_search_term(self):
+        return (self.request.query_params.get('search') or '').strip()
+
+    def get_cursor_ordering(self):
+        """有搜尋關鍵字時依相關度分頁，否則使用預設排序"""
+        if self.action == 'published' and self._get_search_term():
+            return ('-rank', '-similarity', '-id')
+        return None
 
     @action(detail=True, methods=['post'])
     def upload_menu_images(self, request, pk=None):
@@ -29,7 +29,7 @@ class SurplusFoodAdmin(admin.ModelAdmin):
             'fields': ('condition', 'expiry_date', 'image', 'tags')
         }),
         ('販售時間', {
-            'fields': ('available_from', 'available_until', 'time_slot')
+            'fields': ('time_slot',)
         }),
         ('狀態與說明', {
             'fields': ('status', 'pickup_instructions')
@@ -0,0 +1,95 @@
+"""
+惜福食品可購買時段
+
+「現在可購買」的條件：
+- 上架中且仍有剩餘數量（對應 SurplusFood 的部分索引 surplus_food_available_idx）
+- 未過期（expiry_date 為空或不早於今天）
+- 未指定時段，或所屬時段已啟用、星期相符且目前時間落在開始與結束時間之間
+  （對應 SurplusTimeSlot 的部分索引 surplus_slot_active_idx）
+
+closes_at 為時段結束時間，未指定時段者視為當天結束，方便依「即將結束」排序。
+"""
+from datetime import time, timedelta
+
+from django.db.models import Count, F, Q, TimeField, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from .models import SurplusFood
+
+
+# 與 datetime.weekday() 的順序一致
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+END_OF_DAY = time(23, 59, 59)
+
+AVAILABLE_CONDITION = Q(status='active', remaining_quantity__gt=0)
+
+
+def available_now(queryset=None, now=None):
+    """篩選目前可購買的惜福食品，並標註 closes_at"""
+    if queryset is None:
+        queryset = SurplusFood.objects.all()
+    now = timezone.localtime(now)
+    current_time = now.time()
+
+    in_window = Q(
+        time_slot__is_active=True,
+        time_slot__day_of_week=WEEKDAYS[now.weekday()],
+        time_slot__start_time__lte=current_time,
+        time_slot__end_time__gte=current_time,
+    )
+    return queryset.filter(
+        AVAILABLE_CONDITION,
+        Q(expiry_date__isnull=True) | Q(expiry_date__gte=now.date()),
+        Q(time_slot__isnull=True) | in_window,
+    ).annotate(
+        closes_at=Coalesce(
+            F('time_slot__end_time'), Value(END_OF_DAY), output_field=TimeField()
+        ),
+    )
+
+
+def closing_within(queryset, minutes, now=None):
+    """只保留在指定分鐘內結束販售的品項（需先經過 available_now）"""
+    now = timezone.localtime(now)
+    deadline = now + timedelta(minutes=minutes)
+    if deadline.date() != now.date():
+        # 跨日表示今天的時段都會在期限內結束
+        return queryset
+    return queryset.filter(closes_at__lte=deadline.time())
+
+
+def limit_per_store(queryset, per_store):
+    """
+    每家店只取前 per_store 筆，並以視窗函式標註該店的總數（store_count）
+
+    排序依 closes_at（即將結束優先）再依建立時間，仍是單一查詢。
+    """
+    partition = {'partition_by': [F('store_id')]}
+    return queryset.annotate(
+        store_count=Window(Count('id'), **partition),
+        store_row=Window(
+            RowNumber(),
+            order_by=[F('closes_at').asc(), F('created_at').desc(), F('id').desc()],
+            **partition,
+        ),
+    ).filter(store_row__lte=per_store).order_by('store_id', 'store_row')
+
+
+def group_by_store(items, serialize):
+    """將已依店家排序的品項分組：[{store, store_name, count, items}, ...]"""
+    groups = []
+    current = None
+    for item in items:
+        if current is None or current['store'] != item.store_id:
+            current = {
+                'store': item.store_id,
+                'store_name': item.store.name,
+                'store_address': item.store.address,
+                'count': item.store_count,
+                'items': [],
+            }
+            groups.append(current)
+        current['items'].append(serialize(item))
+    return groups
@@ -0,0 +1,249 @@
+"""
+惜福食品庫存
+
+扣庫存以單一條件式 UPDATE 完成，不需先讀取或鎖定：
+    UPDATE ... SET remaining_quantity = remaining_quantity - n,
+                   status = CASE WHEN remaining_quantity <= n THEN 'sold_out' ELSE status END
+    WHERE id = ? AND status = 'active' AND remaining_quantity >= n
+同時搶購的請求會在該列上依序執行並重新判斷條件，因此不會超賣。
+
+歸還庫存（取消、逾期）先以條件式 UPDATE 轉換訂單狀態，只有成功轉換的那一次
+會加回庫存，重複呼叫不會重複歸還。確認、可取餐與完成同樣以條件式 UPDATE 轉換
+（advance_order），已釋放庫存的訂單不會再被改回佔用庫存的狀態。
+
+商家修改總數量（set_quantity）時，已售出的份數不變，剩餘數量於同一個 UPDATE 中增減。
+
+逾期處理（expire_*）由 sweep_expired 指令呼叫，以批次的集合式 UPDATE 完成。
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from apps.common.events import publish_store_event
+
+from .models import SurplusFood, SurplusFoodOrder
+
+
+# 仍佔用庫存的訂單狀態
+HOLDING_STATUSES = ('pending', 'confirmed', 'ready')
+
+# 歸還庫存後的訂單狀態
+RELEASED_STATUSES = ('cancelled', 'expired')
+
+# 商家推進訂單時允許的來源狀態（皆仍佔用庫存）
+ORDER_TRANSITIONS = {
+    'confirmed': ('pending',),
+    'ready': ('pending', 'confirmed'),
+    'completed': HOLDING_STATUSES,
+}
+
+
+class OutOfStock(Exception):
+    """庫存不足"""
+
+    def __init__(self, remaining):
+        self.remaining = remaining
+        super().__init__(f'庫存不足，目前剩餘 {remaining} 份')
+
+
+class NotAvailable(Exception):
+    """惜福品未上架或已售完"""
+
+    def __init__(self):
+        super().__init__('此惜福品目前無法訂購')
+
+
+def reserve_stock(surplus_food_id, quantity):
+    """扣除庫存並累計訂單數，售完時同一敘述將狀態改為 sold_out"""
+    updated = SurplusFood.objects.filter(
+        pk=surplus_food_id,
+        status='active',
+        remaining_quantity__gte=quantity,
+    ).update(
+        remaining_quantity=F('remaining_quantity') - quantity,
+        orders_count=F('orders_count') + 1,
+        # SET 子句中的欄位皆為更新前的值：剩餘 <= n 表示扣除後為 0
+        status=Case(
+            When(remaining_quantity__lte=quantity, then=Value('sold_out')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        return
+
+    current = SurplusFood.objects.filter(pk=surplus_food_id).values(
+        'status', 'remaining_quantity'
+    ).first()
+    if current and current['status'] == 'active':
+        raise OutOfStock(current['remaining_quantity'])
+    raise NotAvailable()
+
+
+def restock(surplus_food_id, quantity):
+    """加回庫存（不超過原始數量），已售完的品項恢復為上架中"""
+    _restock(SurplusFood.objects.filter(pk=surplus_food_id), quantity)
+
+
+def restock_many(quantities):
+    """批次加回庫存：{surplus_food_id: 數量}，相同數量的品項合併為一個 UPDATE"""
+    groups = defaultdict(list)
+    for surplus_food_id, quantity in quantities.items():
+        groups[quantity].append(surplus_food_id)
+    for quantity, ids in groups.items():
+        _restock(SurplusFood.objects.filter(pk__in=ids), quantity)
+
+
+def _restock(queryset, quantity):
+    queryset.update(
+        remaining_quantity=Least(F('remaining_quantity') + quantity, F('quantity')),
+        status=Case(
+            When(status='sold_out', then=Value('active')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def set_quantity(surplus_food_id, quantity):
+    """
+    變更總數量：已售出的份數不變，剩餘數量隨之增減，並依剩餘數量切換 active / sold_out
+
+    以條件式 UPDATE 完成，不會覆蓋同時下單的扣除；新數量少於已售出份數時回傳 False。
+    """
+    # SET 與 WHERE 皆以更新前的值計算：剩餘 - (原數量 - 新數量) 為更新後的剩餘數量
+    shrink = F('quantity') - quantity
+    return bool(SurplusFood.objects.filter(
+        pk=surplus_food_id,
+        remaining_quantity__gte=shrink,
+    ).update(
+        quantity=quantity,
+        remaining_quantity=F('remaining_quantity') - shrink,
+        status=Case(
+            When(status='active', remaining_quantity__lte=shrink, then=Value('sold_out')),
+            When(status='sold_out', remaining_quantity__gt=shrink, then=Value('active')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    ))
+
+
+def release_order(order, new_status='cancelled'):
+    """
+    將仍佔用庫存的訂單轉為取消或逾期並歸還庫存
+
+    回傳是否由這次呼叫完成轉換；訂單已釋放過（或已完成）時回傳 False。
+    """
+    if new_status not in RELEASED_STATUSES:
+        raise ValueError(f'無效的釋放狀態: {new_status}')
+
+    with transaction.atomic():
+        transitioned = SurplusFoodOrder.objects.filter(
+            pk=order.pk,
+            status__in=HOLDING_STATUSES,
+        ).update(status=new_status)
+        if not transitioned:
+            return False
+        restock(order.surplus_food_id, order.quantity)
+        publish_store_event(order.store_id, 'surplus_order.updated', {'id': order.pk, 'status': new_status})
+
+    order.status = new_status
+    return True
+
+
+def advance_order(order, new_status):
+    """
+    將訂單推進為確認、可取餐或完成，回傳是否由這次呼叫完成轉換
+
+    以條件式 UPDATE 只轉換仍在允許來源狀態的訂單，不會覆寫同時發生的取消或逾期。
+    """
+    if new_status not in ORDER_TRANSITIONS:
+        raise ValueError(f'無效的訂單狀態: {new_status}')
+
+    fields = {'status': new_status}
+    if new_status == 'confirmed':
+        fields['confirmed_at'] = timezone.now()
+    elif new_status == 'completed':
+        fields['completed_at'] = timezone.now()
+
+    with transaction.atomic():
+        updated = SurplusFoodOrder.objects.filter(
+            pk=order.pk,
+            status__in=ORDER_TRANSITIONS[new_status],
+        ).update(**fields)
+        if not updated:
+            return False
+        # 條件式 UPDATE 不會觸發 post_save
+        publish_store_event(order.store_id, 'surplus_order.updated', {'id': order.pk, 'status': new_status})
+
+    for field, value in fields.items():
+        setattr(order, field, value)
+    return True
+
+
+def expire_surplus_foods(since, until, batch_size=500):
+    """
+    將已過有效日期的上架品項下架
+
+    有效日期早於 until 當天者視為過期；since 為上次執行的時間點，
+    只處理在 (since, until] 之間到期的品項。回傳處理筆數。
+    """
+    queryset = SurplusFood.objects.filter(
+        status='active',
+        expiry_date__lt=timezone.localdate(until),
+    )
+    if since is not None:
+        queryset = queryset.filter(expiry_date__gte=timezone.localdate(since))
+
+    total = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += SurplusFood.objects.filter(pk__in=ids, status='active').update(
+            status='inactive',
+            updated_at=timezone.now(),
+        )
+
+
+def expire_overdue_orders(since, until, batch_size=500):
+    """
+    將超過取餐時間仍未完成的訂單轉為逾期，並批次歸還庫存
+
+    取餐時間加上 SURPLUS_ORDER_PICKUP_GRACE 分鐘（預設 30）後仍佔用庫存者視為逾期。
+    每批在同一個交易中鎖定訂單、更新狀態並依品項合計歸還數量。回傳處理筆數。
+    """
+    grace = timedelta(minutes=getattr(settings, 'SURPLUS_ORDER_PICKUP_GRACE', 30))
+    queryset = SurplusFoodOrder.objects.filter(
+        status__in=HOLDING_STATUSES,
+        pickup_time__lte=until - grace,
+    )
+    if since is not None:
+        queryset = queryset.filter(pickup_time__gt=since - grace)
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset.select_for_update()
+                .order_by('pk')
+                .values_list('pk', 'store_id', 'surplus_food_id', 'quantity')[:batch_size]
+            )
+            if not batch:
+                return total
+
+            SurplusFoodOrder.objects.filter(
+                pk__in=[pk for pk, _, _, _ in batch]
+            ).update(status='expired')
+
+            quantities = defaultdict(int)
+            for pk, store_id, surplus_food_id, quantity in batch:
+                quantities[surplus_food_id] += quantity
+                publish_store_event(store_id, 'surplus_order.updated', {'id': pk, 'status': 'expired'})
+            restock_many(quantities)
+        total += len(batch)
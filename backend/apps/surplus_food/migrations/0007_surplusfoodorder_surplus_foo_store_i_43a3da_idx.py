@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surplus_food', '0006_alter_surplusfood_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surplusfoodorder',
+            index=models.Index(fields=['store', '-created_at', '-id'], name='surplus_foo_store_i_43a3da_idx'),
+        ),
+    ]
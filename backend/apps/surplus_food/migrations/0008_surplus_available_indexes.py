@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_takeoutorder_takeoutorderitem'),
+        ('stores', '0011_store_search_vector'),
+        ('surplus_food', '0007_surplusfoodorder_surplus_foo_store_i_43a3da_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surplusfood',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('status', 'active')), fields=['store', '-created_at'], name='surplus_food_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surplusfood',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('status', 'active')), fields=['time_slot', '-created_at'], name='surplus_food_slot_avail_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surplustimeslot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['day_of_week', 'start_time', 'end_time'], name='surplus_slot_active_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_takeoutorder_takeoutorderitem'),
+        ('stores', '0011_store_search_vector'),
+        ('surplus_food', '0008_surplus_available_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surplusfood',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['expiry_date'], name='surplus_food_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surplusfoodorder',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed', 'ready'])), fields=['pickup_time'], name='surplus_order_open_pickup_idx'),
+        ),
+    ]
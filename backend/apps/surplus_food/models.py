@@ -1,6 +1,7 @@
 from django.db import models
 from apps.stores.models import Store
 from apps.products.models import Product
+from apps.common.sequences import mint_code
 from django.utils import timezone
 import uuid
 
@@ -51,6 +52,14 @@ class SurplusTimeSlot(models.Model):
         verbose_name_plural = '惜福時段'
         ordering = ['day_of_week', 'start_time']
         unique_together = ['store', 'day_of_week', 'start_time']
+        indexes = [
+            # 公開列表比對「今天、目前時間」所在的啟用時段
+            models.Index(
+                fields=['day_of_week', 'start_time', 'end_time'],
+                condition=models.Q(is_active=True),
+                name='surplus_slot_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.store.name} - {self.get_day_of_week_display()} {self.name}"
@@ -185,6 +194,23 @@ class SurplusFood(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['store', 'status']),
+            # 公開列表只看上架中且有剩餘的品項，部分索引只包含這些列
+            models.Index(
+                fields=['store', '-created_at'],
+                condition=models.Q(status='active', remaining_quantity__gt=0),
+                name='surplus_food_available_idx',
+            ),
+            models.Index(
+                fields=['time_slot', '-created_at'],
+                condition=models.Q(status='active', remaining_quantity__gt=0),
+                name='surplus_food_slot_avail_idx',
+            ),
+            # 逾期清理：上架中品項的有效日期
+            models.Index(
+                fields=['expiry_date'],
+                condition=models.Q(status='active'),
+                name='surplus_food_expiry_idx',
+            ),
         ]
     
     def __str__(self):
@@ -318,6 +344,16 @@ class SurplusFoodOrder(models.Model):
         verbose_name = '惜福食品訂單'
         verbose_name_plural = '惜福食品訂單'
         ordering = ['-created_at']
+        indexes = [
+            # 商家訂單列表的游標分頁
+            models.Index(fields=['store', '-created_at', '-id']),
+            # 逾期清理：仍佔用庫存訂單的取餐時間
+            models.Index(
+                fields=['pickup_time'],
+                condition=models.Q(status__in=['pending', 'confirmed', 'ready']),
+                name='surplus_order_open_pickup_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.order_number} - {self.customer_name}"
@@ -334,15 +370,5 @@ class SurplusFoodOrder(models.Model):
     
     @staticmethod
     def generate_order_number():
-        """生成唯一訂單編號"""
-        import secrets
-        import string
-        date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(secrets.choice(string.digits) for _ in range(4))
-        order_number = f"SFO{date_str}{random_str}"
-        
-        while SurplusFoodOrder.objects.filter(order_number=order_number).exists():
-            random_str = ''.join(secrets.choice(string.digits) for _ in range(4))
-            order_number = f"SFO{date_str}{random_str}"
-        
-        return order_number
+        """生成唯一訂單編號 格式: SFO + 日期(YYYYMMDD) + 當日序號 + 檢查碼"""
+        return mint_code('SFO')
@@ -79,6 +79,26 @@ class SurplusFoodSerializer(serializers.ModelSerializer):
             })
         
         return data
+    
+    def update(self, instance, validated_data):
+        """只寫入有變動的欄位，避免以舊值覆蓋由訂單同時更新的庫存與計數"""
+        from django.db import transaction
+        from .inventory import set_quantity
+
+        quantity = validated_data.pop('quantity', instance.quantity)
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save(update_fields=[*validated_data, 'updated_at'])
+
+            # 總數量變更時剩餘數量以已售出份數為準同步調整
+            if quantity != instance.quantity:
+                if not set_quantity(instance.pk, quantity):
+                    raise serializers.ValidationError({
+                        'quantity': '數量不可少於已售出的份數'
+                    })
+                instance.refresh_from_db(fields=['quantity', 'remaining_quantity', 'status', 'updated_at'])
+        return instance
 
 
 class SurplusFoodListSerializer(serializers.ModelSerializer):
@@ -118,17 +138,33 @@ class SurplusFoodOrderSerializer(serializers.ModelSerializer):
             'status', 'status_display', 'pickup_time', 'notes',
             'created_at', 'confirmed_at', 'completed_at'
         ]
+        # 狀態只能經由 inventory.advance_order / release_order 轉換；店家取自惜福品
         read_only_fields = [
-            'id', 'order_number', 'total_price',
+            'id', 'order_number', 'store', 'total_price', 'status',
             'created_at', 'confirmed_at', 'completed_at'
         ]
     
+    # 建立後不可變更的欄位（變更需同步調整庫存）
+    CREATE_ONLY_FIELDS = ('surplus_food', 'quantity', 'unit_price')
+    
+    def get_extra_kwargs(self):
+        extra_kwargs = super().get_extra_kwargs()
+        if self.instance is not None:
+            for field in self.CREATE_ONLY_FIELDS:
+                extra_kwargs.setdefault(field, {})['read_only'] = True
+        return extra_kwargs
+    
     def validate(self, data):
         """驗證訂單資料"""
         surplus_food = data.get('surplus_food')
         quantity = data.get('quantity', 1)
         
-        # 檢查庫存
+        if quantity <= 0:
+            raise serializers.ValidationError({
+                'quantity': '數量必須大於 0'
+            })
+        
+        # 先以讀到的庫存快速回覆；實際扣除由 inventory.reserve_stock 的條件式 UPDATE 保證
         if surplus_food and quantity > surplus_food.remaining_quantity:
             raise serializers.ValidationError({
                 'quantity': f'庫存不足，目前剩餘 {surplus_food.remaining_quantity} 份'
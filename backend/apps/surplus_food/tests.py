@@ -0,0 +1,69 @@
+from datetime import time
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.stores.models import Store
+from apps.users.models import Merchant, User
+
+from .models import SurplusFood, SurplusFoodOrder, SurplusTimeSlot
+
+
+class SurplusFoodOrderListQueryCountTests(TestCase):
+    """
+    惜福訂單列表的查詢數不應隨筆數增加
+
+    序列化器巢狀的 surplus_food 與 store 需由 get_queryset 一次載入。
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.merchant_user = User.objects.create_user(
+            email='merchant@example.com', password='x', username='merchant',
+            firebase_uid='merchant', user_type='merchant',
+        )
+        merchant = Merchant.objects.create(user=cls.merchant_user, company_account='00000001')
+        cls.store = Store.objects.create(
+            merchant=merchant, name='店家', address='地址', phone='0212345678',
+        )
+        cls.time_slot = SurplusTimeSlot.objects.create(
+            store=cls.store, name='午餐', day_of_week='monday',
+            start_time=time(11), end_time=time(13),
+        )
+
+    def create_orders(self, count):
+        start = SurplusFoodOrder.objects.count()
+        for index in range(start, start + count):
+            food = SurplusFood.objects.create(
+                store=self.store, title=f'惜福品{index}', time_slot=self.time_slot,
+                original_price=Decimal('100'), surplus_price=Decimal('50'), quantity=5,
+            )
+            SurplusFoodOrder.objects.create(
+                # 指定編號，不經過序號配置
+                order_number=f'TEST{index:05d}',
+                store=self.store,
+                surplus_food=food,
+                customer_name='顧客',
+                customer_phone='0912345678',
+                unit_price=food.surplus_price,
+                payment_method='cash',
+            )
+
+    def test_merchant_list(self):
+        client = APIClient()
+        client.force_authenticate(self.merchant_user)
+        url = '/api/merchant/surplus/orders/'
+
+        self.create_orders(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.create_orders(4)
+        with self.assertNumQueries(len(queries)):
+            response = client.get(url)
+        self.assertEqual(len(response.data['results']), 5)
@@ -1,10 +1,30 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from apps.common.counters import counters
+from apps.common.stats import (
+    StatsParamError,
+    bucketed_histogram,
+    filter_date_range,
+    parse_stats_params,
+    status_histogram,
+)
 from .models import SurplusTimeSlot, SurplusFood, SurplusFoodOrder
+from .availability import available_now, closing_within, group_by_store, limit_per_store
+from .inventory import (
+    NotAvailable,
+    OutOfStock,
+    RELEASED_STATUSES,
+    advance_order,
+    release_order,
+    reserve_stock,
+)
 from .serializers import (
     SurplusTimeSlotSerializer,
     SurplusFoodSerializer,
@@ -19,6 +39,9 @@ class SurplusTimeSlotViewSet(viewsets.ModelViewSet):
     """
     serializer_class = SurplusTimeSlotSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('day_of_week', 'start_time', 'id')
+    page_size = 100
+    max_page_size = 200
     
     def get_queryset(self):
         """只返回當前商家的時段"""
@@ -52,7 +75,9 @@ class SurplusFoodViewSet(viewsets.ModelViewSet):
         """只返回當前商家的惜福食品"""
         user = self.request.user
         if hasattr(user, 'merchant_profile') and hasattr(user.merchant_profile, 'store'):
-            queryset = SurplusFood.objects.filter(store=user.merchant_profile.store)
+            queryset = SurplusFood.objects.filter(
+                store=user.merchant_profile.store
+            ).select_related('store', 'time_slot')
             
             # 支援狀態篩選
             status_filter = self.request.query_params.get('status', None)
@@ -93,7 +118,7 @@ class SurplusFoodViewSet(viewsets.ModelViewSet):
         
         surplus_food.status = 'active'
         surplus_food.published_at = timezone.now()
-        surplus_food.save()
+        surplus_food.save(update_fields=['status', 'published_at', 'updated_at'])
         
         serializer = self.get_serializer(surplus_food)
         return Response(serializer.data)
@@ -103,30 +128,44 @@ class SurplusFoodViewSet(viewsets.ModelViewSet):
         """下架惜福品"""
         surplus_food = self.get_object()
         surplus_food.status = 'inactive'
-        surplus_food.save()
+        surplus_food.save(update_fields=['status', 'updated_at'])
         
         serializer = self.get_serializer(surplus_food)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """獲取惜福食品統計資料"""
+        """
+        獲取惜福食品統計資料
+
+        支援 start_date / end_date（依建立日期篩選）與 bucket=day/week/month 分組
+        """
         user = request.user
         if not hasattr(user, 'merchant_profile') or not hasattr(user.merchant_profile, 'store'):
             return Response({'error': '無權限'}, status=status.HTTP_403_FORBIDDEN)
         
+        try:
+            start_date, end_date, bucket = parse_stats_params(request.query_params)
+        except StatsParamError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         store = user.merchant_profile.store
-        queryset = SurplusFood.objects.filter(store=store)
-        
-        stats = {
-            'total': queryset.count(),
-            'active': queryset.filter(status='active').count(),
-            'inactive': queryset.filter(status='inactive').count(),
-            'sold_out': queryset.filter(status='sold_out').count(),
-            'total_views': sum(queryset.values_list('views_count', flat=True)),
-            'total_orders': sum(queryset.values_list('orders_count', flat=True)),
+        queryset = filter_date_range(
+            SurplusFood.objects.filter(store=store), 'created_at', start_date, end_date
+        )
+        statuses = [value for value, _ in SurplusFood.STATUS_CHOICES]
+        totals = {
+            'total_views': Coalesce(Sum('views_count'), 0),
+            'total_orders': Coalesce(Sum('orders_count'), 0),
         }
-        
+
+        # 狀態數量與瀏覽/訂單合計在同一次查詢完成
+        stats = status_histogram(queryset, statuses, totals=totals)
+        if bucket:
+            stats['buckets'] = bucketed_histogram(
+                queryset, 'created_at', bucket, statuses, totals=totals
+            )
+
         return Response(stats)
 
 
@@ -138,13 +177,9 @@ class PublicSurplusFoodViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        """只返回上架中且有庫存的惜福食品"""
-        now = timezone.now()
-        queryset = SurplusFood.objects.filter(
-            status='active',
-            remaining_quantity__gt=0,
-            available_from__lte=now,
-            available_until__gte=now
+        """只返回目前時段可購買的惜福食品（上架中、有庫存、落在販售時段內）"""
+        queryset = available_now(
+            SurplusFood.objects.select_related('store', 'time_slot')
         )
         
         # 支援店家篩選
@@ -165,30 +200,89 @@ class PublicSurplusFoodViewSet(viewsets.ReadOnlyModelViewSet):
                 Q(description__icontains=search)
             )
         
+        # 支援「N 分鐘內結束販售」篩選
+        minutes = self.request.query_params.get('closing_within', None)
+        if minutes and minutes.isdigit():
+            queryset = closing_within(queryset, int(minutes))
+        
         return queryset.order_by('-created_at')
     
+    def get_cursor_ordering(self):
+        """?ordering=closing 時依結束時間排序（即將結束優先）"""
+        if self.request.query_params.get('ordering') == 'closing':
+            return ('closes_at', '-created_at', '-id')
+        return None
+    
+    @action(detail=False, methods=['get'], url_path='by-store')
+    def by_store(self, request):
+        """
+        依店家分組的可購買品項（地圖頁使用）
+        
+        以單一查詢取得各店的品項數與前 per_store 筆品項（即將結束優先）。
+        ?stores=1,2,3 限定店家；?per_store= 每店筆數（預設 5，上限 50）。
+        """
+        queryset = self.get_queryset()
+        
+        stores = request.query_params.get('stores', '')
+        if stores:
+            try:
+                store_ids = [int(value) for value in stores.split(',') if value.strip()]
+            except ValueError:
+                return Response(
+                    {'error': 'stores 參數格式錯誤，應為以逗號分隔的店家 ID'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.filter(store_id__in=store_ids)
+        
+        per_store = request.query_params.get('per_store', '5')
+        if not per_store.isdigit() or int(per_store) < 1:
+            return Response(
+                {'error': 'per_store 必須為正整數'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        per_store = min(int(per_store), 50)
+        
+        items = limit_per_store(queryset, per_store)
+        groups = group_by_store(
+            items, lambda item: self.get_serializer(item).data
+        )
+        return Response({
+            'count': sum(group['count'] for group in groups),
+            'stores': groups,
+        })
+    
     def retrieve(self, request, *args, **kwargs):
-        """瀏覽詳情時增加瀏覽次數"""
+        """瀏覽詳情時增加瀏覽次數（緩衝後批次寫回）"""
         instance = self.get_object()
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
+        counters.increment(SurplusFood, instance.pk, 'views_count')
+        instance.views_count += counters.pending(SurplusFood, instance.pk, 'views_count')
         
         serializer = SurplusFoodSerializer(instance)
         return Response(serializer.data)
 
 
-class SurplusFoodOrderViewSet(viewsets.ModelViewSet):
+class SurplusFoodOrderViewSet(mixins.CreateModelMixin,
+                              mixins.ListModelMixin,
+                              mixins.RetrieveModelMixin,
+                              viewsets.GenericViewSet):
     """
     惜福食品訂單 ViewSet（商家端）
+
+    不提供修改與刪除：狀態只能經由 confirm / ready / complete / cancel 轉換，
+    品項與數量建立後不可變更，庫存才會與訂單一致。
     """
     serializer_class = SurplusFoodOrderSerializer
     permission_classes = [IsAuthenticated]
+    page_size = 50
+    max_page_size = 200
     
     def get_queryset(self):
         """只返回當前商家的訂單"""
         user = self.request.user
         if hasattr(user, 'merchant_profile') and hasattr(user.merchant_profile, 'store'):
-            queryset = SurplusFoodOrder.objects.filter(store=user.merchant_profile.store)
+            queryset = SurplusFoodOrder.objects.filter(
+                store=user.merchant_profile.store
+            ).select_related('store', 'surplus_food__store')
             
             # 支援狀態篩選
             status_filter = self.request.query_params.get('status', None)
@@ -198,50 +292,56 @@ class SurplusFoodOrderViewSet(viewsets.ModelViewSet):
             return queryset.order_by('-created_at')
         return SurplusFoodOrder.objects.none()
     
-    @action(detail=True, methods=['post'])
-    def confirm(self, request, pk=None):
-        """確認訂單"""
+    def perform_create(self, serializer):
+        """建立訂單時以條件式 UPDATE 扣除庫存，扣除失敗整筆回滾"""
+        surplus_food = serializer.validated_data['surplus_food']
+        quantity = serializer.validated_data.get('quantity', 1)
+        try:
+            with transaction.atomic():
+                reserve_stock(surplus_food.pk, quantity)
+                serializer.save(store=surplus_food.store)
+        except OutOfStock as e:
+            raise ValidationError({'quantity': str(e)})
+        except NotAvailable as e:
+            raise ValidationError({'surplus_food': str(e)})
+    
+    def _advance(self, new_status):
         order = self.get_object()
-        order.status = 'confirmed'
-        order.confirmed_at = timezone.now()
-        order.save()
-        
+        if order.status != new_status and not advance_order(order, new_status):
+            order.refresh_from_db(fields=['status'])
+            return Response(
+                {'error': f'訂單目前為「{order.get_status_display()}」，無法變更為此狀態'},
+                status=status.HTTP_409_CONFLICT
+            )
         serializer = self.get_serializer(order)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        """確認訂單"""
+        return self._advance('confirmed')
+    
     @action(detail=True, methods=['post'])
     def ready(self, request, pk=None):
         """標記為可取餐"""
-        order = self.get_object()
-        order.status = 'ready'
-        order.save()
-        
-        serializer = self.get_serializer(order)
-        return Response(serializer.data)
+        return self._advance('ready')
     
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         """完成訂單"""
-        order = self.get_object()
-        order.status = 'completed'
-        order.completed_at = timezone.now()
-        order.save()
-        
-        serializer = self.get_serializer(order)
-        return Response(serializer.data)
+        return self._advance('completed')
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
-        """取消訂單並恢復庫存"""
+        """取消訂單並恢復庫存（重複取消不會重複歸還）"""
         order = self.get_object()
         
-        # 恢復庫存
-        surplus_food = order.surplus_food
-        surplus_food.remaining_quantity += order.quantity
-        surplus_food.save()
-        
-        order.status = 'cancelled'
-        order.save()
+        if not release_order(order, 'cancelled') and order.status not in RELEASED_STATUSES:
+            return Response(
+                {'error': '此訂單無法取消'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        order.refresh_from_db()
         serializer = self.get_serializer(order)
         return Response(serializer.data)
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
     'apps.users',
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     'apps.inventory',
     'apps.schedules',
     'apps.surplus_food',
+    'apps.common',
 ]
 
 MIDDLEWARE = [
@@ -89,6 +91,9 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT'),
     }
 }
+# 同一個資料庫的第二條連線，供 apps.common.sequences 在下單交易之外立即提交序號
+# （測試時沿用 default 連線）
+DATABASES['sequences'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
 
 
 # Password validation
@@ -157,11 +162,44 @@ except Exception as e:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 快取設定：預設使用行程內記憶體；多個 worker 部署時請改用共用後端（例如 Redis），
+# 才能讓模型變動的失效處理在所有 worker 生效
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'catering-platform'),
+    }
+}
+
+# 公開目錄（店家、商品、訂位時段）回應快取的存活秒數
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 300))
+
+# 緩衝計數器（瀏覽數等）寫回資料庫的間隔秒數
+COUNTER_FLUSH_INTERVAL = int(os.getenv('COUNTER_FLUSH_INTERVAL', 10))
+
+# 惜福訂單超過預計取餐時間多少分鐘後由 sweep_expired 轉為逾期
+SURPLUS_ORDER_PICKUP_GRACE = int(os.getenv('SURPLUS_ORDER_PICKUP_GRACE', 30))
+
+# 出餐佇列 ?since= 輪詢往前多取的秒數，需大於主機與資料庫的時鐘誤差加上下單交易的時間
+ORDER_QUEUE_CURSOR_OVERLAP = int(os.getenv('ORDER_QUEUE_CURSOR_OVERLAP', 5))
+
+# 商家即時事件的發布/訂閱後端；多行程部署請改用 apps.common.events.PostgresBackend
+EVENT_BACKEND = os.getenv('EVENT_BACKEND', 'apps.common.events.LocalBackend')
+# 長輪詢沒有新事件時最多等待的秒數（請求占用工作執行緒的上限）
+EVENT_POLL_TIMEOUT = int(os.getenv('EVENT_POLL_TIMEOUT', 25))
+# 輪詢時往前多取的秒數，涵蓋各行程收到事件的時間差與主機時鐘誤差
+EVENT_POLL_OVERLAP = int(os.getenv('EVENT_POLL_OVERLAP', 2))
+# 每個行程保留近期事件的秒數，cursor 早於此範圍時客戶端需重新取得列表
+EVENT_BUFFER_SECONDS = int(os.getenv('EVENT_BUFFER_SECONDS', 120))
+
 # Django REST Framework 的設定
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # 所有列表 API 預設使用游標分頁（依 created_at + id）
+    'DEFAULT_PAGINATION_CLASS': 'apps.common.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
 }
 
 
@@ -0,0 +1,6 @@
+from .base import *
+
+DEBUG = False
+
+# 多個 worker 行程之間以 PostgreSQL LISTEN / NOTIFY 傳遞商家即時事件
+EVENT_BACKEND = os.getenv('EVENT_BACKEND', 'apps.common.events.PostgresBackend')
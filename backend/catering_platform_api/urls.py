@@ -31,6 +31,8 @@ urlpatterns = [
     path('api/inventory/', include('apps.inventory.urls')),
     path('api/schedules/', include('apps.schedules.urls')),
     path('api/', include('apps.surplus_food.urls')),
+    path('api/reports/', include('apps.reports.urls')),
+    path('api/', include('apps.common.urls')),
 ]
 
 if settings.DEBUG:
@@ -241,4 +241,29 @@ api.interceptors.response.use(
   }
 );
 
+// 取得游標分頁的下一頁（nextUrl 為列表回應中的 next 完整網址）
+export const getNextPage = (nextUrl) => api.get(nextUrl);
+
+/**
+ * 依 next 依序取得游標分頁的所有資料（菜單、兌換商品、歷史紀錄等需要完整列表的畫面使用）
+ * 回傳格式同 api.get，data 為合併後的陣列；未分頁的回應原樣回傳
+ */
+export const getAllPages = async (url, config = {}) => {
+  const response = await api.get(url, {
+    ...config,
+    params: { page_size: 100, ...config.params },
+  });
+  if (!Array.isArray(response.data?.results)) return response;
+
+  const results = [...response.data.results];
+  let next = response.data.next;
+  while (next) {
+    // next 已包含原本的查詢參數
+    const page = await api.get(next);
+    results.push(...page.data.results);
+    next = page.data.next;
+  }
+  return { ...response, data: results };
+};
+
 export default api;
@@ -0,0 +1,61 @@
+import api from './api';
+
+/**
+ * 商家即時事件（長輪詢）
+ *
+ * 每次請求最多等待伺服器的 EVENT_POLL_TIMEOUT 秒，收到回應後立即帶著 cursor 再次請求。
+ * 伺服器會重複回傳 cursor 前幾秒的事件，這裡以事件 id 去重。
+ */
+
+const RETRY_DELAY = 3000;
+// 記住最近處理過的事件 id 數量（需大於伺服器重疊期間可能的事件數）
+const SEEN_LIMIT = 500;
+
+/**
+ * 訂閱自己店家的訂位、外帶訂單與惜福訂單事件
+ * @param {Function} onEvent - 收到事件時呼叫 ({ type, data })，type 例如 reservation.created
+ * @param {Function} onReconnect - 期間的事件可能遺失時（伺服器回應 reset）呼叫，
+ *   可在此重新取得列表補齊
+ * @returns {Function} 取消訂閱
+ */
+export const subscribeMerchantEvents = (onEvent, onReconnect) => {
+  const controller = new AbortController();
+  const seen = new Set();
+  let cursor = null;
+
+  const handle = (event) => {
+    if (seen.has(event.id)) return;
+    seen.add(event.id);
+    if (seen.size > SEEN_LIMIT) {
+      seen.delete(seen.values().next().value);
+    }
+    onEvent(event);
+  };
+
+  const poll = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const response = await api.get('/merchant/events/', {
+          params: cursor ? { after: cursor } : {},
+          signal: controller.signal,
+        });
+        const { events, reset } = response.data;
+        if (reset && onReconnect) onReconnect();
+        events.forEach(handle);
+        cursor = response.data.cursor;
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.warn('[events] poll error', err?.message);
+        // 沿用原本的 cursor 重試，斷線過久時伺服器會回應 reset
+        await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY));
+      }
+    }
+  };
+
+  poll();
+  return () => controller.abort();
+};
+
+export default {
+  subscribeMerchantEvents,
+};
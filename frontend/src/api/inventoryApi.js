@@ -1,8 +1,8 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 // 取得所有原物料
 export const getIngredients = async () => {
-  const response = await api.get('/inventory/ingredients/');
+  const response = await getAllPages('/inventory/ingredients/');
   return response.data;
 };
 
@@ -32,14 +32,14 @@ export const deleteIngredient = async (id) => {
 
 // 取得低庫存原物料
 export const getLowStockIngredients = async () => {
-  const response = await api.get('/inventory/ingredients/low_stock/');
+  const response = await getAllPages('/inventory/ingredients/low_stock/');
   return response.data;
 };
 
 // 依類別取得原物料
 export const getIngredientsByCategory = async (category) => {
   const params = category ? { category } : {};
-  const response = await api.get('/inventory/ingredients/by_category/', { params });
+  const response = await getAllPages('/inventory/ingredients/by_category/', { params });
   return response.data;
 };
 
@@ -52,8 +52,10 @@ export const adjustIngredientQuantity = async (id, adjustment) => {
 };
 
 // 匯出當日原物料清單
-export const exportTodayIngredients = async () => {
+// params: { export_format: 'csv' | 'xlsx', start_date, end_date }
+export const exportTodayIngredients = async (params = {}) => {
   const response = await api.get('/inventory/ingredients/export_today/', {
+    params,
     responseType: 'blob'
   });
   return response.data;
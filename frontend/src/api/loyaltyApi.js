@@ -1,7 +1,7 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 // 顧客會員帳戶相關 API
-export const getLoyaltyAccounts = () => api.get('/loyalty/customer/accounts/');
+export const getLoyaltyAccounts = () => getAllPages('/loyalty/customer/accounts/');
 
 export const getLoyaltyAccount = (accountId) => api.get(`/loyalty/customer/accounts/${accountId}/`);
 
@@ -9,19 +9,19 @@ export const getAccountTransactions = (accountId) =>
   api.get(`/loyalty/customer/accounts/${accountId}/transactions/`);
 
 // 點數交易記錄相關 API
-export const getPointTransactions = () => api.get('/loyalty/customer/transactions/');
+export const getPointTransactions = () => getAllPages('/loyalty/customer/transactions/');
 
 // 兌換商品相關 API
 export const getRedemptionProducts = (storeId = null) => {
   const params = storeId ? { store: storeId } : {};
-  return api.get('/loyalty/redemptions/', { params });
+  return getAllPages('/loyalty/redemptions/', { params });
 };
 
 export const getRedemptionProduct = (productId) => 
   api.get(`/loyalty/redemptions/${productId}/`);
 
 // 我的兌換記錄相關 API
-export const getMyRedemptions = () => api.get('/loyalty/customer/my-redemptions/');
+export const getMyRedemptions = () => getAllPages('/loyalty/customer/my-redemptions/');
 
 export const createRedemption = (productId) => 
   api.post('/loyalty/customer/my-redemptions/', { product: productId });
@@ -1,12 +1,12 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 export const getTakeoutProducts = (storeId) =>
-  api.get('/products/public/products/', {
+  getAllPages('/products/public/products/', {
     params: { store: storeId, service_type: 'takeaway' },
   });
 
 export const getDineInProducts = (storeId) =>
-  api.get('/products/public/products/', {
+  getAllPages('/products/public/products/', {
     params: { store: storeId },
   });
 
@@ -15,3 +15,12 @@ export const createTakeoutOrder = (payload) =>
 
 export const createDineInOrder = (payload) =>
   api.post('/orders/takeout/', payload);
+
+// 商家出餐佇列：不帶 since 取得進行中的訂單；帶回上次的 cursor 只取得之後變動的訂單
+export const getMerchantOrderQueue = (since) =>
+  api.get('/orders/merchant/takeout/', {
+    params: since ? { since } : {},
+  });
+
+export const updateTakeoutOrderStatus = (orderId, status) =>
+  api.post(`/orders/merchant/takeout/${orderId}/update-status/`, { status });
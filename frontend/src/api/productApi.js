@@ -1,7 +1,7 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 export const getProducts = () => {
-  return api.get('/products/products/');
+  return getAllPages('/products/products/');
 };
 
 export const createProduct = (productData) => {
@@ -0,0 +1,43 @@
+import api from './api';
+
+/**
+ * 背景匯出相關 API
+ */
+
+/**
+ * 建立匯出工作
+ * @param {Object} data - { kind, export_format, start_date, end_date }
+ *   kind: reservations / point_transactions / surplus_orders / inventory
+ * @returns {Promise}
+ */
+export const createExportJob = (data) => {
+  return api.post('/reports/export-jobs/', data);
+};
+
+/**
+ * 取得匯出工作列表
+ * @returns {Promise}
+ */
+export const getExportJobs = (params = {}) => {
+  return api.get('/reports/export-jobs/', { params });
+};
+
+/**
+ * 查詢匯出工作狀態
+ * @param {number} id - 工作 ID
+ * @returns {Promise}
+ */
+export const getExportJob = (id) => {
+  return api.get(`/reports/export-jobs/${id}/`);
+};
+
+/**
+ * 下載匯出檔案（工作完成後）
+ * @param {number} id - 工作 ID
+ * @returns {Promise}
+ */
+export const downloadExportJob = (id) => {
+  return api.get(`/reports/export-jobs/${id}/download/`, {
+    responseType: 'blob',
+  });
+};
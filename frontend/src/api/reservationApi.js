@@ -1,4 +1,4 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 /**
  * 訂位相關 API
@@ -29,7 +29,7 @@ export const verifyGuestReservation = (phoneNumber) => {
  * @returns {Promise}
  */
 export const getMyReservations = () => {
-  return api.get('/reservations/');
+  return getAllPages('/reservations/');
 };
 
 /**
@@ -87,7 +87,7 @@ export const getPublicTimeSlots = (storeId, date = null) => {
   if (date) {
     params.append('date', date);
   }
-  return api.get(`/time-slots/?${params.toString()}`);
+  return getAllPages(`/time-slots/?${params.toString()}`);
 };
 
 // ==================== 商家端 API ====================
@@ -111,6 +111,21 @@ export const updateReservationStatus = (id, status) => {
   return api.post(`/merchant/reservations/${id}/update-status/`, { status });
 };
 
+/**
+ * 商家批次更新訂位狀態（例如打烊時一次標記完成或未到場）
+ * @param {number[]} ids - 訂位 ID 列表
+ * @param {string} status - 新狀態 (pending/confirmed/completed/cancelled/no_show)
+ * @param {string} cancelReason - 取消原因（狀態為 cancelled 時使用）
+ * @returns {Promise} 回應包含各筆訂位的處理結果 results
+ */
+export const bulkUpdateReservationStatus = (ids, status, cancelReason = '') => {
+  return api.post('/merchant/reservations/bulk-update-status/', {
+    ids,
+    status,
+    cancel_reason: cancelReason,
+  });
+};
+
 /**
  * 商家取消訂位
  * @param {number} id - 訂位 ID
@@ -165,7 +180,7 @@ export const updateReservationSettings = (id, settingsData) => {
  * @returns {Promise}
  */
 export const getTimeSlots = () => {
-  return api.get('/merchant/time-slots/');
+  return getAllPages('/merchant/time-slots/');
 };
 
 /**
@@ -210,6 +225,7 @@ export default {
   // 商家端
   getMerchantReservations,
   updateReservationStatus,
+  bulkUpdateReservationStatus,
   merchantCancelReservation,
   deleteReservation,
   getReservationStats,
@@ -94,11 +94,13 @@ export const deleteShift = (id) => {
 };
 
 /**
- * 匯出班表為 CSV
+ * 匯出班表為 CSV（或 XLSX）
+ * @param {Object} params - { export_format: 'csv' | 'xlsx', start_date, end_date }
  * @returns {Promise}
  */
-export const exportScheduleCSV = () => {
+export const exportScheduleCSV = (params = {}) => {
   return api.get('/schedules/shifts/export_csv/', {
+    params,
     responseType: 'blob',
   });
 };
@@ -1,4 +1,4 @@
-import api from './api';
+import api, { getAllPages } from './api';
 
 /**
  * 惜福食品 API
@@ -10,7 +10,7 @@ export const surplusFoodApi = {
    * 獲取所有惜福時段
    */
   getTimeSlots: async () => {
-    const response = await api.get('/merchant/surplus/time-slots/');
+    const response = await getAllPages('/merchant/surplus/time-slots/');
     return response.data;
   },
 
@@ -44,7 +44,7 @@ export const surplusFoodApi = {
    * 獲取惜福食品列表
    */
   getSurplusFoods: async (params = {}) => {
-    const response = await api.get('/merchant/surplus/foods/', { params });
+    const response = await getAllPages('/merchant/surplus/foods/', { params });
     return response.data;
   },
 
@@ -118,7 +118,7 @@ export const surplusFoodApi = {
    * 獲取惜福食品訂單列表
    */
   getOrders: async (params = {}) => {
-    const response = await api.get('/merchant/surplus/orders/', { params });
+    const response = await getAllPages('/merchant/surplus/orders/', { params });
     return response.data;
   },
 
@@ -160,7 +160,16 @@ export const surplusFoodApi = {
    * 顧客瀏覽惜福食品列表
    */
   getPublicSurplusFoods: async (params = {}) => {
-    const response = await api.get('/surplus/foods/', { params });
+    const response = await getAllPages('/surplus/foods/', { params });
+    return response.data;
+  },
+
+  /**
+   * 顧客依店家分組瀏覽目前可購買的惜福食品（地圖頁）
+   * params: { stores: '1,2,3', per_store: 5 }
+   */
+  getPublicSurplusFoodsByStore: async (params = {}) => {
+    const response = await api.get('/surplus/foods/by-store/', { params });
     return response.data;
   },
 
@@ -16,7 +16,7 @@ const CustomerLoyalty = () => {
   const fetchAccounts = async () => {
     try {
       const response = await getLoyaltyAccounts();
-      setAccounts(response.data);
+      setAccounts(response.data.results || response.data);
     } catch (error) {
       console.error('獲取會員帳戶失敗:', error);
     } finally {
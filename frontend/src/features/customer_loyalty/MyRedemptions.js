@@ -15,7 +15,7 @@ const MyRedemptions = () => {
   const fetchRedemptions = async () => {
     try {
       const response = await getMyRedemptions();
-      setRedemptions(response.data);
+      setRedemptions(response.data.results || response.data);
     } catch (error) {
       console.error('獲取兌換記錄失敗:', error);
     } finally {
@@ -19,8 +19,8 @@ const PointsHistory = () => {
         getPointTransactions(),
         getLoyaltyAccounts()
       ]);
-      setTransactions(transactionsRes.data);
-      setAccounts(accountsRes.data);
+      setTransactions(transactionsRes.data.results || transactionsRes.data);
+      setAccounts(accountsRes.data.results || accountsRes.data);
     } catch (error) {
       console.error('獲取點數記錄失敗:', error);
     } finally {
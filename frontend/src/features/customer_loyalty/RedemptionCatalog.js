@@ -22,8 +22,8 @@ const RedemptionCatalog = () => {
         getRedemptionProducts(),
         getLoyaltyAccounts()
       ]);
-      setProducts(productsRes.data);
-      setAccounts(accountsRes.data);
+      setProducts(productsRes.data.results || productsRes.data);
+      setAccounts(accountsRes.data.results || accountsRes.data);
     } catch (error) {
       console.error('獲取資料失敗:', error);
     } finally {
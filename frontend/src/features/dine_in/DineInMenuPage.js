@@ -23,7 +23,7 @@ const DineInMenuPage = () => {
           getDineInProducts(storeId),
         ]);
         setStore(storeRes.data);
-        const filtered = (productRes.data || []).filter((item) =>
+        const filtered = (productRes.data.results || productRes.data || []).filter((item) =>
           ['dine_in', 'both'].includes(item.service_type)
         );
         setProducts(filtered);
@@ -72,7 +72,7 @@ function DineInOrderPage() {
         setStore(response.data);
 
         const productsRes = await getDineInProducts(storeId);
-        const dineInMenu = (productsRes.data || []).filter(
+        const dineInMenu = (productsRes.data.results || productsRes.data || []).filter(
           (item) => item.service_type === 'dine_in' || item.service_type === 'both'
         );
         setMenuItems(dineInMenu);
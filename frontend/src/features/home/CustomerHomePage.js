@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { getPublishedStores } from '../../api/storeApi';
+import { getNextPage } from '../../api/api';
 import './CustomerHomePage.css';
 
 const categories = [
@@ -15,10 +16,33 @@ const categories = [
   { id: 'other', name: '其他', icon: 'three-dots' },
 ];
 
+// 轉換 API 資料格式
+const formatStore = (store) => ({
+  id: store.id,
+  name: store.name,
+  description: store.description || '',
+  address: store.address || '',
+  phone: store.phone || '',
+  cuisine_type: store.cuisine_type,
+  rating: 4.5, // 暫時使用預設值，之後可以從評論系統獲取
+  imageUrl: store.images && store.images.length > 0 
+    ? (store.images[0].image.startsWith('http') 
+        ? store.images[0].image 
+        : `http://127.0.0.1:8000${store.images[0].image}`)
+    : '/images/default-store.jpg',
+  tags: [],
+  is_open: store.is_open,
+  enable_reservation: store.enable_reservation,
+  enable_loyalty: store.enable_loyalty,
+  enable_surplus_food: store.enable_surplus_food,
+});
+
 function CustomerHomePage() {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [stores, setStores] = useState([]);
+  const [nextPageUrl, setNextPageUrl] = useState(null);
+  const [facets, setFacets] = useState({});
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
     has_reservation: false,
@@ -39,35 +63,31 @@ function CustomerHomePage() {
         ...filters
       };
       const response = await getPublishedStores(filterParams);
-      // 轉換 API 資料格式
-      const formattedStores = response.data.map(store => ({
-        id: store.id,
-        name: store.name,
-        description: store.description || '',
-        address: store.address || '',
-        phone: store.phone || '',
-        cuisine_type: store.cuisine_type,
-        rating: 4.5, // 暫時使用預設值，之後可以從評論系統獲取
-        imageUrl: store.images && store.images.length > 0 
-          ? (store.images[0].image.startsWith('http') 
-              ? store.images[0].image 
-              : `http://127.0.0.1:8000${store.images[0].image}`)
-          : '/images/default-store.jpg',
-        tags: [],
-        is_open: store.is_open,
-        enable_reservation: store.enable_reservation,
-        enable_loyalty: store.enable_loyalty,
-        enable_surplus_food: store.enable_surplus_food,
-      }));
-      setStores(formattedStores);
+      const storeData = response.data.results || response.data;
+      setStores(storeData.map(formatStore));
+      setNextPageUrl(response.data.next || null);
+      setFacets(response.data.facets || {});
     } catch (err) {
       console.error('Failed to load stores:', err);
       setStores([]);
+      setNextPageUrl(null);
+      setFacets({});
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreStores = async () => {
+    if (!nextPageUrl) return;
+    try {
+      const response = await getNextPage(nextPageUrl);
+      setStores(prev => [...prev, ...response.data.results.map(formatStore)]);
+      setNextPageUrl(response.data.next || null);
+    } catch (err) {
+      console.error('Failed to load more stores:', err);
+    }
+  };
+
   const handleSearch = () => {
     loadStores();
   };
@@ -154,7 +174,10 @@ function CustomerHomePage() {
                 onClick={() => setSelectedCategory(category.id)}
               >
                 <i className={`bi bi-${category.icon} fs-5 mb-1`}></i>
-                <span className="d-block small">{category.name}</span>
+                <span className="d-block small">
+                  {category.name}
+                  {category.id !== 'all' && facets[category.id] !== undefined && ` (${facets[category.id]})`}
+                </span>
               </button>
             </div>
           ))}
@@ -290,6 +313,15 @@ function CustomerHomePage() {
           </div>
         )}
 
+        {/* 載入更多 */}
+        {!loading && nextPageUrl && (
+          <div className="text-center mt-4">
+            <button className="btn btn-orange" onClick={loadMoreStores}>
+              載入更多店家
+            </button>
+          </div>
+        )}
+
         {/* 無結果提示 */}
         {!loading && stores.length === 0 && (
           <div className="text-center py-5">
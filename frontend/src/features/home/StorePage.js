@@ -39,7 +39,7 @@ function StorePage() {
   const loadMenuItems = async (id) => {
     try {
       const productRes = await getTakeoutProducts(id);
-      setMenuItems(productRes.data);
+      setMenuItems(productRes.data.results || productRes.data);
     } catch (err) {
       console.error('Failed to load menu items:', err);
     }
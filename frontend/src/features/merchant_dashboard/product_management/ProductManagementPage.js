@@ -20,7 +20,7 @@ const ProductManagementPage = () => {
       console.log('[ProductManagement] merchant_accessToken:', localStorage.getItem('merchant_accessToken')?.substring(0, 50));
       const response = await getProducts();
       console.log('[ProductManagement] Products loaded:', response.data);
-      setProducts(response.data);
+      setProducts(response.data.results || response.data);
       setError('');
     } catch (err) {
       console.error('[ProductManagement] Error fetching products:', err);
@@ -14,10 +14,12 @@ import {
   updateTimeSlot,
   deleteTimeSlot
 } from '../../../api/reservationApi';
+import { getNextPage } from '../../../api/api';
 
 const ReservationManagementPage = () => {
   const [activeTab, setActiveTab] = useState('reservations'); // 'reservations' or 'settings'
   const [reservations, setReservations] = useState([]);
+  const [nextPageUrl, setNextPageUrl] = useState(null);
   const [timeSlots, setTimeSlots] = useState([]);
   const [stats, setStats] = useState({
     pending: 0,
@@ -39,13 +41,26 @@ const ReservationManagementPage = () => {
       const response = await getMerchantReservations();
       const reservationData = response.data.results || response.data;
       setReservations(reservationData);
-      updateStats(reservationData);
+      setNextPageUrl(response.data.next || null);
+      fetchStats();
     } catch (error) {
       console.error('Failed to fetch reservations:', error);
       alert('無法載入訂位資料，請稍後再試。');
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextPageUrl) return;
+    try {
+      const response = await getNextPage(nextPageUrl);
+      setReservations(prev => [...prev, ...response.data.results]);
+      setNextPageUrl(response.data.next || null);
+    } catch (error) {
+      console.error('Failed to fetch more reservations:', error);
+      alert('無法載入更多訂位，請稍後再試。');
+    }
+  };
+
   const fetchTimeSlots = async () => {
     try {
       const response = await getTimeSlots();
@@ -58,14 +73,14 @@ const ReservationManagementPage = () => {
     }
   };
 
-  const updateStats = (reservationList) => {
-    const newStats = {
-      pending: reservationList.filter(r => r.status === 'pending').length,
-      confirmed: reservationList.filter(r => r.status === 'confirmed').length,
-      cancelled: reservationList.filter(r => r.status === 'cancelled').length,
-      completed: reservationList.filter(r => r.status === 'completed').length,
-    };
-    setStats(newStats);
+  // 列表已分頁，統計數字改由後端一次計算
+  const fetchStats = async () => {
+    try {
+      const response = await getReservationStats();
+      setStats(response.data);
+    } catch (error) {
+      console.error('Failed to fetch reservation stats:', error);
+    }
   };
 
   const handleAcceptReservation = async (reservationId) => {
@@ -220,13 +235,22 @@ const ReservationManagementPage = () => {
 
       <div className="tab-content">
         {activeTab === 'reservations' ? (
-          <ReservationList
-            reservations={reservations}
-            onAccept={handleAcceptReservation}
-            onCancel={handleCancelClick}
-            onComplete={handleCompleteReservation}
-            onDelete={handleDeleteReservation}
-          />
+          <>
+            <ReservationList
+              reservations={reservations}
+              onAccept={handleAcceptReservation}
+              onCancel={handleCancelClick}
+              onComplete={handleCompleteReservation}
+              onDelete={handleDeleteReservation}
+            />
+            {nextPageUrl && (
+              <div className="load-more">
+                <button className="btn-secondary" onClick={handleLoadMore}>
+                  載入更多
+                </button>
+              </div>
+            )}
+          </>
         ) : (
           <TimeSlotSettings
             timeSlots={timeSlots}
@@ -70,7 +70,7 @@ const MyReservationsPage = () => {
       } else if (user) {
         // 會員查詢自己的訂位
         const response = await getMyReservations();
-        reservationsData = response.data || [];
+        reservationsData = response.data.results || response.data || [];
       }
       
       setReservations(reservationsData);
@@ -58,7 +58,7 @@ const SurplusFoodForm = ({ type, item, onClose, onSuccess }) => {
         getProducts(),
         surplusFoodApi.getTimeSlots()
       ]);
-      setProducts(productsData.data || []);
+      setProducts(productsData.data.results || productsData.data || []);
       setTimeSlots(timeSlotsData || []);
     } catch (error) {
       console.error('載入資料失敗:', error);
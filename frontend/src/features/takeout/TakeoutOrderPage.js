@@ -97,7 +97,7 @@ const [useUtensils, setUseUtensils] = useState('yes');
         setStore(response.data);
 
         const productsRes = await getTakeoutProducts(storeId);
-        setMenuItems(productsRes.data);
+        setMenuItems(productsRes.data.results || productsRes.data);
         } catch (err) {
         setError('載入資料失敗，請稍後再試');
         } finally {